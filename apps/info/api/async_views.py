@@ -0,0 +1,22 @@
+from coderr_backend.async_views import AsyncAPIView
+from apps.info.models import PlatformStats
+from .views import BaseInfoView
+
+
+class AsyncBaseInfoView(AsyncAPIView):
+    """
+    Async variant of `BaseInfoView`, reading the `PlatformStats` singleton with the async ORM.
+    """
+    sync_view = BaseInfoView
+
+    async def aget(self, request):
+        stats = await PlatformStats.aload()
+
+        data = {
+            "review_count": stats.review_count,
+            "average_rating": stats.average_rating,
+            "business_profile_count": stats.business_profile_count,
+            "offer_count": stats.offer_count,
+        }
+
+        return self.render(data)
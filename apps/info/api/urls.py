@@ -1,6 +1,8 @@
 from django.urls import path, include
+from coderr_backend.async_views import select_view
+from .async_views import AsyncBaseInfoView
 from .views import BaseInfoView
 
 urlpatterns = [
-    path('', BaseInfoView.as_view(), name='base-info'),
+    path('', select_view(BaseInfoView, AsyncBaseInfoView), name='base-info'),
 ]
\ No newline at end of file
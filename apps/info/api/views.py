@@ -2,10 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from django.db.models import Avg
-from apps.users.models import Review
-from apps.users.models import Profile
-from apps.offers.models import Offer
+from apps.info.models import PlatformStats
 
 
 class BaseInfoView(APIView):
@@ -18,6 +15,9 @@ class BaseInfoView(APIView):
     - Total number of business profiles.
     - Total number of offers.
 
+    The values are read from the `PlatformStats` singleton, which is kept
+    up to date incrementally, so each request is a single primary-key read.
+
     Permission:
     - AllowAny: This view is accessible to any user, authenticated or not.
 
@@ -27,20 +27,13 @@ class BaseInfoView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        review_count = Review.objects.count()
-        
-        average_rating = Review.objects.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        average_rating = round(average_rating, 1) if average_rating is not None else 0.0
-
-        business_profile_count = Profile.objects.filter(type='business').count()
-
-        offer_count = Offer.objects.count()
+        stats = PlatformStats.load()
 
         data = {
-            "review_count": review_count,
-            "average_rating": average_rating,
-            "business_profile_count": business_profile_count,
-            "offer_count": offer_count,
+            "review_count": stats.review_count,
+            "average_rating": stats.average_rating,
+            "business_profile_count": stats.business_profile_count,
+            "offer_count": stats.offer_count,
         }
         
         return Response(data, status=status.HTTP_200_OK)
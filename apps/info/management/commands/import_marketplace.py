@@ -0,0 +1,348 @@
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.offers.cache import bump_catalog_version
+from apps.offers.models import Offer, Offerdetail
+from apps.orders.models import Order
+from apps.users.models import Profile, Review
+
+# Record types in the order they are inserted, so a record can refer to any record of an earlier type
+RECORD_TYPES = ['user', 'profile', 'offer', 'detail', 'order', 'review']
+
+FIELDS = {
+    'user': {'username', 'email', 'password', 'password_hash', 'first_name', 'last_name'},
+    'profile': {'user', 'type', 'first_name', 'last_name', 'location', 'tel', 'description', 'working_hours'},
+    'offer': {'ref', 'user', 'title', 'description'},
+    'detail': {'offer', 'offer_type', 'title', 'revisions', 'delivery_time_in_days', 'price', 'features'},
+    'order': {'customer', 'offer', 'offer_type', 'status'},
+    'review': {'business_user', 'reviewer', 'rating', 'description'},
+}
+
+REQUIRED = {
+    'user': {'username'},
+    'profile': {'user', 'type'},
+    'offer': {'ref', 'user', 'title'},
+    'detail': {'offer', 'offer_type', 'title', 'revisions', 'delivery_time_in_days', 'price'},
+    'order': {'customer', 'offer', 'offer_type'},
+    'review': {'business_user', 'reviewer', 'rating'},
+}
+
+# Ratings a review may give, as stars in the frontend
+RATINGS = range(1, 6)
+
+# Record type of a CSV file without a `record` column, by file name
+CSV_FILE_TYPES = {
+    'users': 'user', 'profiles': 'profile', 'offers': 'offer', 'details': 'detail',
+    'offerdetails': 'detail', 'orders': 'order', 'reviews': 'review',
+}
+
+# Iterations of the fast hasher. Django upgrades such hashes to the configured
+# hasher the first time the user logs in.
+FAST_HASH_ITERATIONS = 1000
+
+
+def read_jsonl(file, source):
+    """
+    Yields (position, record type, record) for each line of a JSONL file.
+    """
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise CommandError(f"{source}:{line_number}: {error}")
+        if not isinstance(record, dict):
+            raise CommandError(f"{source}:{line_number}: expected an object")
+        yield f"{source}:{line_number}", record.pop('record', None), record
+
+
+def read_csv(file, source):
+    """
+    Yields (position, record type, record) for each row of a CSV file. Empty cells
+    are left out, and the features of details are given as a JSON list.
+    """
+    default_type = CSV_FILE_TYPES.get(Path(source).stem)
+    reader = csv.DictReader(file)
+    for row in reader:
+        record = {key: value for key, value in row.items() if value not in ('', None)}
+        position = f"{source}:{reader.line_num}"
+        if 'features' in record:
+            try:
+                record['features'] = json.loads(record['features'])
+            except json.JSONDecodeError as error:
+                raise CommandError(f"{position}: features: {error}")
+        yield position, record.pop('record', default_type), record
+
+
+class Command(BaseCommand):
+    """
+    Imports users, profiles, offers, offer details, orders and reviews from JSONL or CSV files.
+
+    Records are streamed, validated and inserted with bulk_create, each batch of every
+    record type in its own transaction. Bulk inserts send no signals, so the stored offer
+    minimums, order counters, ratings and platform stats are recomputed once at the end.
+    An invalid record stops the import with its position; the batches before it stay
+    imported, and their stored values are recomputed before the error is raised.
+
+    Every JSONL line is an object with a `record` key naming its type. A CSV file
+    holds one type, named by a `record` column or by the file name (`users.csv`,
+    `offers.csv`, ...). Records refer to users by username and to offers by the
+    `ref` given in the offer record; orders refer to an offer and an offer type:
+
+        {"record": "user", "username": "anna", "password": "secret"}
+        {"record": "profile", "user": "anna", "type": "business", "location": "Berlin"}
+        {"record": "offer", "ref": "logo-1", "user": "anna", "title": "Logo Design", "description": "..."}
+        {"record": "detail", "offer": "logo-1", "offer_type": "basic", "title": "Basic", "revisions": 1,
+         "delivery_time_in_days": 5, "price": 100, "features": ["Logo"]}
+        {"record": "order", "customer": "ben", "offer": "logo-1", "offer_type": "basic", "status": "completed"}
+        {"record": "review", "business_user": "anna", "reviewer": "ben", "rating": 5, "description": "..."}
+
+    A record must come after the records it refers to, or refer to an existing user.
+    Imported usernames must be new, and each user may get one profile.
+    Users get `password_hash` as is, e.g. hashed ahead of time, or `password` hashed
+    with the configured hasher, or with --fast-hasher for synthetic users. Users
+    without either get an unusable password.
+    """
+    help = "Imports marketplace data from JSONL or CSV files with bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help="JSONL or CSV files, or - for JSONL on stdin.")
+        parser.add_argument('--format', choices=['jsonl', 'csv'],
+                            help="Format of all files; by default taken from the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of records per INSERT.")
+        parser.add_argument('--fast-hasher', action='store_true',
+                            help=f"Hash passwords with {FAST_HASH_ITERATIONS} PBKDF2 iterations, for synthetic users.")
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.fast_hasher = PBKDF2PasswordHasher() if options['fast_hasher'] else None
+        self.pending = {record_type: [] for record_type in RECORD_TYPES}
+        self.counts = dict.fromkeys(RECORD_TYPES, 0)
+        self.user_ids = {}
+        self.offers = {}
+        self.details = {}
+        self.offer_pks = []
+        start = time.perf_counter()
+
+        try:
+            for source in options['files']:
+                file_format = options['format'] or ('csv' if source.lower().endswith('.csv') else 'jsonl')
+                reader = read_csv if file_format == 'csv' else read_jsonl
+                if source == '-':
+                    self.import_records(reader(sys.stdin, 'stdin'))
+                    continue
+                try:
+                    with open(source, newline='', encoding='utf-8') as file:
+                        self.import_records(reader(file, source))
+                except OSError as error:
+                    raise CommandError(error)
+            self.flush()
+
+            self.stdout.write(self.style.SUCCESS(
+                "Imported " + ", ".join(f"{count} {record_type}s" for record_type, count in self.counts.items())
+                + f" in {time.perf_counter() - start:.1f}s."
+            ))
+        finally:
+            # Batches committed before an error stay, so their stored values are recomputed either way
+            self.reconcile()
+
+    def import_records(self, records):
+        for position, record_type, record in records:
+            if record_type not in FIELDS:
+                raise CommandError(f"{position}: unknown record type {record_type!r}")
+            unknown = set(record) - FIELDS[record_type]
+            if unknown:
+                raise CommandError(f"{position}: unknown fields {', '.join(sorted(unknown))}")
+            missing = REQUIRED[record_type] - set(record)
+            if missing:
+                raise CommandError(f"{position}: missing fields {', '.join(sorted(missing))}")
+
+            self.pending[record_type].append((position, record))
+            if len(self.pending[record_type]) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Inserts the pending records of all types, in the order of RECORD_TYPES.
+        The counts and offers are only recorded once the transaction is committed.
+        """
+        flushed = {}
+        offer_count = len(self.offer_pks)
+        try:
+            with transaction.atomic():
+                for record_type in RECORD_TYPES:
+                    rows = self.pending[record_type]
+                    if rows:
+                        getattr(self, f'create_{record_type}s')(rows)
+                        flushed[record_type] = len(rows)
+        except BaseException:
+            del self.offer_pks[offer_count:]
+            raise
+        for record_type, count in flushed.items():
+            self.counts[record_type] += count
+            self.pending[record_type].clear()
+
+    def reconcile(self):
+        """
+        Recomputes the denormalized values the bulk inserts did not maintain.
+        """
+        if self.offer_pks:
+            # One UPDATE over the range of imported offers, which at worst also
+            # recomputes offers created meanwhile by someone else
+            Offer.objects.filter(pk__gte=min(self.offer_pks), pk__lte=max(self.offer_pks)).update_min_values()
+            self.stdout.write(self.style.SUCCESS(f"Recomputed the minimums of {len(self.offer_pks)} offers."))
+        if self.counts['order']:
+            call_command('reconcile_order_stats', stdout=self.stdout)
+        if self.counts['review']:
+            call_command('reconcile_profile_ratings', stdout=self.stdout)
+        if any(self.counts.values()):
+            call_command('reconcile_platform_stats', stdout=self.stdout)
+            bump_catalog_version()
+
+    def resolve_users(self, rows, *fields):
+        """
+        Looks up the IDs of the users the rows refer to in the given fields,
+        with one query for users that were not imported in this run.
+        """
+        unknown = {record[field] for position, record in rows for field in fields} - self.user_ids.keys()
+        if unknown:
+            self.user_ids.update(User.objects.filter(username__in=unknown).values_list('username', 'id'))
+        for position, record in rows:
+            for field in fields:
+                if record[field] not in self.user_ids:
+                    raise CommandError(f"{position}: unknown user {record[field]!r}")
+
+    def validate(self, position, instance, record):
+        """
+        Validates the fields a record gives with the validation of the model fields,
+        which also converts the strings of CSV cells. References are resolved separately.
+        """
+        given = {key for key, value in record.items() if value != ''}
+        exclude = [
+            field.name for field in instance._meta.concrete_fields
+            if field.is_relation or (field.name not in given and field.attname not in given)
+        ]
+        try:
+            instance.clean_fields(exclude=exclude)
+        except ValidationError as error:
+            raise CommandError(f"{position}: " + "; ".join(
+                f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+            ))
+
+    def check_choice(self, position, record, field, choices):
+        if record.get(field) not in [value for value, label in choices]:
+            raise CommandError(f"{position}: invalid {field} {record.get(field)!r}")
+
+    def hash_password(self, record):
+        if 'password_hash' in record:
+            return record['password_hash']
+        if 'password' not in record:
+            return make_password(None)
+        if self.fast_hasher:
+            return self.fast_hasher.encode(record['password'], self.fast_hasher.salt(), FAST_HASH_ITERATIONS)
+        return make_password(record['password'])
+
+    def create_users(self, rows):
+        # Usernames of earlier batches are in the database already
+        taken = set(User.objects.filter(
+            username__in=[record['username'] for position, record in rows]
+        ).values_list('username', flat=True))
+        users = []
+        for position, record in rows:
+            if record['username'] in taken:
+                raise CommandError(f"{position}: username {record['username']!r} already exists")
+            taken.add(record['username'])
+            user = User(
+                username=record['username'], email=record.get('email', ''), password=self.hash_password(record),
+                first_name=record.get('first_name', ''), last_name=record.get('last_name', ''),
+            )
+            self.validate(position, user, record)
+            users.append(user)
+        users = User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.user_ids.update((user.username, user.id) for user in users)
+
+    def create_profiles(self, rows):
+        self.resolve_users(rows, 'user')
+        taken = set(Profile.objects.filter(
+            user_id__in=[self.user_ids[record['user']] for position, record in rows]
+        ).values_list('user_id', flat=True))
+        profiles = []
+        for position, record in rows:
+            self.check_choice(position, record, 'type', Profile._meta.get_field('type').choices)
+            user_id = self.user_ids[record['user']]
+            if user_id in taken:
+                raise CommandError(f"{position}: user {record['user']!r} already has a profile")
+            taken.add(user_id)
+            record.pop('user')
+            profile = Profile(user_id=user_id, **record)
+            self.validate(position, profile, record)
+            profiles.append(profile)
+        Profile.objects.bulk_create(profiles, batch_size=self.batch_size)
+
+    def create_offers(self, rows):
+        self.resolve_users(rows, 'user')
+        refs = {}
+        for position, record in rows:
+            if record['ref'] in self.offers or record['ref'] in refs:
+                raise CommandError(f"{position}: duplicate offer ref {record['ref']!r}")
+            refs[record['ref']] = Offer(
+                user_id=self.user_ids[record['user']], title=record['title'],
+                description=record.get('description', ''),
+            )
+            self.validate(position, refs[record['ref']], record)
+        Offer.objects.bulk_create(refs.values(), batch_size=self.batch_size)
+        self.offers.update(refs)
+        self.offer_pks.extend(offer.pk for offer in refs.values())
+
+    def create_details(self, rows):
+        details = []
+        for position, record in rows:
+            offer_ref = record.pop('offer')
+            if offer_ref not in self.offers:
+                raise CommandError(f"{position}: unknown offer {offer_ref!r}")
+            self.check_choice(position, record, 'offer_type', Offerdetail.OFFER_TYPE_CHOICES)
+            if (offer_ref, record['offer_type']) in self.details:
+                raise CommandError(f"{position}: duplicate {record['offer_type']} detail of offer {offer_ref!r}")
+            detail = Offerdetail(offer=self.offers[offer_ref], **{'features': [], **record})
+            self.validate(position, detail, record)
+            self.details[offer_ref, detail.offer_type] = detail
+            details.append(detail)
+        Offerdetail.objects.bulk_create(details, batch_size=self.batch_size)
+
+    def create_orders(self, rows):
+        self.resolve_users(rows, 'customer')
+        orders = []
+        for position, record in rows:
+            detail = self.details.get((record['offer'], record['offer_type']))
+            if detail is None:
+                raise CommandError(f"{position}: unknown {record['offer_type']} detail of offer {record['offer']!r}")
+            order = Order(customer_user_id=self.user_ids[record['customer']], offer_detail=detail)
+            if 'status' in record:
+                self.check_choice(position, record, 'status', Order.STATUS_CHOICES)
+                order.status = record['status']
+            order.snapshot_offer_detail()
+            orders.append(order)
+        Order.objects.bulk_create(orders, batch_size=self.batch_size)
+
+    def create_reviews(self, rows):
+        self.resolve_users(rows, 'business_user', 'reviewer')
+        reviews = []
+        for position, record in rows:
+            review = Review(
+                business_user_id=self.user_ids[record['business_user']], reviewer_id=self.user_ids[record['reviewer']],
+                rating=record['rating'], description=record.get('description', ''),
+            )
+            self.validate(position, review, record)
+            if review.rating not in RATINGS:
+                raise CommandError(f"{position}: invalid rating {record['rating']!r}")
+            reviews.append(review)
+        Review.objects.bulk_create(reviews, batch_size=self.batch_size)
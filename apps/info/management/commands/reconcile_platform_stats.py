@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.info.models import PlatformStats
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the platform stats from the source tables.
+
+    The counters are maintained by signals, which bulk operations bypass.
+    Run this command periodically (e.g. from cron) to repair any drift.
+    """
+    help = "Recomputes the platform stats shown by the base info endpoint."
+
+    def handle(self, *args, **options):
+        stats = PlatformStats.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f"Reviews: {stats.review_count}, average rating: {stats.average_rating}, "
+            f"business profiles: {stats.business_profile_count}, offers: {stats.offer_count}"
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('info', '0002_delete_info'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_count', models.BigIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('business_profile_count', models.BigIntegerField(default=0)),
+                ('offer_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'platform stats',
+            },
+        ),
+    ]
@@ -1,3 +1,90 @@
+from asgiref.sync import sync_to_async
 from django.db import models
+from django.db.models import F
 
-# Create your models here.
\ No newline at end of file
+
+class PlatformStats(models.Model):
+    """
+    Singleton holding the platform counters shown by the base info endpoint.
+
+    The counters are kept up to date by signal handlers in `apps.info.signals`
+    and can be rebuilt from the source tables with `reconcile`.
+
+    Attributes:
+        review_count (BigIntegerField): Total number of reviews.
+        rating_sum (BigIntegerField): Sum of all review ratings.
+        business_profile_count (BigIntegerField): Total number of business profiles.
+        offer_count (BigIntegerField): Total number of offers.
+        updated_at (DateTimeField): Timestamp when the counters were last changed.
+
+    Methods:
+        load: Returns the singleton, creating it from the source tables if missing.
+        aload: Async variant of `load`.
+        reconcile: Recomputes all counters from the source tables.
+        increment: Atomically adds the given deltas to the counters.
+    """
+    SINGLETON_ID = 1
+
+    review_count = models.BigIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    business_profile_count = models.BigIntegerField(default=0)
+    offer_count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'platform stats'
+
+    def __str__(self):
+        return "Platform stats"
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0.0
+        return round(self.rating_sum / self.review_count, 1)
+
+    @classmethod
+    def compute(cls):
+        """
+        Counts reviews, ratings, business profiles and offers in the source tables.
+        """
+        from apps.offers.models import Offer
+        from apps.users.models import Profile, Review
+
+        reviews = Review.objects.aggregate(count=models.Count('id'), rating_sum=models.Sum('rating'))
+        return {
+            'review_count': reviews['count'],
+            'rating_sum': reviews['rating_sum'] or 0,
+            'business_profile_count': Profile.objects.filter(type='business').count(),
+            'offer_count': Offer.objects.count(),
+        }
+
+    @classmethod
+    def load(cls):
+        try:
+            return cls.objects.get(pk=cls.SINGLETON_ID)
+        except cls.DoesNotExist:
+            stats, created = cls.objects.get_or_create(pk=cls.SINGLETON_ID, defaults=cls.compute())
+            return stats
+
+    @classmethod
+    async def aload(cls):
+        try:
+            return await cls.objects.aget(pk=cls.SINGLETON_ID)
+        except cls.DoesNotExist:
+            return await sync_to_async(cls.load)()
+
+    @classmethod
+    def reconcile(cls):
+        stats, created = cls.objects.update_or_create(pk=cls.SINGLETON_ID, defaults=cls.compute())
+        return stats
+
+    @classmethod
+    def increment(cls, **deltas):
+        """
+        Adds the deltas in a single UPDATE. Does nothing before the singleton exists,
+        since `load` computes the counters from scratch in that case.
+        """
+        deltas = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if deltas:
+            cls.objects.filter(pk=cls.SINGLETON_ID).update(**deltas)
@@ -0,0 +1,56 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from coderr_backend.signals import remember_loaded_values
+from apps.info.models import PlatformStats
+from apps.offers.models import Offer
+from apps.offers.signals import offers_bulk_created
+from apps.users.models import Profile, Review
+
+
+remember_loaded_values(Review, _stats_rating='rating')
+remember_loaded_values(Profile, _stats_type='type')
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    if created:
+        PlatformStats.increment(review_count=1, rating_sum=instance.rating)
+    elif instance._stats_rating is not None:
+        PlatformStats.increment(rating_sum=instance.rating - instance._stats_rating)
+    instance._stats_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    PlatformStats.increment(review_count=-1, rating_sum=-(instance._stats_rating or 0))
+
+
+@receiver(post_save, sender=Profile)
+def count_saved_profile(sender, instance, created, **kwargs):
+    was_business = not created and instance._stats_type == 'business'
+    is_business = instance.type == 'business'
+    if was_business != is_business:
+        PlatformStats.increment(business_profile_count=1 if is_business else -1)
+    instance._stats_type = instance.type
+
+
+@receiver(post_delete, sender=Profile)
+def count_deleted_profile(sender, instance, **kwargs):
+    if instance._stats_type == 'business':
+        PlatformStats.increment(business_profile_count=-1)
+
+
+@receiver(post_save, sender=Offer)
+def count_saved_offer(sender, instance, created, **kwargs):
+    if created:
+        PlatformStats.increment(offer_count=1)
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, instance, **kwargs):
+    PlatformStats.increment(offer_count=-1)
+
+
+@receiver(offers_bulk_created, sender=Offer)
+def count_bulk_created_offers(sender, offers, **kwargs):
+    PlatformStats.increment(offer_count=len(offers))
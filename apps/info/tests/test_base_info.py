@@ -0,0 +1,91 @@
+from io import StringIO
+from django.urls import reverse
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from apps.info.models import PlatformStats
+from apps.offers.models import Offer
+from apps.users.models import Profile, Review
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from apps.info.api.async_views import AsyncBaseInfoView
+
+
+class BaseInfoTests(APITestCase):
+
+    def setUp(self):
+        # Create a business user with an offer and a customer who reviews it
+        self.business_user = User.objects.create_user(username='business', password='testpass')
+        self.business_profile = Profile.objects.create(user=self.business_user, type='business')
+        self.customer_user = User.objects.create_user(username='customer', password='testpass')
+        Profile.objects.create(user=self.customer_user, type='customer')
+
+        self.offer = Offer.objects.create(user=self.business_user, title="Logo Design", description="Logos")
+        self.review = Review.objects.create(
+            business_user=self.business_user, reviewer=self.customer_user, rating=4, description="Good service."
+        )
+
+        self.url = reverse('base-info')
+
+    def test_get_base_info(self):
+        # The first request creates the stats, later requests are a single primary-key read
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            "review_count": 1,
+            "average_rating": 4.0,
+            "business_profile_count": 1,
+            "offer_count": 1,
+        })
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_async_base_info(self):
+        # Test that the async variant returns the same body as the DRF view
+        response = self.client.get(self.url)
+        async_response = async_to_sync(AsyncBaseInfoView.as_view())(AsyncRequestFactory().get(self.url))
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.content, response.content)
+
+    def test_counters_follow_changes(self):
+        # Test that saving and deleting reviews, profiles and offers updates the stats
+        PlatformStats.load()
+
+        other_business = User.objects.create_user(username='other', password='testpass')
+        Profile.objects.create(user=other_business, type='business')
+        Review.objects.create(business_user=other_business, reviewer=self.customer_user, rating=5, description="Great!")
+
+        self.review.rating = 2
+        self.review.save()
+        self.offer.delete()
+
+        self.business_profile.type = 'customer'
+        self.business_profile.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, {
+            "review_count": 2,
+            "average_rating": 3.5,
+            "business_profile_count": 1,
+            "offer_count": 0,
+        })
+
+        Review.objects.filter(pk=self.review.pk).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["review_count"], 1)
+        self.assertEqual(response.data["average_rating"], 5.0)
+
+    def test_reconcile_repairs_drift(self):
+        # Test that the reconcile command recomputes the stats from the source tables
+        PlatformStats.load()
+        PlatformStats.objects.update(review_count=10, rating_sum=7, offer_count=3)
+
+        call_command('reconcile_platform_stats', stdout=StringIO())
+
+        stats = PlatformStats.load()
+        self.assertEqual(stats.review_count, 1)
+        self.assertEqual(stats.average_rating, 4.0)
+        self.assertEqual(stats.business_profile_count, 1)
+        self.assertEqual(stats.offer_count, 1)
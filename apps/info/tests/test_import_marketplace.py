@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from apps.info.models import PlatformStats
+from apps.offers.models import Offer, Offerdetail
+from apps.orders.models import BusinessOrderStats, Order
+from apps.users.models import Profile, Review
+
+
+class ImportMarketplaceTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', newline='') as file:
+            file.write(content)
+        return path
+
+    def write_jsonl(self, name, records):
+        return self.write(name, ''.join(json.dumps(record) + '\n' for record in records))
+
+    def records(self):
+        yield {"record": "user", "username": "anna", "password": "secret", "email": "anna@example.com"}
+        yield {"record": "user", "username": "ben"}
+        yield {"record": "profile", "user": "anna", "type": "business", "location": "Berlin"}
+        yield {"record": "profile", "user": "ben", "type": "customer"}
+        for index in range(3):
+            yield {"record": "offer", "ref": f"logo-{index}", "user": "anna", "title": f"Logo {index}", "description": "Logos"}
+            for level, offer_type in enumerate(['basic', 'standard', 'premium']):
+                yield {"record": "detail", "offer": f"logo-{index}", "offer_type": offer_type, "title": offer_type,
+                       "revisions": level, "delivery_time_in_days": 7 - level * 2 - index, "price": 100 * (level + 1) + index,
+                       "features": ["Logo"]}
+        yield {"record": "order", "customer": "ben", "offer": "logo-1", "offer_type": "standard", "status": "completed"}
+        yield {"record": "order", "customer": "ben", "offer": "logo-2", "offer_type": "basic"}
+        yield {"record": "review", "business_user": "anna", "reviewer": "ben", "rating": 4, "description": "Good"}
+
+    def test_import_jsonl(self):
+        # Test that all records are imported in small batches and the stored values are recomputed
+        path = self.write_jsonl('marketplace.jsonl', self.records())
+        call_command('import_marketplace', path, batch_size=2, fast_hasher=True, stdout=StringIO())
+
+        anna = User.objects.get(username='anna')
+        self.assertTrue(anna.check_password('secret'))
+        self.assertFalse(User.objects.get(username='ben').has_usable_password())
+        self.assertEqual(Profile.objects.get(user=anna).location, 'Berlin')
+
+        offer = Offer.objects.get(title='Logo 1')
+        self.assertEqual(offer.details.count(), 3)
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (101, 2))
+
+        order = Order.objects.get(offer_type='standard')
+        self.assertEqual((order.business_user, order.status, order.price), (anna, 'completed', 201))
+        stats = BusinessOrderStats.objects.get(business_user=anna)
+        self.assertEqual((stats.in_progress_count, stats.completed_count), (1, 1))
+
+        self.assertEqual(Profile.objects.get(user=anna).average_rating, 4.0)
+        stats = PlatformStats.objects.get()
+        self.assertEqual((stats.review_count, stats.business_profile_count, stats.offer_count), (1, 1, 3))
+
+    def test_import_csv_refers_to_existing_users(self):
+        # Test that CSV files take their record type from the file name and that existing users are found
+        User.objects.create_user(username='existing', password='testpass')
+        users = self.write('users.csv', "username,password\nnew,secret\n")
+        offers = self.write('offers.csv', "ref,user,title,description\nweb,existing,Website,Sites\n")
+        details = self.write('details.csv',
+                             'offer,offer_type,title,revisions,delivery_time_in_days,price,features\n'
+                             'web,basic,Basic,1,10,250.50,"[""Page""]"\n')
+        call_command('import_marketplace', users, offers, details, stdout=StringIO())
+
+        self.assertTrue(User.objects.get(username='new').check_password('secret'))
+        offer = Offer.objects.get(user__username='existing')
+        self.assertEqual((offer.min_price, offer.min_delivery_time), (250.5, 10))
+        self.assertEqual(Offerdetail.objects.get(offer=offer).features, ["Page"])
+
+    def test_unknown_reference(self):
+        # Test that a reference to an unknown record names the line and imports nothing of its batch
+        path = self.write_jsonl('orders.jsonl', [
+            {"record": "user", "username": "ben"},
+            {"record": "review", "business_user": "nobody", "reviewer": "ben", "rating": 5},
+        ])
+        with self.assertRaisesMessage(CommandError, "orders.jsonl:2: unknown user 'nobody'"):
+            call_command('import_marketplace', path, stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Review.objects.exists())
+
+    def test_invalid_values(self):
+        # Test that invalid values name their line and field instead of being stored
+        path = self.write_jsonl('reviews.jsonl', [
+            {"record": "user", "username": "anna"},
+            {"record": "user", "username": "ben"},
+            {"record": "review", "business_user": "anna", "reviewer": "ben", "rating": 9},
+        ])
+        with self.assertRaisesMessage(CommandError, "reviews.jsonl:3: invalid rating 9"):
+            call_command('import_marketplace', path, stdout=StringIO())
+
+        self.write('users.csv', "username\nanna\n")
+        self.write('offers.csv', "ref,user,title\nweb,anna,Website\n")
+        details = self.write('details.csv', 'offer,offer_type,title,revisions,delivery_time_in_days,price\n'
+                                            'web,basic,Basic,one,10,cheap\n')
+        with self.assertRaisesMessage(CommandError, "details.csv:2: revisions: "):
+            call_command('import_marketplace', *(os.path.join(self.directory.name, name) for name in ['users.csv', 'offers.csv']),
+                         details, stdout=StringIO())
+        self.assertFalse(Offerdetail.objects.exists())
+
+    def test_duplicate_users_and_profiles(self):
+        # Test that users and profiles that exist or repeat name their line instead of failing the INSERT
+        existing = User.objects.create_user(username='existing', password='testpass')
+        Profile.objects.create(user=existing, type='customer')
+        cases = [
+            ([{"record": "user", "username": "existing"}], "users.jsonl:1: username 'existing' already exists"),
+            ([{"record": "user", "username": "anna"}, {"record": "user", "username": "anna"}],
+             "users.jsonl:2: username 'anna' already exists"),
+            ([{"record": "profile", "user": "existing", "type": "business"}],
+             "users.jsonl:1: user 'existing' already has a profile"),
+            ([{"record": "user", "username": "anna"}, {"record": "profile", "user": "anna", "type": "business"},
+              {"record": "profile", "user": "anna", "type": "customer"}],
+             "users.jsonl:3: user 'anna' already has a profile"),
+        ]
+        for records, message in cases:
+            with self.subTest(message=message):
+                path = self.write_jsonl('users.jsonl', records)
+                with self.assertRaisesMessage(CommandError, message):
+                    call_command('import_marketplace', path, stdout=StringIO())
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['existing'])
+
+    def test_committed_batches_are_reconciled_after_an_error(self):
+        # Test that the batches imported before an invalid record get their stored values recomputed
+        records = list(self.records())[:-3] + [{"record": "offer", "ref": "bad", "user": "anna", "title": "x" * 300}]
+        path = self.write_jsonl('marketplace.jsonl', records)
+        with self.assertRaisesMessage(CommandError, "marketplace.jsonl:17: title: "):
+            call_command('import_marketplace', path, batch_size=4, stdout=StringIO())
+
+        offers = Offer.objects.order_by('title')
+        self.assertEqual([offer.title for offer in offers], ['Logo 0', 'Logo 1', 'Logo 2'])
+        for offer in offers:
+            details = offer.details.all()
+            self.assertEqual((offer.min_price, offer.min_delivery_time),
+                             (min(detail.price for detail in details), min(detail.delivery_time_in_days for detail in details)))
+        self.assertEqual(PlatformStats.objects.get().offer_count, 3)
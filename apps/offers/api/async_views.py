@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from coderr_backend.async_views import AsyncAPIView
+from apps.offers import cache as offer_cache
+from .views import OfferListView
+
+
+class AsyncOfferListView(AsyncAPIView):
+    """
+    Async variant of the GET of `OfferListView`.
+
+    Applies the same filters, ordering, search and page number pagination, and shares
+    the anonymous response cache. The page is counted and loaded with the async ORM,
+    including the prefetched details. Cursor pagination and offer creation are served
+    by `OfferListView`.
+    """
+    sync_view = OfferListView
+
+    async def aget(self, request):
+        paginator = OfferListView.pagination_class()
+        if paginator.is_cursor_request(request):
+            return await self.delegate(request._request)
+
+        timeout = getattr(settings, 'OFFER_LIST_CACHE_TIMEOUT', 0)
+        cacheable = timeout and not request.user.is_authenticated
+        if cacheable:
+            cache = offer_cache.get_cache()
+            key = offer_cache.list_cache_key(request)
+            data = cache.get(key)
+            offer_cache.record_lookup(hit=data is not None)
+            if data is not None:
+                return self.render(data, headers={'X-Cache': 'HIT'})
+
+        view = OfferListView(request=request, args=(), kwargs={}, format_kwarg=None)
+        queryset = view.filter_queryset(view.get_queryset())
+
+        django_paginator = paginator.get_django_paginator_class()(queryset, paginator.get_page_size(request))
+        if hasattr(django_paginator, 'acount'):
+            django_paginator.count = await django_paginator.acount()
+        else:
+            django_paginator.count = await queryset.acount()
+
+        page_number = paginator.get_page_number(request, django_paginator)
+        try:
+            page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        page.object_list = [offer async for offer in page.object_list]
+
+        paginator.page, paginator.request = page, request
+        serializer = view.get_serializer(page.object_list, many=True)
+        data = paginator.get_paginated_response(serializer.data).data
+
+        if cacheable:
+            cache.set(key, data, timeout)
+            return self.render(data, headers={'X-Cache': 'MISS'})
+        return self.render(data)
@@ -1,5 +1,7 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 from apps.offers.models import Offer
+from apps.offers.search import get_search_backend
 
 class OfferFilter(filters.FilterSet):
     """
@@ -12,3 +14,17 @@ class OfferFilter(filters.FilterSet):
     class Meta:
         model = Offer
         fields = ['creator_id', 'min_price', 'max_delivery_time']
+
+
+class OfferSearchFilter(SearchFilter):
+    """
+    Search filter for offers using the configured search backend.
+
+    Keeps the `search` query parameter of the DRF SearchFilter, but matches
+    prefixes through a full-text index and orders the results by rank.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
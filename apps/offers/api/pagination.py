@@ -1,6 +1,77 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator as DjangoPaginator
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
+from coderr_backend.pagination import KeysetPagination
+
+
+class OfferCursorPagination(KeysetPagination):
+    ordering_fields = ['updated_at', 'min_price']
+    default_ordering = '-updated_at'
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """
+    Paginator caching the total count of each distinct query for
+    OFFER_LIST_COUNT_CACHE_TIMEOUT seconds, so browsing a large catalog
+    does not run COUNT(*) on every page.
+    """
+    @cached_property
+    def cache_key(self):
+        query = str(self.object_list.query)
+        return 'offers:count:' + hashlib.md5(query.encode('utf-8')).hexdigest()
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(self.cache_key, count, settings.OFFER_LIST_COUNT_CACHE_TIMEOUT)
+        return count
+
+    async def acount(self):
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = await self.object_list.acount()
+            cache.set(self.cache_key, count, settings.OFFER_LIST_COUNT_CACHE_TIMEOUT)
+        return count
+
 
 class OfferPagination(PageNumberPagination):
+    """
+    Page number pagination for offers with an opt-in cursor mode.
+
+    - `?pagination=cursor` (or a `cursor` parameter) switches to keyset pagination,
+      ordered by `updated_at` or `min_price`, without a total count.
+    - The OFFER_LIST_COUNT_CACHE_TIMEOUT setting (seconds, default 0 = exact count
+      on every request) caches the total count of page number responses.
+    """
     page_size = 6
     page_size_query_param = 'page_size'
-    max_page_size = 10
\ No newline at end of file
+    max_page_size = 10
+    cursor_pagination_class = OfferCursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.is_cursor_request(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        self.django_paginator_class = self.get_django_paginator_class()
+        return super().paginate_queryset(queryset, request, view)
+
+    def is_cursor_request(self, request):
+        return request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params
+
+    def get_django_paginator_class(self):
+        if getattr(settings, 'OFFER_LIST_COUNT_CACHE_TIMEOUT', 0):
+            return CachedCountPaginator
+        return DjangoPaginator
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,4 +1,5 @@
 from rest_framework.permissions import SAFE_METHODS, BasePermission
+from apps.users.authentication import has_profile_type
 
 class IsOwnerOrReadOnly(BasePermission):
     """
@@ -19,4 +20,4 @@ class IsBusinessOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         
-        return request.user.profile.type == 'business'
+        return has_profile_type(request.user, 'business')
@@ -1,9 +1,14 @@
 from rest_framework import serializers 
 from apps.offers.models import Offer, Offerdetail
+from apps.offers.signals import offers_bulk_created
 from apps.users.api.serializers import ProfileSerializer
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.urls import reverse
+from coderr_backend.instrumentation import TimedSerializerMixin
+from coderr_backend.renditions import RenditionsField
 
-class OfferdetailsSerializer(serializers.ModelSerializer):
+class OfferdetailsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for offer details.
 
@@ -36,7 +41,31 @@ class OfferdetailsSerializer(serializers.ModelSerializer):
         return value
 
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferListSerializer(serializers.ListSerializer):
+    """
+    List serializer for creating many offers at once.
+
+    All offers are inserted with one bulk INSERT and all their details with another,
+    inside a single transaction.
+    """
+    def create(self, validated_data):
+        user = self.context['request'].user
+        built = [self.child.build_offer(user, offer_data) for offer_data in validated_data]
+        offers = [offer for offer, details in built]
+
+        with transaction.atomic():
+            Offer.objects.bulk_create(offers)
+            for offer, details in built:
+                for detail in details:
+                    detail.offer = offer
+            Offerdetail.objects.bulk_create([detail for offer, details in built for detail in details])
+            offers_bulk_created.send(sender=Offer, offers=offers)
+
+        prefetch_related_objects(offers, 'details')
+        return offers
+
+
+class OfferSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for offers.
 
@@ -45,18 +74,20 @@ class OfferSerializer(serializers.ModelSerializer):
     """
     details = OfferdetailsSerializer(many=True, required=True)
     user_details = ProfileSerializer(source='user.profile', read_only=True)
+    image_renditions = RenditionsField(storage=Offer._meta.get_field('image').storage)
     min_price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False, read_only=True)
 
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description', 'created_at', 
+            'id', 'user', 'title', 'image', 'image_renditions', 'description', 'created_at', 
             'updated_at', 'details', 'min_price', 'min_delivery_time', 
             'user_details'
         ]
         read_only_fields = [
             'user', 'created_at', 'updated_at', 'min_price', 'min_delivery_time'
         ]
+        list_serializer_class = OfferListSerializer
 
     def to_representation(self, instance):
         """
@@ -92,7 +123,7 @@ class OfferSerializer(serializers.ModelSerializer):
         Validate Offer data.
         Ensure exactly three offer details are provided.
         """
-        details = self.initial_data.get('details')
+        details = data.get('details') or []
         
         if len(details) != 3:
             raise serializers.ValidationError("Exactly three offer details are required.")
@@ -107,24 +138,36 @@ class OfferSerializer(serializers.ModelSerializer):
         
         return data
     
+    def build_offer(self, user, validated_data):
+        """
+        Build an unsaved Offer instance and its unsaved Offerdetail instances.
+        The minimum price and delivery time are computed from the validated details.
+        """
+        details_data = validated_data.pop('details')
+        offer = Offer(
+            user=user,
+            min_price=min(detail['price'] for detail in details_data),
+            min_delivery_time=min(detail['delivery_time_in_days'] for detail in details_data),
+            **validated_data
+        )
+        details = [Offerdetail(offer=offer, **detail_data) for detail_data in details_data]
+        return offer, details
+
     def create(self, validated_data):
         """
         Create a new Offer instance.
-        Includes related Offerdetail instances.
+        Includes related Offerdetail instances, inserted with one bulk INSERT.
         """
-        details_data = validated_data.pop('details')
-        user = self.context['request'].user
-        offer = Offer.objects.create(user=user, **validated_data)
-        
-        for detail_data in details_data:
-            Offerdetail.objects.create(offer=offer, **detail_data)
+        offer, details = self.build_offer(self.context['request'].user, validated_data)
 
-        offer.update_min_values()
+        with transaction.atomic():
+            offer.save()
+            Offerdetail.objects.bulk_create(details)
         
         return offer
 
 
-class OfferDetailSerializer(serializers.ModelSerializer):
+class OfferDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for detailed offers.
 
@@ -133,11 +176,12 @@ class OfferDetailSerializer(serializers.ModelSerializer):
     """
     details = OfferdetailsSerializer(many=True, required=False)
     user_details = ProfileSerializer(source='user.profile', read_only=True)
+    image_renditions = RenditionsField(storage=Offer._meta.get_field('image').storage)
 
     class Meta:
         model = Offer
         fields = [
-            'id', 'user', 'title', 'image', 'description', 'created_at', 
+            'id', 'user', 'title', 'image', 'image_renditions', 'description', 'created_at', 
             'updated_at', 'details', 'min_price', 'min_delivery_time', 
             'user_details'
         ]
@@ -162,28 +206,58 @@ class OfferDetailSerializer(serializers.ModelSerializer):
         representation['user_details'] = filtered_user_details
 
         return representation
-    
+
+    def validate_details(self, details):
+        """
+        Ensure each offer type is given at most once.
+        """
+        offer_types = [detail['offer_type'] for detail in details if detail.get('offer_type')]
+        if len(offer_types) != len(set(offer_types)):
+            raise serializers.ValidationError("Each offer type may only be given once.")
+        return details
+
     def update(self, instance, validated_data):
         """
         Update an existing Offer instance.
         Includes related Offerdetail instances.
+
+        The existing details are loaded once and matched by offer type. Changed details
+        are written with one bulk UPDATE limited to the changed fields, new details with
+        one bulk INSERT, and the minimums are computed from the details in memory.
         """
         details_data = validated_data.pop('details', None)
-        instance = super().update(instance, validated_data)
-        
-        if details_data:
-            for detail_data in details_data:
-                offer_type = detail_data.get('offer_type')
-                if offer_type:
-                    detail_instance = instance.details.filter(offer_type=offer_type).first()
-                    
-                    if detail_instance:
-                        for attr, value in detail_data.items():
-                            setattr(detail_instance, attr, value)
-                        detail_instance.save()
-                    else:
-                        Offerdetail.objects.create(offer=instance, **detail_data)
-        
-        instance.update_min_values()
 
-        return instance
\ No newline at end of file
+        with transaction.atomic():
+            if details_data:
+                details = {detail.offer_type: detail for detail in instance.details.all()}
+                changed_details, changed_fields, new_details = [], set(), []
+
+                for detail_data in details_data:
+                    offer_type = detail_data.get('offer_type')
+                    if not offer_type:
+                        continue
+
+                    detail_instance = details.get(offer_type)
+                    if detail_instance is None:
+                        details[offer_type] = Offerdetail(offer=instance, **detail_data)
+                        new_details.append(details[offer_type])
+                        continue
+
+                    fields = [attr for attr, value in detail_data.items() if getattr(detail_instance, attr) != value]
+                    for attr in fields:
+                        setattr(detail_instance, attr, detail_data[attr])
+                    if fields:
+                        changed_details.append(detail_instance)
+                        changed_fields.update(fields)
+
+                if changed_details:
+                    Offerdetail.objects.bulk_update(changed_details, sorted(changed_fields))
+                if new_details:
+                    Offerdetail.objects.bulk_create(new_details)
+
+                validated_data['min_price'] = min(detail.price for detail in details.values())
+                validated_data['min_delivery_time'] = min(detail.delivery_time_in_days for detail in details.values())
+
+            instance = super().update(instance, validated_data)
+
+        return instance
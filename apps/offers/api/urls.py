@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import OfferListView, OfferDetailView
+from coderr_backend.async_views import select_view
+from .async_views import AsyncOfferListView
+from .views import OfferListView, OfferBatchView, OfferDetailView
 
 urlpatterns = [
-    path('', OfferListView.as_view(), name='offer-list'),
+    path('', select_view(OfferListView, AsyncOfferListView), name='offer-list'),
+    path('batch/', OfferBatchView.as_view(), name='offer-batch'),
     path('<int:pk>/', OfferDetailView.as_view(), name='offer-detail'),
 ]
@@ -4,12 +4,30 @@ from apps.offers.models import Offer, Offerdetail
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from .pagination import OfferPagination
-from .filters import OfferFilter
+from .filters import OfferFilter, OfferSearchFilter
 from .permissions import IsOwnerOrReadOnly
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.response import Response
 from .permissions import IsBusinessOrReadOnly
+from django.utils.decorators import method_decorator
+from coderr_backend.conditional import conditional
+from django.conf import settings
+from apps.offers import cache as offer_cache
+
+
+def offer_timestamps(pk):
+    """
+    Timestamps an offer representation depends on: the offer and its creator's profile.
+    """
+    return Offer.objects.filter(pk=pk).values_list('updated_at', 'user__profile__updated_at').first()
+
+
+def offerdetail_timestamps(pk):
+    """
+    Timestamp of an offer detail, taken from its offer, which is bumped whenever a detail changes.
+    """
+    return Offerdetail.objects.filter(pk=pk).values_list('offer__updated_at').first()
 
 
 class OfferListView(generics.ListCreateAPIView):
@@ -21,23 +39,74 @@ class OfferListView(generics.ListCreateAPIView):
     - creator_id: Filter by creator ID.
     - min_price: Filter by minimum price.
     - max_delivery_time: Filter by maximum delivery time.
+
+    Search:
+    - search: Full-text prefix search over title and description, ordered by rank.
     
     Permission:
     - IsBusinessOrReadOnly: Only business users can create, update, and delete offers.
 
-    
+    The queryset loads creator profiles and offer details in bulk,
+    so a page of offers is served with a constant number of queries.
 
+    Anonymous responses are cached for OFFER_LIST_CACHE_TIMEOUT seconds (0 disables it),
+    keyed by the normalized query string and the catalog version, which moves on every
+    change to an offer, offer detail or profile. The X-Cache header reports HIT or MISS.
     """
-    queryset = Offer.objects.all()
+    queryset = Offer.objects.with_related()
     serializer_class = OfferSerializer
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, OfferSearchFilter]
     filterset_class = OfferFilter
     ordering_fields = ['updated_at', 'min_price']
-    search_fields = ['title', 'description']
     pagination_class = OfferPagination
     permission_classes = [IsBusinessOrReadOnly]
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Newest first unless ordered or searched, and by ID among equal values,
+        # so pages neither overlap nor skip offers
+        return queryset.order_by(*(queryset.query.order_by or ['-updated_at']), 'id')
+
+    def list(self, request, *args, **kwargs):
+        timeout = getattr(settings, 'OFFER_LIST_CACHE_TIMEOUT', 0)
+        if not timeout or request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        cache = offer_cache.get_cache()
+        key = offer_cache.list_cache_key(request)
+        data = cache.get(key)
+        offer_cache.record_lookup(hit=data is not None)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
 
+
+class OfferBatchView(generics.CreateAPIView):
+    """
+    View for creating many offers in one request, e.g. when migrating a catalog.
+
+    Expects a list of offers in the same format as the offer list endpoint.
+    All offers are validated first and then created in a single transaction.
+
+    Permission:
+    - IsBusinessOrReadOnly: Only business users can create offers.
+    """
+    serializer_class = OfferSerializer
+    permission_classes = [IsAuthenticated, IsBusinessOrReadOnly]
+    max_batch_size = 100
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, allow_empty=False, max_length=self.max_batch_size)
+        return super().get_serializer(*args, **kwargs)
+
+
+@method_decorator(conditional(offer_timestamps), name='get')
+@method_decorator(conditional(offer_timestamps), name='patch')
 class OfferDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, and deleting offers.
@@ -45,10 +114,13 @@ class OfferDetailView(generics.RetrieveUpdateDestroyAPIView):
     Permission:
     - IsOwnerOrReadOnly: Only the owner of the offer can update or delete it.
 
+    GET supports conditional requests via ETag and Last-Modified,
+    PATCH honours If-Match for optimistic concurrency.
+
     Methods:
         destroy: Deletes an offer instance and returns a 200 OK response.
     """
-    queryset = Offer.objects.all()
+    queryset = Offer.objects.with_related()
     serializer_class = OfferDetailSerializer
     permission_classes = [IsOwnerOrReadOnly]
     http_method_names = ['get', 'patch', 'delete']
@@ -60,6 +132,8 @@ class OfferDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response({}, status=status.HTTP_204_NO_CONTENT)
 
 
+@method_decorator(conditional(offerdetail_timestamps), name='get')
+@method_decorator(conditional(offerdetail_timestamps), name='patch')
 class OfferdetailsDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, and deleting offer details.
@@ -67,6 +141,9 @@ class OfferdetailsDetailView(generics.RetrieveUpdateDestroyAPIView):
     Permission:
     - IsBusinessOrReadOnly: Only business users can create, update, and delete offer details.
 
+    GET supports conditional requests via ETag and Last-Modified,
+    PATCH honours If-Match for optimistic concurrency.
+
     Methods:
         perform_update: Updates an offer detail instance and updates related offer's minimum values.
     """
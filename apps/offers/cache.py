@@ -0,0 +1,70 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import urlencode
+
+
+CATALOG_VERSION_KEY = 'offers:catalog-version'
+HITS_KEY = 'offers:list:hits'
+MISSES_KEY = 'offers:list:misses'
+
+
+def get_cache():
+    """
+    Cache holding offer list responses, the OFFER_LIST_CACHE_ALIAS entry of CACHES.
+    """
+    return caches[getattr(settings, 'OFFER_LIST_CACHE_ALIAS', 'default')]
+
+
+def get_catalog_version():
+    """
+    Current catalog version, part of every cached offer list key.
+    """
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Invalidate all cached offer lists at once by moving to a new catalog version.
+
+    The version is a timestamp rather than a counter, so a version key that was evicted
+    or lost never brings back responses cached under an earlier version.
+    """
+    get_cache().set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+def list_cache_key(request):
+    """
+    Cache key of an offer list request: scheme, host and query string with sorted
+    parameters, so the same filters in a different order share one entry.
+    """
+    query = urlencode(sorted((key, sorted(values)) for key, values in request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(f'{request.scheme}://{request.get_host()}?{query}'.encode('utf-8')).hexdigest()
+    return f'offers:list:{get_catalog_version()}:{digest}'
+
+
+def record_lookup(hit):
+    """
+    Count a hit or a miss of the offer list cache.
+    """
+    cache = get_cache()
+    key = HITS_KEY if hit else MISSES_KEY
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_stats():
+    """
+    Hit and miss counters of the offer list cache.
+    """
+    stats = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {'hits': stats.get(HITS_KEY, 0), 'misses': stats.get(MISSES_KEY, 0)}
@@ -0,0 +1,34 @@
+from django.core.checks import Error, Tags, register
+from django.db import connections
+
+SEARCH_TRIGGERS = ['offers_offer_fts_insert', 'offers_offer_fts_delete', 'offers_offer_fts_update']
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs=None, databases=None, **kwargs):
+    """
+    Ensure the triggers keeping the SQLite FTS table in sync with the offers table exist.
+
+    SQLite drops them whenever a migration rebuilds the offers table, after which search
+    silently misses new and changed offers. Runs with `check --database` and on migrate.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT type, name FROM sqlite_master WHERE tbl_name IN ('offers_offer', 'offers_offer_fts')")
+            rows = cursor.fetchall()
+        if ('table', 'offers_offer_fts') not in rows:
+            # Not migrated yet, the search index migration creates the table and the triggers
+            continue
+        existing = {name for type, name in rows if type == 'trigger'}
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        if missing:
+            errors.append(Error(
+                f"Search triggers missing on the offers table: {', '.join(missing)}.",
+                hint="A migration rebuilt the table; create the triggers again as in 0008_offer_image_renditions.",
+                id='offers.E001',
+            ))
+    return errors
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from apps.offers.cache import bump_catalog_version
+from apps.offers.models import Offer
+
+
+class Command(BaseCommand):
+    """
+    Recomputes min_price and min_delivery_time of all offers from their details.
+
+    Offers are processed in primary key chunks, each with a single UPDATE statement,
+    e.g. after importing offers or details in bulk.
+    """
+    help = "Recomputes the minimum price and delivery time of all offers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Number of offers per UPDATE statement.")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        updated = 0
+
+        while True:
+            pks = list(
+                Offer.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+
+            updated += Offer.objects.filter(pk__gt=last_pk, pk__lte=pks[-1]).update_min_values()
+            last_pk = pks[-1]
+
+        # Queryset updates send no signals, so invalidate the cached offer lists here
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed the minimums of {updated} offers."))
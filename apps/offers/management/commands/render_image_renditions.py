@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from apps.offers.models import Offer
+from apps.users.models import Profile
+from coderr_backend.renditions import generate
+
+
+class Command(BaseCommand):
+    """
+    Renders the missing renditions of offer images and profile pictures.
+
+    Renditions are rendered when an image is uploaded. This command covers images
+    stored before renditions existed, whose rendering failed, or whose render was lost
+    because the worker process stopped, and with `--all`
+    renders every image again, e.g. after changing IMAGE_RENDITION_SIZES.
+    """
+    help = "Renders the missing renditions of offer and profile images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Render the renditions of all images again.")
+
+    def handle(self, *args, **options):
+        rendered = failed = 0
+
+        for model, field_name, renditions_field in [
+            (Offer, 'image', 'image_renditions'),
+            (Profile, 'file', 'file_renditions'),
+        ]:
+            queryset = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+            if not options['all']:
+                queryset = queryset.filter(**{renditions_field: {}})
+
+            for pk, name in queryset.values_list('pk', field_name).iterator():
+                try:
+                    generate(model, pk, field_name, renditions_field, name)
+                    rendered += 1
+                except OSError as exc:
+                    failed += 1
+                    self.stderr.write(f"Could not render {name}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} images, {failed} failed."))
@@ -0,0 +1,96 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:52
+
+import apps.offers.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE offers_offer_fts USING fts5(
+        title, description,
+        content='offers_offer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER offers_offer_fts_insert AFTER INSERT ON offers_offer BEGIN
+        INSERT INTO offers_offer_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER offers_offer_fts_delete AFTER DELETE ON offers_offer BEGIN
+        INSERT INTO offers_offer_fts(offers_offer_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER offers_offer_fts_update AFTER UPDATE OF title, description ON offers_offer BEGIN
+        INSERT INTO offers_offer_fts(offers_offer_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO offers_offer_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO offers_offer_fts(offers_offer_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS offers_offer_fts_insert",
+    "DROP TRIGGER IF EXISTS offers_offer_fts_delete",
+    "DROP TRIGGER IF EXISTS offers_offer_fts_update",
+    "DROP TABLE IF EXISTS offers_offer_fts",
+]
+
+POSTGRES_INDEX_NAME = 'offer_search_vector_idx'
+
+
+def postgres_search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Must match the vector built by apps.offers.search.PostgresSearchBackend
+    return GinIndex(SearchVector('title', 'description', config='english'), name=POSTGRES_INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates an FTS5 table with sync triggers on SQLite, or a GIN index on Postgres.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('offers', 'Offer'), postgres_search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('offers', 'Offer'), postgres_search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0005_alter_offer_min_delivery_time_alter_offer_min_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSearchEntry',
+            fields=[
+                ('offer', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='offers.offer')),
+                ('document', apps.offers.models.SearchDocumentField(db_column='offers_offer_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'offers_offer_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
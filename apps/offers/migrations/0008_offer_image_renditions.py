@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:43
+
+from importlib import import_module
+from django.db import migrations, models
+
+search_index = import_module('apps.offers.migrations.0006_offer_search_index')
+
+
+def restore_search_triggers(apps, schema_editor):
+    """
+    SQLite adds a JSON column by rebuilding the table, which drops the triggers
+    that keep the FTS table in sync, so they are created again.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in search_index.SQLITE_DROP[:3] + search_index.SQLITE_CREATE[1:]:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0007_offer_keyset_indexes'),
+    ]
+
+    operations = [
+        # Runs on both sides of the AddField, since unapplying it rebuilds the table as well
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='offer',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,45 @@
 from django.db import models
 from django.conf import settings
-from django.db.models import Min
+from django.db.models import Min, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class OfferQuerySet(models.QuerySet):
+    """
+    QuerySet for offers.
+
+    Methods:
+        with_related: Loads the creator profile and the offer details in bulk.
+        update_min_values: Recomputes the minimum price and delivery time in one UPDATE.
+    """
+    def with_related(self):
+        """
+        Joins the creator and their profile and prefetches the offer details,
+        so serializing a list of offers costs a constant number of queries.
+        """
+        return self.select_related('user__profile').prefetch_related(Prefetch('details'))
+
+    def update_min_values(self, **fields):
+        """
+        Sets min_price and min_delivery_time of all offers in the queryset from their
+        details with a single UPDATE ... SET col = (subquery) statement.
+        Additional fields to update can be passed as keyword arguments.
+        """
+        details = Offerdetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+        return self.update(
+            min_price=Coalesce(
+                Subquery(details.annotate(value=Min('price')).values('value')),
+                0,
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            ),
+            min_delivery_time=Coalesce(
+                Subquery(details.annotate(value=Min('delivery_time_in_days')).values('value')),
+                0,
+                output_field=models.PositiveIntegerField(),
+            ),
+            **fields,
+        )
 
 
 class Offer(models.Model):
@@ -11,6 +50,7 @@ class Offer(models.Model):
         user (ForeignKey): Reference to the user who created the offer.
         title (CharField): Title of the offer.
         image (ImageField): Optional image associated with the offer.
+        image_renditions (JSONField): Downsized versions of the image, see `coderr_backend.renditions`.
         description (TextField): Detailed description of the offer.
         created_at (DateTimeField): Timestamp when the offer was created.
         updated_at (DateTimeField): Timestamp when the offer was last updated.
@@ -24,11 +64,20 @@ class Offer(models.Model):
     )
     title = models.CharField(max_length=255)
     image = models.ImageField(upload_to='images/offers/', blank=True, null=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     min_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
     min_delivery_time = models.PositiveIntegerField(help_text="Minimum delivery time in days", default=0, editable=False)
+
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='offer_updated_at_id_idx'),
+            models.Index(fields=['min_price', 'id'], name='offer_min_price_id_idx'),
+        ]
     
     def __str__(self):
         return self.title 
@@ -36,13 +85,14 @@ class Offer(models.Model):
     def update_min_values(self):
         """
         Updates the minimum price and delivery time for the offer based on its details.
+        The values are computed in the database, and updated_at is bumped since the details changed.
+        The two values are deferred on the instance, so they are only loaded again if read,
+        and a later save() leaves them alone.
         """
-        min_price = self.details.aggregate(Min('price'))['price__min']
-        min_delivery_time = self.details.aggregate(Min('delivery_time_in_days'))['delivery_time_in_days__min']
-        
-        self.min_price = min_price or 0 
-        self.min_delivery_time = min_delivery_time or 0
-        self.save()
+        self.updated_at = timezone.now()
+        Offer.objects.filter(pk=self.pk).update_min_values(updated_at=self.updated_at)
+        for field in ('min_price', 'min_delivery_time'):
+            self.__dict__.pop(field, None)
 
 class Offerdetail(models.Model):
     """
@@ -76,4 +126,49 @@ class Offerdetail(models.Model):
     offer_type = models.CharField(max_length=10, choices=OFFER_TYPE_CHOICES)
 
     def __str__(self):
-        return f"{self.title} for {self.offer.title}"
\ No newline at end of file
+        return f"{self.title} for {self.offer.title}"
+
+
+class SearchDocumentField(models.TextField):
+    """
+    Hidden column of an SQLite FTS5 table that has the same name as the table.
+    Filtering it with the `match` lookup runs a full-text query over all indexed columns.
+    """
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class OfferSearchEntry(models.Model):
+    """
+    Entry of the SQLite FTS5 index over offer titles and descriptions.
+
+    The virtual table and the triggers keeping it in sync with the offers table are
+    created by a migration on SQLite only; other databases never query this model.
+
+    Attributes:
+        offer (OneToOneField): The indexed offer, joined on the FTS5 rowid.
+        document (SearchDocumentField): Hidden column used for MATCH queries.
+        rank (FloatField): BM25 rank of the entry for the current query, lower is better.
+    """
+    offer = models.OneToOneField(
+        Offer,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry'
+    )
+    document = SearchDocumentField(db_column='offers_offer_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'offers_offer_fts'
@@ -0,0 +1,95 @@
+import re
+from functools import reduce
+from operator import and_, or_
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+
+class ContainsSearchBackend:
+    """
+    Fallback search backend matching every term with icontains on title or description.
+    Works on every database but scans the whole offers table.
+    """
+    fields = ('title', 'description')
+
+    def search(self, queryset, terms):
+        conditions = [
+            reduce(or_, [Q(**{f'{field}__icontains': term}) for field in self.fields])
+            for term in terms
+        ]
+        return queryset.filter(reduce(and_, conditions))
+
+
+class FullTextSearchBackend:
+    """
+    Base class for full-text search backends.
+
+    The search terms are split into words, and every word is matched as a prefix,
+    so partial input while typing already finds offers. Results are ordered by rank,
+    after any ordering already applied to the queryset.
+    """
+    rank_ordering = None
+
+    def get_words(self, terms):
+        return [word for term in terms for word in re.findall(r'\w+', term)]
+
+    def search(self, queryset, terms):
+        words = self.get_words(terms)
+        if not words:
+            return queryset
+
+        ordering = queryset.query.order_by
+        queryset = self.match(queryset, words)
+        return queryset.order_by(*ordering, self.rank_ordering)
+
+    def match(self, queryset, words):
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(FullTextSearchBackend):
+    """
+    Search backend using the FTS5 table created by migration 0006 on SQLite.
+    Ranked with BM25, where lower values are better matches.
+    """
+    rank_ordering = 'search_entry__rank'
+
+    def match(self, queryset, words):
+        query = ' '.join(f'"{word}"*' for word in words)
+        return queryset.filter(search_entry__document__match=query)
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+    """
+    Search backend using a tsvector over title and description, backed by a GIN index.
+    """
+    rank_ordering = '-search_rank'
+
+    def match(self, queryset, words):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        # Must match the indexed expression created by migration 0006
+        vector = SearchVector('title', 'description', config='english')
+        query = SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config='english')
+        return queryset.annotate(
+            search_vector=vector,
+            search_rank=SearchRank(vector, query),
+        ).filter(search_vector=query)
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Returns the backend set in the OFFER_SEARCH_BACKEND setting as a dotted path,
+    or the full-text backend matching the database in use.
+    """
+    backend_path = getattr(settings, 'OFFER_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, ContainsSearchBackend)()
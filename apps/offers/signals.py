@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import Signal, receiver
+from coderr_backend import renditions
+from apps.offers.cache import bump_catalog_version
+from apps.offers.models import Offer, Offerdetail
+from apps.users.models import Profile
+
+
+# Sent after offers were inserted with bulk_create, which does not send post_save.
+# Receivers get the created offers as the `offers` argument.
+offers_bulk_created = Signal()
+
+
+# Everything shown in the offer list, including the creator's name, moves the
+# catalog to a new version and so invalidates all cached offer list responses.
+# The version moves once the change is committed, so a list read before the commit
+# is cached under the old version and never outlives it.
+
+@receiver([post_save, post_delete], sender=Offer)
+@receiver([post_save, post_delete], sender=Offerdetail)
+@receiver([post_save, post_delete], sender=Profile)
+@receiver(offers_bulk_created)
+def invalidate_offer_lists(sender, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+# Renditions of the offer image, rendered whenever a new image is saved
+
+@receiver(post_init, sender=Offer)
+def remember_offer_image(sender, instance, **kwargs):
+    instance._rendered_image = renditions.source_name(instance, 'image')
+
+
+@receiver(pre_save, sender=Offer)
+def reset_offer_image_renditions(sender, instance, **kwargs):
+    if renditions.source_name(instance, 'image') != instance._rendered_image:
+        instance.image_renditions = {}
+
+
+@receiver(post_save, sender=Offer)
+def render_offer_image(sender, instance, created=False, **kwargs):
+    name = renditions.source_name(instance, 'image')
+    if name and (created or name != instance._rendered_image):
+        renditions.schedule(Offer, instance.pk, 'image', 'image_renditions', name)
+    instance._rendered_image = name
+
+
+@receiver(offers_bulk_created)
+def render_bulk_created_offer_images(sender, offers, **kwargs):
+    for offer in offers:
+        render_offer_image(Offer, offer, created=True)
@@ -5,6 +5,26 @@ from apps.users.models import Profile
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from io import StringIO
+from django.core.cache import cache
+from apps.offers import cache as offer_cache
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, AsyncRequestFactory
+from apps.offers.api.async_views import AsyncOfferListView
+from apps.offers.checks import check_search_triggers
+from django.test import override_settings
+from unittest import mock
+from coderr_backend.query_budgets import QUERY_BUDGETS
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from io import BytesIO
+import json
+import os
+import shutil
+import tempfile
 
 class OfferCreateTest(APITestCase):
 
@@ -71,6 +91,63 @@ class OfferCreateTest(APITestCase):
         self.assertEqual(offer_types, {'basic', 'standard', 'premium'})
 
 
+class OfferBatchCreateTest(APITestCase):
+
+    def setUp(self):
+        # Create a business user and authenticate the client
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.profile = Profile.objects.create(user=self.user, type='business')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('offer-batch')
+
+    def build_offer_data(self, title):
+        return {
+            "title": title,
+            "description": "A batch offer",
+            "details": [
+                {"title": "Basic", "revisions": 1, "delivery_time_in_days": 5, "price": "100.00",
+                 "features": ["Basic feature"], "offer_type": "basic"},
+                {"title": "Standard", "revisions": 2, "delivery_time_in_days": 3, "price": "200.00",
+                 "features": ["Standard feature"], "offer_type": "standard"},
+                {"title": "Premium", "revisions": 3, "delivery_time_in_days": 2, "price": "50.00",
+                 "features": ["Premium feature"], "offer_type": "premium"},
+            ]
+        }
+
+    def test_create_offers_in_batch(self):
+        # Test that many offers are created with a constant number of queries
+        # Authenticate once first, so both requests resolve the token from the cache
+        self.client.get(reverse('offer-list'))
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.post(self.url, [self.build_offer_data("Offer 0")], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = [self.build_offer_data(f"Offer {index}") for index in range(1, 6)]
+        with CaptureQueriesContext(connection) as batch:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(batch.captured_queries), len(single.captured_queries))
+
+        self.assertEqual(Offer.objects.count(), 6)
+        self.assertEqual(Offerdetail.objects.count(), 18)
+
+        offer = Offer.objects.get(title="Offer 3")
+        self.assertEqual(offer.min_price, 50.00)
+        self.assertEqual(offer.min_delivery_time, 2)
+        self.assertEqual(offer.details.count(), 3)
+
+    def test_invalid_offer_rejects_whole_batch(self):
+        # Test that a single invalid offer prevents the whole batch from being created
+        invalid = self.build_offer_data("Invalid Offer")
+        invalid["details"] = invalid["details"][:2]
+
+        response = self.client.post(self.url, [self.build_offer_data("Valid Offer"), invalid], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Offer.objects.exists())
+
+
 class OfferDetailViewTests(APITestCase):
     def setUp(self):
         # Set up a test user, profile, and offer with details
@@ -124,6 +201,43 @@ class OfferDetailViewTests(APITestCase):
         self.assertEqual(self.basic_detail.price, 120.00)
         self.assertIn("Flyer", self.basic_detail.features)
 
+    def test_patch_offer_details_query_count(self):
+        # Test that a PATCH writes all tiers with one bulk UPDATE and one bulk INSERT, not one query per tier
+        single_tier = {"details": [{"offer_type": "basic", "price": 110.00, "revisions": 4, "title": "Basic Design",
+                                    "delivery_time_in_days": 5, "features": ["Logo Design"]}]}
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.patch(self.url, single_tier, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        all_tiers = {"details": [
+            {"offer_type": "basic", "price": 90.00, "revisions": 2, "title": "Basic Design",
+             "delivery_time_in_days": 4, "features": ["Logo Design"]},
+            {"offer_type": "standard", "price": 160.00, "revisions": 3, "title": "Standard Design",
+             "delivery_time_in_days": 7, "features": ["Logo Design", "Flyer"]},
+            {"offer_type": "premium", "price": 250.00, "revisions": 5, "title": "Premium Design",
+             "delivery_time_in_days": 3, "features": ["Logo Design", "Flyer", "Poster"]},
+        ]}
+        # Offer, details, savepoint, bulk UPDATE, INSERT, offer UPDATE, release, details for the response;
+        # the token is cached since the first request
+        with self.assertNumQueries(8):
+            response = self.client.patch(self.url, all_tiers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(single.captured_queries), 8)
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 90.00)
+        self.assertEqual(self.offer.min_delivery_time, 3)
+        self.assertEqual(self.offer.details.count(), 3)
+        self.assertEqual(self.offer.details.get(offer_type="standard").price, 160.00)
+
+    def test_patch_repeated_offer_type(self):
+        # Test that an offer type given twice is rejected, also when the offer has no detail of that type yet
+        premium = {"offer_type": "premium", "price": 250.00, "revisions": 5, "title": "Premium Design",
+                   "delivery_time_in_days": 3, "features": ["Poster"]}
+        response = self.client.patch(self.url, {"details": [premium, {**premium, "price": 300.00}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.offer.details.filter(offer_type="premium").exists())
+
     def test_delete_offer(self):
         # Test deleting an offer
         response = self.client.delete(self.url)
@@ -133,4 +247,435 @@ class OfferDetailViewTests(APITestCase):
         self.assertEqual(response.data, {})
         
         with self.assertRaises(Offer.DoesNotExist):
-            Offer.objects.get(pk=self.offer.pk)
\ No newline at end of file
+            Offer.objects.get(pk=self.offer.pk)
+
+    def test_conditional_get_offer(self):
+        # Test that a matching ETag or Last-Modified returns 304 without loading the offer
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        # Only the timestamp lookup, the token is cached since the first request
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Changes to the creator's profile show up in the offer, so they change the ETag
+        self.profile.first_name = "Changed"
+        self.profile.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        detail_url = reverse('offerdetail-detail', kwargs={'pk': self.basic_detail.pk})
+        detail_etag = self.client.get(detail_url)['ETag']
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_patch_offer_if_match(self):
+        # Test that PATCH with a stale If-Match is rejected and a current one is applied
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {"title": "First"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.patch(self.url, {"title": "Second"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.title, "First")
+
+        response = self.client.get(reverse('offer-detail', kwargs={'pk': 999}), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_image_renditions(self):
+        # Test that an uploaded image is rendered in every size, as JPEG and WebP, next to the original
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), 'red').save(buffer, 'JPEG')
+        upload = SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_RENDITIONS_SYNC=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(self.url, {'image': upload}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # Rendered after the response was built
+            self.assertEqual(response.data['image_renditions'], {})
+
+            response = self.client.get(self.url)
+
+        renditions = response.data['image_renditions']
+        self.assertEqual(set(renditions), {'thumbnail', 'small', 'medium'})
+        self.assertEqual((renditions['thumbnail']['width'], renditions['thumbnail']['height']), (160, 107))
+        self.assertEqual((renditions['medium']['width'], renditions['medium']['height']), (960, 640))
+        self.assertEqual(renditions['small']['url'], 'http://testserver/media/images/offers/photo_small.jpg')
+        self.assertEqual(renditions['small']['webp'], 'http://testserver/media/images/offers/photo_small.webp')
+        with Image.open(os.path.join(media_root, 'images/offers/photo_small.webp')) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (480, 320)))
+
+
+class OfferListQueryCountTests(APITestCase):
+    def setUp(self):
+        # Create ten offers, each with three details, from one business user
+        self.user = User.objects.create_user(username="business", password="testpass")
+        self.profile = Profile.objects.create(user=self.user, type='business')
+
+        for index in range(10):
+            offer = Offer.objects.create(user=self.user, title=f"Offer {index}", description="Test Description")
+            for offer_type in ['basic', 'standard', 'premium']:
+                Offerdetail.objects.create(
+                    offer=offer, title=f"{offer_type} package", revisions=1, delivery_time_in_days=3,
+                    price=100.00, features=["Logo Design"], offer_type=offer_type
+                )
+
+        self.url = reverse('offer-list')
+        offer_cache.get_cache().clear()
+
+    def test_list_query_count_is_constant(self):
+        # Count, offers joined with user and profile, prefetched details
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 10)
+
+        # A smaller page must not change the number of queries
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(self.url, {'page_size': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(len(small_page.captured_queries), 3)
+
+
+class OfferMinimumTests(APITestCase):
+    def setUp(self):
+        # Set up a business user and an offer with two details
+        self.user = User.objects.create_user(username="business", password="testpass")
+        self.profile = Profile.objects.create(user=self.user, type='business')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+        self.offer = Offer.objects.create(user=self.user, title="Test Offer", description="Test Description")
+        self.basic_detail = Offerdetail.objects.create(
+            offer=self.offer, title="Basic Design", revisions=2, delivery_time_in_days=5,
+            price=100.00, features=["Logo Design"], offer_type="basic"
+        )
+        self.standard_detail = Offerdetail.objects.create(
+            offer=self.offer, title="Standard Design", revisions=3, delivery_time_in_days=7,
+            price=150.00, features=["Logo Design", "Flyer"], offer_type="standard"
+        )
+
+    def test_patch_offer_detail_updates_minimums(self):
+        # Test that changing a detail recomputes the offer minimums in a single statement
+        url = reverse('offerdetail-detail', kwargs={'pk': self.basic_detail.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {"price": 200.00, "delivery_time_in_days": 9}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        offer_updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE "offers_offer"')]
+        self.assertEqual(len(offer_updates), 1)
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 150.00)
+        self.assertEqual(self.offer.min_delivery_time, 7)
+
+    def test_update_min_values_reads_nothing_back(self):
+        # Test that the recompute is a single UPDATE and the values are only loaded when read
+        Offerdetail.objects.filter(pk=self.basic_detail.pk).update(price=300, delivery_time_in_days=9)
+        with self.assertNumQueries(1):
+            self.offer.update_min_values()
+        with self.assertNumQueries(2):
+            self.assertEqual((self.offer.min_price, self.offer.min_delivery_time), (150, 7))
+
+    def test_recompute_offer_minimums_command(self):
+        # Test that the command refreshes the minimums of all offers in chunks
+        empty_offer = Offer.objects.create(user=self.user, title="Empty Offer", description="No details")
+        Offer.objects.update(min_price=999, min_delivery_time=99)
+
+        call_command('recompute_offer_minimums', chunk_size=1, stdout=StringIO())
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 100.00)
+        self.assertEqual(self.offer.min_delivery_time, 5)
+
+        empty_offer.refresh_from_db()
+        self.assertEqual(empty_offer.min_price, 0)
+        self.assertEqual(empty_offer.min_delivery_time, 0)
+
+
+class OfferSearchTests(APITestCase):
+    def setUp(self):
+        # Create offers with different titles and descriptions
+        self.user = User.objects.create_user(username="business", password="testpass")
+        self.profile = Profile.objects.create(user=self.user, type='business')
+
+        self.logo_offer = Offer.objects.create(user=self.user, title="Logo Design", description="Logos for your brand")
+        self.web_offer = Offer.objects.create(user=self.user, title="Web Development", description="Websites with a logo")
+        self.text_offer = Offer.objects.create(user=self.user, title="Copywriting", description="Texts for websites")
+
+        self.url = reverse('offer-list')
+
+    def search(self, term, **params):
+        response = self.client.get(self.url, {'search': term, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [offer['id'] for offer in response.data['results']]
+
+    def test_search_matches_prefixes_ordered_by_rank(self):
+        # Test that partial words match and title matches rank first
+        self.assertEqual(self.search("log"), [self.logo_offer.id, self.web_offer.id])
+        self.assertEqual(self.search("web"), [self.web_offer.id, self.text_offer.id])
+        self.assertEqual(self.search("websites text"), [self.text_offer.id])
+        self.assertEqual(self.search("design!"), [self.logo_offer.id])
+        self.assertEqual(self.search("photography"), [])
+
+    def test_search_keeps_requested_ordering(self):
+        # Test that an explicit ordering takes precedence over the rank
+        self.assertEqual(self.search("log", ordering="-updated_at"), [self.web_offer.id, self.logo_offer.id])
+
+    def test_search_index_follows_changes(self):
+        # Test that updated and deleted offers are kept in sync with the search index
+        self.text_offer.title = "Logo Copywriting"
+        self.text_offer.save()
+        self.assertIn(self.text_offer.id, self.search("logo"))
+
+        self.logo_offer.delete()
+        self.assertNotIn(self.logo_offer.id, self.search("logo"))
+        self.assertEqual(self.search("design"), [])
+
+    def test_search_triggers_check(self):
+        # Test that the migrations leave the sync triggers in place and the check reports a missing one
+        if connection.vendor != 'sqlite':
+            self.skipTest("The search triggers only exist on SQLite")
+        self.assertEqual(check_search_triggers(databases=['default']), [])
+
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER offers_offer_fts_update")
+        self.assertEqual([error.id for error in check_search_triggers(databases=['default'])], ['offers.E001'])
+
+
+class OfferPaginationTests(APITestCase):
+    def setUp(self):
+        # Create offers with repeated minimum prices
+        self.user = User.objects.create_user(username="business", password="testpass")
+        self.profile = Profile.objects.create(user=self.user, type='business')
+
+        prices = [300, 100, 200, 100, 400, 300, 100, 200, 300]
+        self.offers = [
+            Offer.objects.create(user=self.user, title=f"Offer {index}", description="Test", min_price=price)
+            for index, price in enumerate(prices)
+        ]
+        self.url = reverse('offer-list')
+        cache.clear()
+
+    def walk(self, url, params=None, link='next'):
+        # Follow the cursor links and collect the offer IDs of every page
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(offer['id'] for offer in response.data['results'])
+            if not response.data[link]:
+                return ids, response
+            response = self.client.get(response.data[link])
+
+    def test_cursor_pagination_breaks_ties_by_id(self):
+        # Test that walking forward and backward visits every offer exactly once
+        expected = [offer.id for offer in sorted(self.offers, key=lambda offer: (offer.min_price, offer.id))]
+
+        ids, last_page = self.walk(self.url, {'pagination': 'cursor', 'ordering': 'min_price', 'page_size': 2})
+        self.assertEqual(ids, expected)
+
+        previous_ids, first_page = self.walk(last_page.data['previous'], link='previous')
+        pages_before_last = len(expected) - len(last_page.data['results'])
+        self.assertEqual(sorted(previous_ids), sorted(expected[:pages_before_last]))
+
+    def test_cursor_pagination_descending(self):
+        # Test that descending orderings walk the offers in reverse order
+        expected = [offer.id for offer in sorted(self.offers, key=lambda offer: (offer.min_price, offer.id), reverse=True)]
+
+        ids, last_page = self.walk(self.url, {'pagination': 'cursor', 'ordering': '-min_price', 'page_size': 4})
+        self.assertEqual(ids, expected)
+
+    def test_page_number_pagination_breaks_ties_by_id(self):
+        # Test that page number pages neither overlap nor skip offers with equal values
+        for ordering, key in [('min_price', lambda offer: (offer.min_price, offer.id)),
+                              (None, lambda offer: (-offer.updated_at.timestamp(), offer.id))]:
+            ids = []
+            response = self.client.get(self.url, {'ordering': ordering or '', 'page_size': 2})
+            while True:
+                ids.extend(offer['id'] for offer in response.data['results'])
+                if not response.data['next']:
+                    break
+                response = self.client.get(response.data['next'])
+            self.assertEqual(ids, [offer.id for offer in sorted(self.offers, key=key)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(OFFER_LIST_COUNT_CACHE_TIMEOUT=60)
+    def test_cached_count(self):
+        # Test that the total count is only queried once for the same filters
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'min_price': 200, 'page_size': 4})
+        self.assertEqual(response.data['count'], 6)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'min_price': 200, 'page_size': 4, 'page': 2})
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+@override_settings(OFFER_LIST_CACHE_TIMEOUT=60)
+class OfferListCacheTests(APITestCase):
+    def setUp(self):
+        # Set up a business user with two offers
+        self.user = User.objects.create_user(username="business", password="testpass")
+        self.profile = Profile.objects.create(user=self.user, type='business')
+        self.token = Token.objects.create(user=self.user)
+        self.offers = [
+            Offer.objects.create(user=self.user, title=f"Offer {index}", description="Test", min_price=100 * index)
+            for index in range(1, 3)
+        ]
+        self.url = reverse('offer-list')
+        offer_cache.get_cache().clear()
+
+    def test_anonymous_list_is_cached(self):
+        # Test that the same filters in any order are served from the cache without queries
+        response = self.client.get(self.url, {'min_price': 100, 'ordering': 'min_price'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url + '?ordering=min_price&min_price=100')
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.json(), response.json())
+
+        response = self.client.get(self.url, {'min_price': 200})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(offer_cache.get_stats(), {'hits': 1, 'misses': 2})
+
+    def test_changes_invalidate_cache(self):
+        # Test that saving an offer, an offer detail or a profile invalidates the cached lists
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[0].title = "Renamed"
+            self.offers[0].save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn("Renamed", [offer['title'] for offer in response.data['results']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Offerdetail.objects.create(
+                offer=self.offers[1], title="Basic", revisions=1, delivery_time_in_days=3,
+                price=50.00, features=["Logo Design"], offer_type="basic"
+            )
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.first_name = "Changed"
+            self.profile.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['user_details']['first_name'], "Changed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[1].delete()
+        self.assertEqual(self.client.get(self.url).data['count'], 1)
+
+    def test_list_read_before_commit_is_invalidated(self):
+        # Test that the catalog version only moves on commit, so a list read while the
+        # change is uncommitted is cached under the old version and dropped by the commit
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[0].title = "Renamed"
+            self.offers[0].save()
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_authenticated_list_is_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotIn('X-Cache', response)
+
+    @override_settings(OFFER_LIST_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertNotIn('X-Cache', response)
+
+    def test_async_list(self):
+        # Test that the async variant returns the same pages and shares the response cache
+        view = AsyncOfferListView.as_view()
+        for params in ({'ordering': '-min_price'}, {'min_price': 150}, {'page': 2, 'page_size': 1}, {'page': 9}):
+            response = self.client.get(self.url, params)
+            async_response = async_to_sync(view)(AsyncRequestFactory().get(self.url, params))
+            self.assertEqual(async_response.status_code, response.status_code)
+            self.assertEqual(async_response.content, response.content)
+            if response.status_code == status.HTTP_200_OK:
+                self.assertEqual(async_response['X-Cache'], 'HIT')
+
+        offer_cache.get_cache().clear()
+        async_response = async_to_sync(view)(AsyncRequestFactory().get(self.url, {'ordering': 'min_price'}))
+        self.assertEqual(async_response['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url, {'ordering': 'min_price'})['X-Cache'], 'HIT')
+
+
+@override_settings(INSTRUMENTATION_SAMPLE_RATE=1, SLOW_QUERY_THRESHOLD_MS=100)
+class RequestInstrumentationTests(APITestCase):
+    def setUp(self):
+        # Set up a business user with an offer, and an empty offer list cache
+        self.user = User.objects.create_user(username="business", password="testpass")
+        Profile.objects.create(user=self.user, type='business')
+        Offer.objects.create(user=self.user, title="Offer", description="Test", min_price=100)
+        self.url = reverse('offer-list')
+        offer_cache.get_cache().clear()
+
+    def test_server_timing_and_log_line(self):
+        # Test that a sampled request reports its queries and timings in a header and a JSON log line
+        with self.assertLogs('coderr_backend.instrumentation', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'serialize', 'view'})
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual((line['method'], line['path'], line['status']), ('GET', self.url, 200))
+        self.assertEqual(line['queries'], len(queries))
+        self.assertGreater(line['serialize_ms'], 0)
+        self.assertGreaterEqual(line['view_ms'], line['db_ms'] + line['serialize_ms'])
+        self.assertEqual(line['slow_queries'], [])
+        self.assertEqual((line['route'], line['query_budget']), ('offer-list', QUERY_BUDGETS['offer-list']['GET']))
+
+    def test_over_budget_is_a_warning(self):
+        with mock.patch.dict(QUERY_BUDGETS, {'offer-list': {'GET': 0}}), \
+                self.assertLogs('coderr_backend.instrumentation', 'WARNING') as logs:
+            self.client.get(self.url)
+        self.assertEqual(json.loads(logs.records[0].getMessage())['query_budget'], 0)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_logged_with_call_site(self):
+        with self.assertLogs('coderr_backend.instrumentation', 'WARNING') as logs:
+            self.client.get(self.url)
+
+        slow_queries = json.loads(logs.records[0].getMessage())['slow_queries']
+        self.assertTrue(slow_queries)
+        self.assertTrue(any('FROM "offers_offer"' in query['sql'] for query in slow_queries))
+        for query in slow_queries:
+            self.assertRegex(query['location'], r'^apps/offers/api/\w+\.py:\d+ in \w+$')
+
+    def test_unsampled_requests(self):
+        # Test that requests are not instrumented at a sample rate of 0 or outside the instrumented paths
+        with override_settings(INSTRUMENTATION_SAMPLE_RATE=0):
+            self.assertNotIn('Server-Timing', self.client.get(self.url))
+        self.assertNotIn('Server-Timing', self.client.get(reverse('base-info')))
+
+    def test_asgi_request(self):
+        # Test that under ASGI the queries of the view are counted as well
+        with self.assertLogs('coderr_backend.instrumentation', 'INFO') as logs:
+            response = async_to_sync(AsyncClient().get)(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(json.loads(logs.records[0].getMessage())['queries'], 0)
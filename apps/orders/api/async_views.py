@@ -0,0 +1,17 @@
+from rest_framework import status
+from coderr_backend.async_views import AsyncAPIView
+from .views import OrderCountView, aget_business_order_stats
+
+
+class AsyncOrderCountView(AsyncAPIView):
+    """
+    Async variant of `OrderCountView`, reading the order counters with the async ORM.
+    """
+    sync_view = OrderCountView
+
+    async def aget(self, request, business_user_id):
+        stats = await aget_business_order_stats(business_user_id)
+        if stats is None:
+            return self.render({"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return self.render({"order_count": stats.in_progress_count})
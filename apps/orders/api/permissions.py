@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission
+from apps.users.authentication import has_profile_type
 
 
 class IsCustomerForPost(BasePermission):
@@ -8,7 +9,7 @@ class IsCustomerForPost(BasePermission):
     """
     def has_permission(self, request, view):
         if request.method == 'POST':
-            return request.user.profile.type == 'customer'
+            return has_profile_type(request.user, 'customer')
         return True
 
 
@@ -1,11 +1,15 @@
 from rest_framework import serializers
 from ..models import Order
 from apps.offers.models import Offerdetail
+from coderr_backend.instrumentation import TimedSerializerMixin
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     OrderSerializer is responsible for serializing and deserializing Order objects.
+
+    The package fields are read from the snapshot stored on the order,
+    so serializing a list of orders does not touch the offer tables.
     
     Fields:
         - id: Unique identifier for the order.
@@ -23,26 +27,14 @@ class OrderSerializer(serializers.ModelSerializer):
         - updated_at: Timestamp when the order was last updated. (Read-only)
     
     Methods:
-        - get_business_user: Returns the ID of the business user (seller).
-        - get_title: Returns the title of the order.
-        - get_revisions: Returns the number of revisions.
-        - get_delivery_time_in_days: Returns the delivery time in days.
-        - get_price: Returns the price of the order.
-        - get_features: Returns the features of the order.
-        - get_offer_type: Returns the offer type of the package.
         - create: Custom create method to handle offer detail and set the customer user.
     """
     offer_detail_id = serializers.PrimaryKeyRelatedField(
-        queryset=Offerdetail.objects.all(), write_only=True
+        queryset=Offerdetail.objects.select_related('offer'), write_only=True
     )
     customer_user = serializers.PrimaryKeyRelatedField(read_only=True)
-    business_user = serializers.SerializerMethodField(read_only=True)
-    title = serializers.SerializerMethodField(read_only=True)
-    revisions = serializers.SerializerMethodField(read_only=True)
-    delivery_time_in_days = serializers.SerializerMethodField(read_only=True)
-    price = serializers.SerializerMethodField(read_only=True)
-    features = serializers.SerializerMethodField(read_only=True)
-    offer_type = serializers.SerializerMethodField(read_only=True)
+    business_user = serializers.PrimaryKeyRelatedField(read_only=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False, read_only=True)
 
     class Meta:
         model = Order
@@ -55,27 +47,6 @@ class OrderSerializer(serializers.ModelSerializer):
                             'delivery_time_in_days', 'price', 'features', 'offer_type', 
                             'status', 'created_at', 'updated_at']
 
-    def get_business_user(self, obj):
-        return obj.business_user.id
-
-    def get_title(self, obj):
-        return obj.title
-
-    def get_revisions(self, obj):
-        return obj.revisions
-
-    def get_delivery_time_in_days(self, obj):
-        return obj.delivery_time_in_days
-
-    def get_price(self, obj):
-        return obj.price
-
-    def get_features(self, obj):
-        return obj.features
-
-    def get_offer_type(self, obj):
-        return obj.offer_type
-
     def create(self, validated_data):
         offer_detail = validated_data.pop('offer_detail_id')
         validated_data['offer_detail'] = offer_detail
@@ -1,6 +1,7 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from ..models import Order
+from ..models import BusinessOrderStats, Order
 from .serializers import OrderSerializer
 from .permissions import IsCustomerForPost, IsStaffOrReadOnlyForDestroy
 from rest_framework import status
@@ -8,28 +9,46 @@ from rest_framework.response import Response
 from django.contrib.auth.models import User
 from rest_framework.views import APIView
 from apps.users.models import Profile
+from django.db import transaction
+from django.db.models import Q
+from coderr_backend.exports import ExportContentNegotiation, export_response
 
 class OrderViewSet(viewsets.ModelViewSet):
     """
     This ViewSet class provides CRUD functionalities for orders.
-    - Authenticated users can view their own orders.
+    - Authenticated users can view their own orders, newest first.
     - Staff members can view all orders.
     - Only the status of an order can be updated.
     - Orders can be deleted by staff users.
+    - `export/` streams all visible orders as CSV or NDJSON.
+
+    Writes run in a transaction together with the business order counters.
     """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, IsStaffOrReadOnlyForDestroy, IsCustomerForPost]
+    export_fields = [
+        'id', 'customer_user', 'business_user', 'title', 'revisions', 'delivery_time_in_days',
+        'price', 'features', 'offer_type', 'status', 'created_at', 'updated_at',
+    ]
 
     def get_queryset(self):
         user = self.request.user
 
         if user.is_staff:
-            return Order.objects.all()
-        return Order.objects.filter(customer_user=user) | Order.objects.filter(offer_detail__offer__user=user)
+            queryset = Order.objects.order_by('-created_at')
+        else:
+            queryset = Order.objects.filter(Q(customer_user=user) | Q(business_user=user)).order_by('-created_at')
 
+        # Lock the order during a status change, so concurrent updates count it once
+        if self.request.method in ('PUT', 'PATCH'):
+            queryset = queryset.select_for_update()
+        return queryset
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(customer_user=self.request.user)
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
 
         if list(request.data.keys()) != ["status"] or request.data["status"] not in dict(Order.STATUS_CHOICES):
@@ -43,32 +62,63 @@ class OrderViewSet(viewsets.ModelViewSet):
         instance.save(update_fields=['status'])
         return Response(self.get_serializer(instance).data)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
         
         return Response({}, status=status.HTTP_200_OK)
 
+    @action(detail=False, content_negotiation_class=ExportContentNegotiation)
+    def export(self, request):
+        """
+        Streams the complete order history the user can see, newest first.
+        """
+        return export_response(request, self.get_queryset(), self.export_fields, 'orders')
+
+
+def get_business_order_stats(business_user_id):
+    """
+    Returns the order counters of a business profile in a single query,
+    or None if there is no business profile with the given ID.
+    """
+    profile = Profile.objects.select_related('user__order_stats').filter(id=business_user_id, type='business').first()
+    if profile is None:
+        return None
+
+    try:
+        return profile.user.order_stats
+    except BusinessOrderStats.DoesNotExist:
+        return BusinessOrderStats(business_user=profile.user)
+
+
+async def aget_business_order_stats(business_user_id):
+    """
+    Async variant of `get_business_order_stats`.
+    """
+    profile = await Profile.objects.select_related('user__order_stats').filter(id=business_user_id, type='business').afirst()
+    if profile is None:
+        return None
+
+    try:
+        return profile.user.order_stats
+    except BusinessOrderStats.DoesNotExist:
+        return BusinessOrderStats(business_user=profile.user)
+
 
 class OrderCountView(APIView):
     """
     Returns the number of ongoing orders for a specific business user.
     """
     def get(self, request, business_user_id):
-        try:
-            business_user = Profile.objects.get(id=business_user_id)
-        except Profile.DoesNotExist:
+        stats = get_business_order_stats(business_user_id)
+        if stats is None:
             return Response({"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        if business_user.type != 'business':
-            return Response({"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND)
-        else:
-            order_count = Order.objects.filter(
-                offer_detail__offer__user=business_user.user,
-                status='in_progress'
-            ).count()
-        
-        return Response({"order_count": order_count}, status=status.HTTP_200_OK)
+        return Response({"order_count": stats.in_progress_count}, status=status.HTTP_200_OK)
 
 
 class CompletedOrderCountView(APIView):
@@ -76,17 +126,25 @@ class CompletedOrderCountView(APIView):
     Returns the number of completed orders for a specific business user.
     """
     def get(self, request, business_user_id):
-        try:
-            business_user = Profile.objects.get(id=business_user_id)
-        except Profile.DoesNotExist:
+        stats = get_business_order_stats(business_user_id)
+        if stats is None:
             return Response({"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        if business_user.type != 'business':
+        return Response({"completed_order_count": stats.completed_count}, status=status.HTTP_200_OK)
+
+
+class OrderStatsView(APIView):
+    """
+    Returns all order counters for a specific business user.
+    """
+    def get(self, request, business_user_id):
+        stats = get_business_order_stats(business_user_id)
+        if stats is None:
             return Response({"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND)
-        else:
-            completed_order_count = Order.objects.filter(
-                offer_detail__offer__user=business_user.user,
-            status='completed'
-        ).count()
-        
-        return Response({"completed_order_count": completed_order_count}, status=status.HTTP_200_OK)
+
+        data = {
+            "order_count": stats.in_progress_count,
+            "completed_order_count": stats.completed_count,
+            "cancelled_order_count": stats.cancelled_count,
+        }
+        return Response(data, status=status.HTTP_200_OK)
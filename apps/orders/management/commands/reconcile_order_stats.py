@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.orders.models import BusinessOrderStats, Order
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the order counters of all business users from the orders table.
+
+    The counters are maintained by signals, which bulk operations bypass.
+    Run this command periodically (e.g. from cron) to repair any drift.
+    """
+    help = "Recomputes the per-business order counters."
+
+    def handle(self, *args, **options):
+        counters = BusinessOrderStats.count_orders(Order.objects.all())
+
+        with transaction.atomic():
+            BusinessOrderStats.objects.all().delete()
+            BusinessOrderStats.objects.bulk_create(
+                [BusinessOrderStats(business_user_id=user_id, **fields) for user_id, fields in counters.items()],
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt order counters for {len(counters)} business users."))
@@ -0,0 +1,115 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_snapshot_fields(apps, schema_editor):
+    """
+    Copies the package data of the ordered offer detail into existing orders.
+    """
+    Order = apps.get_model('orders', 'Order')
+    fields = ['business_user', 'title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type']
+
+    batch = []
+    for order in Order.objects.select_related('offer_detail__offer').iterator(chunk_size=1000):
+        offer_detail = order.offer_detail
+        order.business_user_id = offer_detail.offer.user_id
+        order.title = offer_detail.offer.title
+        order.revisions = offer_detail.revisions
+        order.delivery_time_in_days = offer_detail.delivery_time_in_days
+        order.price = offer_detail.price
+        order.features = offer_detail.features
+        order.offer_type = offer_detail.offer_type
+        batch.append(order)
+
+        if len(batch) >= 1000:
+            Order.objects.bulk_update(batch, fields)
+            batch = []
+
+    if batch:
+        Order.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0005_alter_offer_min_delivery_time_alter_offer_min_price'),
+        ('orders', '0002_order_delete_orders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='business_user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='business_orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(choices=[('basic', 'Basic'), ('standard', 'Standard'), ('premium', 'Premium')], max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='revisions',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='title',
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_snapshot_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='business_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='business_orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(choices=[('basic', 'Basic'), ('standard', 'Standard'), ('premium', 'Premium')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='revisions',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='title',
+            field=models.CharField(max_length=255),
+        ),
+    ]
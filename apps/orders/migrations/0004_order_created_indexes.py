@@ -0,0 +1,24 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0005_alter_offer_min_delivery_time_alter_offer_min_price'),
+        ('orders', '0003_order_snapshot_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer_user', '-created_at'], name='order_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['business_user', '-created_at'], name='order_business_created_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+STATUS_FIELDS = {
+    'in_progress': 'in_progress_count',
+    'completed': 'completed_count',
+    'cancelled': 'cancelled_count',
+}
+
+
+def build_order_stats(apps, schema_editor):
+    """
+    Counts the existing orders per business user and status.
+    """
+    Order = apps.get_model('orders', 'Order')
+    BusinessOrderStats = apps.get_model('orders', 'BusinessOrderStats')
+
+    stats = {}
+    for row in Order.objects.order_by().values('business_user_id', 'status').annotate(count=models.Count('id')):
+        entry = stats.setdefault(row['business_user_id'], BusinessOrderStats(business_user_id=row['business_user_id']))
+        setattr(entry, STATUS_FIELDS[row['status']], row['count'])
+
+    BusinessOrderStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_created_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessOrderStats',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('in_progress_count', models.BigIntegerField(default=0)),
+                ('completed_count', models.BigIntegerField(default=0)),
+                ('cancelled_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'business order stats',
+            },
+        ),
+        migrations.RunPython(build_order_stats, migrations.RunPython.noop),
+    ]
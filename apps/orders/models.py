@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
 from apps.offers.models import Offerdetail
 from django.conf import settings
 
@@ -7,23 +8,26 @@ class Order(models.Model):
     """
     Order model representing a customer's order for a specific offer package.
 
+    The purchased package is copied into the order when it is created, so orders
+    can be listed without joining the offer tables and stay unchanged when the
+    offer package is edited later.
+
     Attributes:
         customer_user (ForeignKey): Reference to the user who placed the order.
+        business_user (ForeignKey): Reference to the user who created the offer.
         offer_detail (ForeignKey): Reference to the specific offer package.
+        title (CharField): Title of the offer at the time of the order.
+        revisions (IntegerField): Number of revisions allowed for the package.
+        delivery_time_in_days (PositiveIntegerField): Delivery time in days for the package.
+        price (DecimalField): Price of the package.
+        features (JSONField): Features of the package.
+        offer_type (CharField): Type of the package.
         status (CharField): Current status of the order.
         created_at (DateTimeField): Timestamp when the order was created.
         updated_at (DateTimeField): Timestamp when the order was last updated.
 
-    Properties:
-        business_user: Returns the user associated with the offer.
-        title: Returns the title of the offer.
-        revisions: Returns the number of revisions allowed for the offer.
-        delivery_time_in_days: Returns the delivery time in days for the order.
-        price: Returns the price of the order.
-        features: Returns the features of the package.
-        offer_type: Returns the type of the package.
-
     Methods:
+        snapshot_offer_detail: Copies the package data from the offer detail.
         __str__: Returns a string representation of the order.
     """
     STATUS_CHOICES = [
@@ -33,38 +37,119 @@ class Order(models.Model):
     ]
     
     customer_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='customer_orders')
+    business_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='business_orders')
     offer_detail = models.ForeignKey(Offerdetail, on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    revisions = models.IntegerField()
+    delivery_time_in_days = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    features = models.JSONField()
+    offer_type = models.CharField(max_length=10, choices=Offerdetail.OFFER_TYPE_CHOICES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def business_user(self):
-        return self.offer_detail.offer.user  
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer_user', '-created_at'], name='order_customer_created_idx'),
+            models.Index(fields=['business_user', '-created_at'], name='order_business_created_idx'),
+        ]
 
-    @property
-    def title(self):
-        return self.offer_detail.offer.title  
+    def snapshot_offer_detail(self):
+        """
+        Copies the purchased package and its business user from the offer detail.
+        """
+        offer_detail = self.offer_detail
+        self.business_user_id = offer_detail.offer.user_id
+        self.title = offer_detail.offer.title
+        self.revisions = offer_detail.revisions
+        self.delivery_time_in_days = offer_detail.delivery_time_in_days
+        self.price = offer_detail.price
+        self.features = offer_detail.features
+        self.offer_type = offer_detail.offer_type
 
-    @property
-    def revisions(self):
-        return self.offer_detail.revisions  
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.snapshot_offer_detail()
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Order {self.id} - {self.title} - {self.status}"
 
-    @property
-    def delivery_time_in_days(self):
-        return self.offer_detail.delivery_time_in_days  
 
-    @property
-    def price(self):
-        return self.offer_detail.price  
+class BusinessOrderStats(models.Model):
+    """
+    Order counters per business user, read by the order count endpoints.
 
-    @property
-    def features(self):
-        return self.offer_detail.features  
+    The counters are kept up to date by signal handlers in `apps.orders.signals`
+    and can be rebuilt from the orders table with the `reconcile_order_stats` command.
 
-    @property
-    def offer_type(self):
-        return self.offer_detail.offer_type 
+    Attributes:
+        business_user (OneToOneField): The business user the counters belong to.
+        in_progress_count (BigIntegerField): Number of orders in progress.
+        completed_count (BigIntegerField): Number of completed orders.
+        cancelled_count (BigIntegerField): Number of cancelled orders.
+
+    Methods:
+        apply: Atomically adds per-status deltas to the counters of a business user.
+        rebuild: Recomputes the counters of a business user from the orders table.
+    """
+    STATUS_FIELDS = {
+        'in_progress': 'in_progress_count',
+        'completed': 'completed_count',
+        'cancelled': 'cancelled_count',
+    }
+
+    business_user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='order_stats'
+    )
+    in_progress_count = models.BigIntegerField(default=0)
+    completed_count = models.BigIntegerField(default=0)
+    cancelled_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'business order stats'
 
     def __str__(self):
-        return f"Order {self.id} - {self.title} - {self.status}"
\ No newline at end of file
+        return f"Order stats of {self.business_user_id}"
+
+    @classmethod
+    def count_orders(cls, orders):
+        """
+        Counts the given orders per business user and returns the counter fields.
+        """
+        counters = {}
+        for row in orders.order_by().values('business_user_id', 'status').annotate(count=Count('id')):
+            fields = counters.setdefault(row['business_user_id'], dict.fromkeys(cls.STATUS_FIELDS.values(), 0))
+            fields[cls.STATUS_FIELDS[row['status']]] = row['count']
+        return counters
+
+    @classmethod
+    def rebuild(cls, business_user_id):
+        counters = cls.count_orders(Order.objects.filter(business_user_id=business_user_id))
+        defaults = counters.get(business_user_id, dict.fromkeys(cls.STATUS_FIELDS.values(), 0))
+        stats, created = cls.objects.update_or_create(business_user_id=business_user_id, defaults=defaults)
+        return stats
+
+    @classmethod
+    def apply(cls, business_user_id, deltas, create_missing=True):
+        """
+        Adds the per-status deltas in a single UPDATE. If the business user has
+        no counters yet, a zeroed row is created under a row lock first, so concurrent
+        first orders each add their own delta instead of counting each other's.
+        """
+        fields = {
+            cls.STATUS_FIELDS[status]: F(cls.STATUS_FIELDS[status]) + delta
+            for status, delta in deltas.items() if delta
+        }
+        if not fields:
+            return
+
+        updated = cls.objects.filter(business_user_id=business_user_id).update(**fields)
+        if not updated and create_missing:
+            with transaction.atomic():
+                cls.objects.select_for_update().get_or_create(business_user_id=business_user_id)
+                cls.objects.filter(business_user_id=business_user_id).update(**fields)
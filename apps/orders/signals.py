@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from coderr_backend.signals import remember_loaded_values
+from apps.orders.models import BusinessOrderStats, Order
+
+
+remember_loaded_values(Order, _stats_status='status')
+
+
+@receiver(post_save, sender=Order)
+def count_saved_order(sender, instance, created, **kwargs):
+    if created:
+        BusinessOrderStats.apply(instance.business_user_id, {instance.status: 1})
+    elif instance._stats_status and instance._stats_status != instance.status:
+        BusinessOrderStats.apply(instance.business_user_id, {instance._stats_status: -1, instance.status: 1})
+    instance._stats_status = instance.status
+
+
+@receiver(post_delete, sender=Order)
+def count_deleted_order(sender, instance, **kwargs):
+    # The business user may be deleted in the same cascade, so missing counters are not recreated
+    if instance._stats_status:
+        BusinessOrderStats.apply(instance.business_user_id, {instance._stats_status: -1}, create_missing=False)
@@ -1,11 +1,26 @@
+import csv
+import gzip
+import json
+import warnings
+from unittest import mock
+from io import StringIO
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 from apps.users.models import Profile
-from apps.orders.models import Order
+from apps.orders.models import BusinessOrderStats, Order
 from apps.offers.models import Offer, Offerdetail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from concurrent.futures import ThreadPoolExecutor
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, AsyncRequestFactory
+from apps.orders.api.async_views import AsyncOrderCountView
 
 class OrderTests(APITestCase):
     """
@@ -50,6 +65,23 @@ class OrderTests(APITestCase):
         response = self.client.post(self.order_url, {"offer_detail_id": self.offer_detail.id}, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_create_order_loads_profile_once(self):
+        # Test that the profile is loaded with the token and reused by the permission checks
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token.key)
+        for expected_profile_queries in (1, 0):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.order_url, {"offer_detail_id": self.offer_detail.id}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            profile_queries = [query for query in queries.captured_queries if 'users_profile' in query['sql']]
+            self.assertEqual(len(profile_queries), expected_profile_queries)
+
+    def test_create_order_without_profile(self):
+        # Test that a user without a profile is rejected instead of causing an error
+        user = User.objects.create_user(username="noprofile", password="testpass")
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.order_url, {"offer_detail_id": self.offer_detail.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_list_orders(self):
         # Test if a customer can retrieve their orders
         Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail)
@@ -89,3 +121,212 @@ class OrderTests(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token.key)
         response = self.client.delete(self.order_detail_url(order.id))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_order_keeps_snapshot_of_offer_detail(self):
+        # Test that an order keeps the purchased package when the offer detail changes later
+        order = Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail)
+        self.assertEqual(order.business_user, self.business_user)
+
+        self.offer_detail.price = 300.00
+        self.offer_detail.features = ["Logo Design"]
+        self.offer_detail.save()
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token.key)
+        # Token lookup and a single query on the orders table
+        with self.assertNumQueries(2):
+            response = self.client.get(self.order_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['business_user'], self.business_user.id)
+        self.assertEqual(response.data[0]['title'], "Logo Design")
+        self.assertEqual(response.data[0]['price'], 150.00)
+        self.assertEqual(response.data[0]['features'], ["Logo Design", "Business Cards"])
+        self.assertEqual(response.data[0]['offer_type'], "basic")
+
+    def test_export_orders(self):
+        # Test that the export streams the orders the user can see, as CSV or NDJSON
+        other_customer = User.objects.create_user(username="other", password="testpass")
+        first = Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail)
+        second = Order.objects.create(customer_user=other_customer, offer_detail=self.offer_detail, status='completed')
+        export_url = reverse('order-export')
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.customer_token.key)
+        response = self.client.get(export_url, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="orders.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['id'] for row in rows], [str(first.id)])
+        self.assertEqual(rows[0]['price'], '150.00')
+        self.assertEqual(json.loads(rows[0]['features']), ["Logo Design", "Business Cards"])
+
+        # The business user sees both orders, newest first
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.business_token.key)
+        response = self.client.get(export_url, {'export_format': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        rows = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [second.id, first.id])
+        self.assertEqual((rows[0]['customer_user'], rows[0]['status'], rows[0]['price']), (other_customer.id, 'completed', 150.0))
+
+        response = self.client.get(export_url, {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.credentials()
+        self.assertEqual(self.client.get(export_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_orders_under_asgi(self):
+        # Test that under ASGI the export streams from an async iterator, so Django does not load it into memory
+        orders = [Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail) for index in range(3)]
+
+        async def export(**headers):
+            response = await AsyncClient().get(reverse('order-export'), {'export_format': 'ndjson'},
+                                               headers={'Authorization': 'Token ' + self.business_token.key, **headers})
+            return response, b''.join([chunk async for chunk in response.streaming_content])
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response, content = async_to_sync(export)()
+            compressed_response, compressed = async_to_sync(export)(accept_encoding='gzip')
+        self.assertEqual([str(warning.message) for warning in caught if 'StreamingHttpResponse' in str(warning.message)], [])
+
+        self.assertTrue(response.is_async)
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()], [order.id for order in reversed(orders)])
+        self.assertEqual(compressed_response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed), content)
+
+
+class OrderCountTests(APITestCase):
+    """
+    Test cases for the order count endpoints
+    """
+    def setUp(self):
+        self.customer_user = User.objects.create_user(username="customer", password="testpass")
+        self.customer_profile = Profile.objects.create(user=self.customer_user, type='customer')
+
+        self.business_user = User.objects.create_user(username="business", password="testpass")
+        self.business_profile = Profile.objects.create(user=self.business_user, type='business')
+
+        self.offer = Offer.objects.create(user=self.business_user, title="Logo Design")
+        self.offer_detail = Offerdetail.objects.create(
+            offer=self.offer, title="Basic Design", revisions=3, delivery_time_in_days=5,
+            price=150.00, features=["Logo Design"], offer_type="basic"
+        )
+
+        self.token = Token.objects.create(user=self.customer_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def test_counters_follow_order_changes(self):
+        # Test that creating, updating and deleting orders updates the counters
+        self.client.post(reverse('order-list'), {"offer_detail_id": self.offer_detail.id}, format='json')
+        self.client.post(reverse('order-list'), {"offer_detail_id": self.offer_detail.id}, format='json')
+        order = Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail)
+
+        response = self.client.patch(reverse('order-detail', kwargs={'pk': order.id}), {"status": "completed"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        Order.objects.filter(status='in_progress').first().delete()
+
+        # A single query for the profile with its counters, the token is cached
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-stats', kwargs={'business_user_id': self.business_profile.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"order_count": 1, "completed_order_count": 1, "cancelled_order_count": 0})
+
+        response = self.client.get(reverse('order-count', kwargs={'business_user_id': self.business_profile.id}))
+        self.assertEqual(response.data, {"order_count": 1})
+
+        response = self.client.get(reverse('completed-order-count', kwargs={'business_user_id': self.business_profile.id}))
+        self.assertEqual(response.data, {"completed_order_count": 1})
+
+    def test_first_order_creates_counters(self):
+        # Test that the first order creates the counters row and adds its own delta only
+        self.assertFalse(BusinessOrderStats.objects.filter(business_user=self.business_user).exists())
+        with mock.patch.object(BusinessOrderStats, 'rebuild') as rebuild:
+            Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail, status='completed')
+        rebuild.assert_not_called()
+        stats = BusinessOrderStats.objects.get(business_user=self.business_user)
+        self.assertEqual((stats.in_progress_count, stats.completed_count, stats.cancelled_count), (0, 1, 0))
+
+    def test_async_order_count(self):
+        # Test that the async variant authenticates the token and returns the same bodies
+        Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail)
+        view = AsyncOrderCountView.as_view()
+        for business_user_id in (self.business_profile.id, self.customer_profile.id):
+            url = reverse('order-count', kwargs={'business_user_id': business_user_id})
+            response = self.client.get(url)
+            request = AsyncRequestFactory().get(url, headers={'Authorization': 'Token ' + self.token.key})
+            async_response = async_to_sync(view)(request, business_user_id=business_user_id)
+            self.assertEqual(async_response.status_code, response.status_code)
+            self.assertEqual(async_response.content, response.content)
+
+        async_response = async_to_sync(view)(AsyncRequestFactory().get(url), business_user_id=self.business_profile.id)
+        self.assertEqual(async_response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(async_response['WWW-Authenticate'], 'Token')
+
+    def test_counts_without_orders(self):
+        # Test that a business user without orders has zero counters
+        response = self.client.get(reverse('order-count', kwargs={'business_user_id': self.business_profile.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"order_count": 0})
+
+    def test_counts_for_non_business_user(self):
+        # Test that customer profiles are not found
+        response = self.client.get(reverse('order-stats', kwargs={'business_user_id': self.customer_profile.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reconcile_repairs_drift(self):
+        # Test that the reconcile command recomputes the counters from the orders table
+        Order.objects.create(customer_user=self.customer_user, offer_detail=self.offer_detail, status='cancelled')
+        BusinessOrderStats.objects.update(cancelled_count=5, in_progress_count=2)
+
+        call_command('reconcile_order_stats', stdout=StringIO())
+
+        stats = BusinessOrderStats.objects.get(business_user=self.business_user)
+        self.assertEqual(stats.cancelled_count, 1)
+        self.assertEqual(stats.in_progress_count, 0)
+
+
+class OrderConcurrencyTests(TransactionTestCase):
+    """
+    Creates orders from parallel requests, each thread with its own database connection.
+    """
+    customers = 8
+    orders_per_customer = 5
+
+    def setUp(self):
+        # The test database name is only known once it was created
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Needs a file database; set DB_TEST_NAME to run it on SQLite.")
+
+        business_user = User.objects.create_user(username="business", password="testpass")
+        Profile.objects.create(user=business_user, type='business')
+        offer = Offer.objects.create(user=business_user, title="Logo Design")
+        self.offer_detail = Offerdetail.objects.create(
+            offer=offer, title="Basic Design", revisions=3, delivery_time_in_days=5,
+            price=150.00, features=["Logo Design"], offer_type="basic"
+        )
+        self.business_user = business_user
+
+        self.tokens = []
+        for index in range(self.customers):
+            user = User.objects.create_user(username=f"customer{index}", password="testpass")
+            Profile.objects.create(user=user, type='customer')
+            self.tokens.append(Token.objects.create(user=user).key)
+
+    def create_orders(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        try:
+            return [
+                client.post(reverse('order-list'), {"offer_detail_id": self.offer_detail.id}, format='json').status_code
+                for index in range(self.orders_per_customer)
+            ]
+        finally:
+            connection.close()
+
+    def test_parallel_order_creation(self):
+        # Test that concurrent writers wait for the lock instead of failing with "database is locked"
+        with ThreadPoolExecutor(max_workers=self.customers) as executor:
+            results = list(executor.map(self.create_orders, self.tokens))
+
+        expected = self.customers * self.orders_per_customer
+        self.assertEqual([code for codes in results for code in codes], [status.HTTP_201_CREATED] * expected)
+        self.assertEqual(Order.objects.count(), expected)
+        self.assertEqual(BusinessOrderStats.objects.get(business_user=self.business_user).in_progress_count, expected)
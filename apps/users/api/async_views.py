@@ -0,0 +1,28 @@
+from asgiref.sync import sync_to_async
+from coderr_backend.async_views import AsyncAPIView
+from coderr_backend.pagination import bound_unpaginated, truncate_unpaginated
+from .views import ReviewList
+
+
+class AsyncReviewList(AsyncAPIView):
+    """
+    Async variant of the GET of `ReviewList`.
+
+    Applies the same filters and ordering and loads the reviews with the async ORM.
+    Validating the `business_user_id` and `reviewer_id` filters looks the users up,
+    so the filters are applied in a worker thread. Cursor pagination and review
+    creation are served by `ReviewList`.
+    """
+    sync_view = ReviewList
+
+    async def aget(self, request):
+        if ReviewList.pagination_class().is_cursor_request(request):
+            return await self.delegate(request._request)
+
+        view = ReviewList(request=request, args=(), kwargs={}, format_kwarg=None)
+        queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+        queryset = queryset.order_by(*queryset.query.order_by, 'id')
+        reviews, headers = truncate_unpaginated([review async for review in bound_unpaginated(queryset)])
+
+        serializer = view.get_serializer(reviews, many=True)
+        return self.render(serializer.data, headers=headers)
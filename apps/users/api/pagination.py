@@ -0,0 +1,36 @@
+from rest_framework.pagination import PageNumberPagination
+from coderr_backend.pagination import KeysetPagination
+
+
+class ReviewPagination(KeysetPagination):
+    """
+    Opt-in keyset pagination for reviews.
+
+    Only used with `?pagination=cursor` (or a `cursor` parameter), otherwise the
+    review list is a plain array of at most UNPAGINATED_LIST_LIMIT reviews.
+    Ordered by `updated_at` or `rating`, newest first by default, with the ID as tiebreaker.
+    """
+    page_size = 10
+    max_page_size = 50
+    ordering_fields = ['updated_at', 'rating']
+    default_ordering = '-updated_at'
+
+    def is_cursor_request(self, request):
+        return request.query_params.get('pagination') == 'cursor' or self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_cursor_request(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class ProfilePagination(PageNumberPagination):
+    """
+    Opt-in page number pagination for profiles.
+
+    Only used when the `page_size` parameter is given, otherwise the profile
+    list is a plain array of at most UNPAGINATED_LIST_LIMIT profiles.
+    """
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,4 +1,5 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from apps.users.authentication import has_profile_type
 
 class IsReviewerOrReadOnly(BasePermission):
     """
@@ -21,5 +22,5 @@ class IsCustomerOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         
-        return request.user.profile.type == 'customer'
+        return has_profile_type(request.user, 'customer')
 
@@ -3,9 +3,12 @@ from rest_framework import serializers, status
 from apps.users.models import Profile
 from django.contrib.auth.models import User
 from apps.users.models import Review
+from apps.users.authentication import has_profile_type
+from coderr_backend.instrumentation import TimedSerializerMixin
+from coderr_backend.renditions import RenditionsField
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Profile model. Provides fields for user details and additional profile information.
     """
@@ -15,11 +18,14 @@ class ProfileSerializer(serializers.ModelSerializer):
     working_hours = serializers.CharField(required=False, allow_blank=True)
     description = serializers.CharField(required=False, allow_blank=True)
     location = serializers.CharField(required=False, allow_blank=True)
+    file_renditions = RenditionsField(storage=Profile._meta.get_field('file').storage)
+    average_rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'location', 'tel', \
-                   'description', 'working_hours', 'type', 'email', 'created_at']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'file_renditions', 'location', 'tel', \
+                   'description', 'working_hours', 'type', 'email', 'created_at', 'rating_count', 'average_rating']
+        read_only_fields = ['rating_count']
 
     def get_username(self, obj):
         return obj.user.username
@@ -29,6 +35,10 @@ class ProfileSerializer(serializers.ModelSerializer):
 
     def get_created_at(self, obj):
         return obj.user.date_joined
+
+    def get_average_rating(self, obj):
+        # Rounded like the average rating of the base info and the profile list
+        return round(obj.average_rating, 1)
     
 
 class LoginSerializer(serializers.Serializer):
@@ -106,10 +116,12 @@ class RegistrationSerializer(serializers.ModelSerializer):
         return user
     
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Review model. Validates and manages review creation and updates.
     """
+    business_user = serializers.PrimaryKeyRelatedField(queryset=User.objects.select_related('profile'))
+
     class Meta:
         model = Review
         fields = ['id', 'business_user', 'reviewer', 'rating', 'description', 'created_at', 'updated_at']
@@ -119,7 +131,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
 
         if self.context['request'].method == "POST":
-            if Profile.objects.get(user=data['business_user']).type != 'business':
+            if not has_profile_type(data['business_user'], 'business'):
                 raise serializers.ValidationError(
                     detail={"error": "Es können nur Geschäftsnutzer bewertet werden."},
                     code=status.HTTP_400_BAD_REQUEST)
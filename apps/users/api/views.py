@@ -12,16 +12,41 @@ import re
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from .permissions import IsReviewerOrReadOnly, IsCustomerOrReadOnly
+from .pagination import ProfilePagination, ReviewPagination
 from rest_framework.permissions import IsAuthenticated
+from django.utils.decorators import method_decorator
+from coderr_backend.conditional import conditional
+from coderr_backend.renditions import rendition_urls
+from coderr_backend.exports import ExportContentNegotiation, export_response
+from coderr_backend.pagination import bound_unpaginated, truncate_unpaginated
+
+
+def profile_timestamps(pk):
+    """
+    Timestamp a profile representation depends on.
+    """
+    return Profile.objects.filter(pk=pk).values_list('updated_at').first()
 
 
 class ProfileList(generics.ListAPIView):
     """
     List user based on type profiles.
     
-    - **GET**: Returns all user profiles.
+    - **GET**: Returns all user profiles, or a page of them with `?page_size=`.
+      `?ordering=-average_rating` or `?ordering=-rating_count` sorts by the stored ratings.
+
+    The profiles are read as a `.values()` projection joined to the user table
+    in one query and mapped directly to the response shape.
     """
     serializer_class = ProfileSerializer
+    pagination_class = ProfilePagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['average_rating', 'rating_count']
+    projection = [
+        'user_id', 'user__username', 'first_name', 'last_name', 'file', 'file_renditions', 'location',
+        'tel', 'description', 'working_hours', 'type', 'user__date_joined',
+        'rating_count', 'average_rating',
+    ]
 
     def get_queryset(self):
         queryset = Profile.objects.all()
@@ -29,37 +54,50 @@ class ProfileList(generics.ListAPIView):
         if profile_type:
             queryset = queryset.filter(type=profile_type)
         return queryset
+
+    def to_representation(self, row, file_storage):
+        return {
+            "user": {
+                "pk": row["user_id"],
+                "username": row["user__username"],
+                "first_name": row["first_name"],
+                "last_name": row["last_name"]
+            },
+            "file": self.request.build_absolute_uri(file_storage.url(row["file"])) if row["file"] else None,
+            "file_renditions": rendition_urls(row["file_renditions"], file_storage, self.request),
+            "location": row["location"],
+            "tel": row["tel"],
+            "description": row["description"],
+            "working_hours": row["working_hours"],
+            "type": row["type"],
+            "uploaded_at": row["user__date_joined"],
+            "rating_count": row["rating_count"],
+            "average_rating": round(row["average_rating"], 1)
+        }
     
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        
-        customized_data = []
-        for item in response.data:
-            customized_data.append({
-                "user": {
-                    "pk": item["user"],
-                    "username": item["username"],
-                    "first_name": item["first_name"],
-                    "last_name": item["last_name"]
-                },
-                "file": item["file"],
-                "location": item["location"],
-                "tel": item["tel"],
-                "description": item["description"],
-                "working_hours": item["working_hours"],
-                "type": item["type"],
-                "uploaded_at": item["created_at"]
-            })
-        return Response(customized_data, status=status.HTTP_200_OK)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Ordered by ID, or by ID among equally rated profiles, so pages are stable
+        queryset = queryset.order_by(*queryset.query.order_by, 'id').values(*self.projection)
+        file_storage = Profile._meta.get_field('file').storage
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([self.to_representation(row, file_storage) for row in page])
+
+        rows, headers = truncate_unpaginated(list(bound_unpaginated(queryset)))
+        data = [self.to_representation(row, file_storage) for row in rows]
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
 
 
 class ProfileDetail(APIView):
     """
     Update a specific user profile.
 
-    - **GET**: Retrieves a profile.
-    - **PATCH**: Updates a profile.
+    - **GET**: Retrieves a profile. Supports conditional requests via ETag and Last-Modified.
+    - **PATCH**: Updates a profile. Honours If-Match for optimistic concurrency.
     """
+    @method_decorator(conditional(profile_timestamps))
     def patch(self, request, pk):
         try:
             profile = Profile.objects.get(pk=pk)
@@ -91,6 +129,7 @@ class ProfileDetail(APIView):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @method_decorator(conditional(profile_timestamps))
     def get(self, request, pk):
         profile = Profile.objects.get(pk=pk)
         serializer = ProfileSerializer(profile)
@@ -159,12 +198,16 @@ class ReviewList(generics.GenericAPIView):
 
     - **POST**: Creates a review for a business user.
     - **GET**: Retrieves all reviews for a business user, with filtering by `business_user_id`.
+      With `?pagination=cursor` the reviews are returned in cursor-paginated pages,
+      else as an array of at most UNPAGINATED_LIST_LIMIT reviews, ordered by ID unless
+      `?ordering=` is given.
     """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['business_user_id', 'reviewer_id']
     ordering_fields = ['updated_at', 'rating']
+    pagination_class = ReviewPagination
     permission_classes = [IsAuthenticated, IsCustomerOrReadOnly]
 
     def post(self, request):
@@ -176,8 +219,36 @@ class ReviewList(generics.GenericAPIView):
     
     def get(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        queryset = queryset.order_by(*queryset.query.order_by, 'id')
+        reviews, headers = truncate_unpaginated(list(bound_unpaginated(queryset)))
+        serializer = self.get_serializer(reviews, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
+
+
+class ReviewExport(generics.GenericAPIView):
+    """
+    Streams reviews as CSV or NDJSON, with the filters and ordering of the review list.
+
+    - **GET**: E.g. `?business_user_id=` exports all reviews a business user received.
+    """
+    queryset = Review.objects.all()
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['business_user_id', 'reviewer_id']
+    ordering_fields = ['updated_at', 'rating']
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+    export_fields = ['id', 'business_user', 'reviewer', 'rating', 'description', 'created_at', 'updated_at']
+
+    def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.order_by(*queryset.query.order_by, 'id')
+        return export_response(request, queryset, self.export_fields, 'reviews')
 
 
 class ReviewDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -0,0 +1,190 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from apps.users.models import Profile
+
+
+def get_cache():
+    """
+    Cache holding authenticated tokens, the TOKEN_CACHE_ALIAS entry of CACHES.
+    """
+    return caches[getattr(settings, 'TOKEN_CACHE_ALIAS', 'default')]
+
+
+def hash_key(key):
+    # Hashed, so token keys never show up in a shared cache backend
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def token_cache_key(key):
+    return 'auth:token:' + hash_key(key)
+
+
+def token_user_key(key):
+    return 'auth:token-user:' + hash_key(key)
+
+
+def user_version_key(user_id):
+    return f'auth:user-version:{user_id}'
+
+
+def get_user_version(cache, user_id):
+    """
+    Current version of a user's cached tokens, which moves whenever they are invalidated.
+    """
+    key = user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def remember_token_user(key, user_id):
+    """
+    Record the user of a token, so the version of the user is known before
+    the token is first read from the database and the token can be cached.
+    """
+    get_cache().set(token_user_key(key), user_id, None)
+
+
+def invalidate_user_tokens(user_id):
+    """
+    Drop the cached token of a user, e.g. after the token, the user or the profile changed.
+
+    Moves the version of the user, so tokens cached before are no longer used. Requests
+    reading the token before the change was committed may still cache the old rows,
+    so the version moves again after the commit, which rejects those entries as well.
+    """
+    def bump():
+        get_cache().set(user_version_key(user_id), time.time_ns(), None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_profile(user):
+    """
+    Profile of a user, or None for anonymous users and users without a profile.
+
+    Reads the profile attached by CachedTokenAuthentication or loaded with
+    `select_related('profile')`; otherwise it is queried once and kept on the user,
+    including a missing profile.
+    """
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        return None
+
+
+def has_profile_type(user, profile_type):
+    """
+    Whether the user has a profile of the given type ('business' or 'customer').
+    """
+    profile = get_profile(user)
+    return profile is not None and profile.type == profile_type
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication resolving tokens from a cache instead of the database.
+
+    The token is loaded once together with its user and profile and cached for
+    TOKEN_CACHE_TIMEOUT seconds, so neither the token lookup nor `request.user.profile`
+    queries the database on later requests. Cached tokens carry the version of their
+    user, which moves when the token is deleted or the user or profile is saved (see
+    `apps.users.signals`). The version is read before the database, so a token read
+    before such a change is never cached as current after it.
+
+    `aauthenticate` is the variant for async views, using the async ORM on a cache miss.
+    """
+    def get_key(self, request):
+        """
+        Token key from the Authorization header, or None if no token was sent.
+        """
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.'))
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        return None if key is None else self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        token, version = self.get_cached_token(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user__profile').aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            self.cache_token(key, token, version)
+
+        return self.check_token(token)
+
+    def authenticate_credentials(self, key):
+        token, version = self.get_cached_token(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user__profile').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            self.cache_token(key, token, version)
+
+        return self.check_token(token)
+
+    def get_cached_token(self, key):
+        """
+        Returns the cached token, or None if it is missing or was invalidated, and the
+        version of its user, read before the database. The version is None if the user
+        of the token is not known yet.
+        """
+        cache = get_cache()
+        entries = cache.get_many([token_cache_key(key), token_user_key(key)])
+        user_id = entries.get(token_user_key(key))
+        if user_id is None:
+            return None, None
+
+        version = get_user_version(cache, user_id)
+        entry = entries.get(token_cache_key(key))
+        if entry is not None and entry[0] == version:
+            return entry[1], version
+        return None, version
+
+    def cache_token(self, key, token, version):
+        if version is None:
+            # Cached from the next request on, once the version can be read ahead of the database
+            remember_token_user(key, token.user_id)
+            return
+        timeout = getattr(settings, 'TOKEN_CACHE_TIMEOUT', 300)
+        get_cache().set(token_cache_key(key), (version, token), timeout)
+
+    def check_token(self, token):
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.users.models import Profile
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the rating count, sum and average of all profiles from the reviews table.
+
+    The rating fields are maintained by signals, which bulk operations bypass.
+    Run this command periodically (e.g. from cron) to repair any drift.
+    """
+    help = "Recomputes the rating aggregates of all profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Number of profiles per UPDATE statement.")
+
+    def handle(self, *args, **options):
+        changed = Profile.reconcile_ratings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated the ratings of {changed} profiles."))
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_profile_ratings(apps, schema_editor):
+    """
+    Sums up the existing reviews per business user.
+    """
+    Profile = apps.get_model('users', 'Profile')
+    Review = apps.get_model('users', 'Review')
+
+    ratings = {
+        row['business_user_id']: (row['count'], row['rating_sum'])
+        for row in Review.objects.order_by().values('business_user_id').annotate(
+            count=models.Count('id'), rating_sum=models.Sum('rating'))
+    }
+
+    profiles = list(Profile.objects.filter(user_id__in=ratings))
+    for profile in profiles:
+        profile.rating_count, profile.rating_sum = ratings[profile.user_id]
+        profile.average_rating = profile.rating_sum / profile.rating_count
+
+    Profile.objects.bulk_update(profiles, ['rating_count', 'rating_sum', 'average_rating'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_profile_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='average_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_count',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='rating_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['type', '-average_rating'], name='profile_type_rating_idx'),
+        ),
+        migrations.RunPython(build_profile_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_profile_ratings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='file_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Case, Count, F, FloatField, Sum, When
+from django.db.models.functions import Cast, Now
 from django.contrib.auth.models import User
 from django.conf import settings
     
@@ -12,24 +14,108 @@ class Profile(models.Model):
         first_name: User's first name.
         last_name: User's last name.
         file: Optional profile image.
+        file_renditions: Downsized versions of the profile image, see `coderr_backend.renditions`.
         location: User's location.
         tel: User's telephone number.
         description: User's bio or description.
         working_hours: User's working hours.
         type: User type, either 'business' or 'customer'.
+        updated_at: When the profile was last updated.
+        rating_count: Number of reviews the user received.
+        rating_sum: Sum of the ratings the user received.
+        average_rating: Average rating, stored so profiles can be ordered by it.
+
+    The rating fields are kept up to date by signal handlers in `apps.users.signals`
+    and can be rebuilt from the reviews table with `reconcile_ratings`. Saving an
+    existing profile never writes them, so a stale instance cannot undo those updates.
+
+    Methods:
+        apply_rating: Atomically adds rating deltas to the profile of a user.
+        reconcile_ratings: Recomputes the rating fields of all profiles.
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=254)
     last_name = models.CharField(max_length=254)
     file = models.ImageField(upload_to='images/profiles/', null=True, blank=True)
+    file_renditions = models.JSONField(default=dict, blank=True, editable=False)
     location = models.CharField(max_length=254)
     tel = models.CharField(max_length=254)
     description = models.TextField()
     working_hours = models.CharField(max_length=254)
     type = models.CharField(max_length=254, choices=[('business', 'Business'), ('customer', 'Customer')])
+    updated_at = models.DateTimeField(auto_now=True)
+    rating_count = models.BigIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['type', '-average_rating'], name='profile_type_rating_idx'),
+        ]
+
+    RATING_FIELDS = ('rating_count', 'rating_sum', 'average_rating')
 
     def __str__(self):
         return self.user.username
+
+    def save(self, *args, update_fields=None, **kwargs):
+        """
+        Saves the profile. Updates leave out the rating fields, which only
+        `apply_rating` and `reconcile_ratings` write.
+        """
+        if not self._state.adding:
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            update_fields = [name for name in update_fields if name not in self.RATING_FIELDS]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    @classmethod
+    def apply_rating(cls, user_id, count_delta, sum_delta):
+        """
+        Adds the deltas to the rating fields of a user's profile in a single UPDATE.
+        The average is computed from the new values in the same statement.
+        """
+        if not count_delta and not sum_delta:
+            return
+
+        new_count = F('rating_count') + count_delta
+        new_sum = F('rating_sum') + sum_delta
+        cls.objects.filter(user_id=user_id).update(
+            rating_count=new_count,
+            rating_sum=new_sum,
+            average_rating=Case(
+                When(rating_count=-count_delta, then=0.0),
+                default=Cast(new_sum, FloatField()) / new_count,
+                output_field=FloatField(),
+            ),
+            updated_at=Now(),
+        )
+
+    @classmethod
+    def reconcile_ratings(cls, batch_size=1000):
+        """
+        Recomputes the rating fields of all profiles from the reviews table.
+        Returns the number of profiles whose fields changed.
+        """
+        ratings = {
+            row['business_user_id']: (row['count'], row['rating_sum'])
+            for row in Review.objects.order_by().values('business_user_id').annotate(count=Count('id'), rating_sum=Sum('rating'))
+        }
+
+        changed = []
+        for profile in cls.objects.only('id', 'user_id', 'rating_count', 'rating_sum', 'average_rating').iterator(chunk_size=batch_size):
+            count, rating_sum = ratings.get(profile.user_id, (0, 0))
+            average = rating_sum / count if count else 0.0
+            if (profile.rating_count, profile.rating_sum, profile.average_rating) != (count, rating_sum, average):
+                profile.rating_count, profile.rating_sum, profile.average_rating = count, rating_sum, average
+                changed.append(profile)
+
+        cls.objects.bulk_update(changed, ['rating_count', 'rating_sum', 'average_rating'], batch_size=batch_size)
+        return len(changed)
     
 
 class Review(models.Model):
@@ -59,6 +145,12 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['business_user', '-updated_at'], name='review_business_updated_idx'),
+            models.Index(fields=['reviewer', '-updated_at'], name='review_reviewer_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Review by {self.reviewer} for {self.business_user} - Rating: {self.rating}"
 
@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from coderr_backend import renditions
+from coderr_backend.signals import remember_loaded_values
+from rest_framework.authtoken.models import Token
+from apps.users.authentication import invalidate_user_tokens, remember_token_user
+from apps.users.models import Profile, Review
+
+
+# Cached tokens carry the user and profile, so drop them whenever either changes
+
+@receiver(post_save, sender=Token)
+def remember_created_token(sender, instance, created, **kwargs):
+    if created:
+        remember_token_user(instance.key, instance.user_id)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_user_tokens(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_profile_tokens(sender, instance, **kwargs):
+    invalidate_user_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens_on_save(sender, instance, **kwargs):
+    invalidate_user_tokens(instance.pk)
+
+
+# Ratings follow every change of a review's rating and business user
+
+remember_loaded_values(Review, _rating_business_user_id='business_user_id', _rating_value='rating')
+
+
+@receiver(post_save, sender=Review)
+def rate_saved_review(sender, instance, created, **kwargs):
+    previous_user_id, previous_rating = instance._rating_business_user_id, instance._rating_value
+    if created:
+        Profile.apply_rating(instance.business_user_id, 1, instance.rating)
+    elif previous_rating is not None and previous_user_id != instance.business_user_id:
+        Profile.apply_rating(previous_user_id, -1, -previous_rating)
+        Profile.apply_rating(instance.business_user_id, 1, instance.rating)
+    elif previous_rating is not None:
+        Profile.apply_rating(instance.business_user_id, 0, instance.rating - previous_rating)
+    instance._rating_business_user_id, instance._rating_value = instance.business_user_id, instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def rate_deleted_review(sender, instance, **kwargs):
+    if instance._rating_value is not None:
+        Profile.apply_rating(instance._rating_business_user_id, -1, -instance._rating_value)
+
+
+# Renditions of the profile image, rendered whenever a new image is saved
+
+@receiver(post_init, sender=Profile)
+def remember_profile_file(sender, instance, **kwargs):
+    instance._rendered_file = renditions.source_name(instance, 'file')
+
+
+@receiver(pre_save, sender=Profile)
+def reset_profile_file_renditions(sender, instance, **kwargs):
+    if renditions.source_name(instance, 'file') != instance._rendered_file:
+        instance.file_renditions = {}
+
+
+@receiver(post_save, sender=Profile)
+def render_profile_file(sender, instance, created, **kwargs):
+    name = renditions.source_name(instance, 'file')
+    if name and (created or name != instance._rendered_file):
+        renditions.schedule(Profile, instance.pk, 'file', 'file_renditions', name)
+    instance._rendered_file = name
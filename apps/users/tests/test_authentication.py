@@ -3,6 +3,8 @@ from rest_framework import status
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from django.urls import reverse
+from apps.users.authentication import CachedTokenAuthentication
+from apps.users.models import Profile
 
 
 class AuthenticationTests(APITestCase):
@@ -47,3 +49,83 @@ class AuthenticationTests(APITestCase):
 
         
 
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        # Set up a customer with a token
+        self.user = User.objects.create_user(username='customer', password='testpass')
+        self.profile = Profile.objects.create(user=self.user, type='customer')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('review-list')
+
+    def test_cached_token_skips_token_and_profile_queries(self):
+        # The first request loads the token with user and profile, later ones use the cache
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.post(self.url, {}, format='json')
+        self.token.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_change_is_picked_up(self):
+        # Test that the permission checks see a changed profile type right away
+        self.client.post(self.url, {}, format='json')
+        self.profile.type = 'business'
+        self.profile.save()
+
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_inactive_user_is_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stale_token_is_not_cached(self):
+        # Test that a token read before an invalidation and cached after it is not used
+        auth, key = CachedTokenAuthentication(), self.token.key
+        token, version = auth.get_cached_token(key)
+        stale = Token.objects.select_related('user__profile').get(key=key)
+        self.token.delete()
+        auth.cache_token(key, stale, version)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_read_before_commit_is_not_cached(self):
+        # Test that the version moves again after the commit, since other requests read the old rows until then
+        auth = CachedTokenAuthentication()
+        stale = Token.objects.select_related('user__profile').get(key=self.token.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            token, version = auth.get_cached_token(self.token.key)
+            auth.cache_token(self.token.key, stale, version)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_created_token_is_cached_from_second_request(self):
+        # Test that a token created without signals is cached once its user is known
+        user = User.objects.create_user(username='bulk', password='testpass')
+        Profile.objects.create(user=user, type='customer')
+        token, = Token.objects.bulk_create([Token(user=user, key=Token.generate_key())])
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        for expected_queries in (1, 1, 0):
+            with self.assertNumQueries(expected_queries):
+                self.client.post(self.url, {}, format='json')
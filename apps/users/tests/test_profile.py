@@ -5,6 +5,15 @@ from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token
 from apps.users.models import Profile
 from django.contrib.auth.models import User
+from io import StringIO
+from django.core.management import call_command
+from apps.users.models import Review
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from io import BytesIO
+import shutil
+import tempfile
 
 
 class ProfileTests(APITestCase):
@@ -73,3 +82,178 @@ class ProfileTests(APITestCase):
         self.assertEqual(response.data['email'], update_data["email"])
         self.assertEqual(response.data['first_name'], update_data["first_name"])
         self.assertEqual(response.data['last_name'], update_data["last_name"])
+
+    def test_conditional_get_profile(self):
+        # Test that GET revalidates with ETag and PATCH honours If-Match
+        url = reverse('profile-detail', kwargs={'pk': self.profile.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.patch(url, {"location": "Berlin"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {"location": "Hamburg"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['location'], "Berlin")
+
+    def test_profile_image_renditions(self):
+        # Test that profile pictures get renditions, which are reset when a new picture is uploaded
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        url = reverse('profile-detail', kwargs={'pk': self.profile.pk})
+
+        def upload(name):
+            buffer = BytesIO()
+            Image.new('RGBA', (300, 600), (0, 0, 255, 128)).save(buffer, 'PNG')
+            return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_RENDITIONS_SYNC=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(url, {'file': upload('avatar.png')}, format='multipart')
+
+            self.profile.refresh_from_db()
+            self.assertEqual(self.profile.file_renditions['thumbnail'], {
+                'width': 80, 'height': 160,
+                'url': 'images/profiles/avatar_thumbnail.png',
+                'webp': 'images/profiles/avatar_thumbnail.webp',
+            })
+            # Images are never enlarged
+            self.assertEqual((self.profile.file_renditions['medium']['width'], self.profile.file_renditions['medium']['height']), (300, 600))
+
+            response = self.client.get(reverse('profile-business'))
+            self.assertEqual(response.data[0]['file_renditions']['thumbnail']['webp'],
+                             'http://testserver/media/images/profiles/avatar_thumbnail.webp')
+
+            # Until the new picture is rendered, the renditions of the old one are not served
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                response = self.client.patch(url, {'file': upload('portrait.png')}, format='multipart')
+            self.assertEqual(response.data['file_renditions'], {})
+            self.assertEqual(len([callback for callback in callbacks if callback.__qualname__.startswith('schedule.')]), 1)
+
+
+class ProfileListTests(APITestCase):
+
+    def setUp(self):
+        # Create three business profiles and one customer profile
+        for index in range(3):
+            user = User.objects.create_user(username=f'business{index}', password='testpassword')
+            Profile.objects.create(user=user, type='business', first_name=f'First{index}', last_name='Last',
+                                   location='Berlin', tel='123', description='Design', working_hours='9-17',
+                                   file='images/profiles/avatar.png' if index == 0 else None)
+        self.customer = User.objects.create_user(username='customer', password='testpassword')
+        Profile.objects.create(user=self.customer, type='customer')
+
+        self.client.force_authenticate(user=self.customer)
+
+    def test_list_business_profiles(self):
+        # Test that the profiles are read in a single query in the nested response shape
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('profile-business'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+
+        user = User.objects.get(username='business0')
+        self.assertEqual(response.data[0], {
+            "user": {"pk": user.pk, "username": "business0", "first_name": "First0", "last_name": "Last"},
+            "file": "http://testserver/media/images/profiles/avatar.png",
+            "file_renditions": {},
+            "location": "Berlin",
+            "tel": "123",
+            "description": "Design",
+            "working_hours": "9-17",
+            "type": "business",
+            "uploaded_at": user.date_joined,
+            "rating_count": 0,
+            "average_rating": 0.0,
+        })
+        self.assertIsNone(response.data[1]["file"])
+
+    def test_list_profiles_paginated(self):
+        # Test that the profiles are paginated when a page size is given
+        response = self.client.get(reverse('profile-business'), {'page_size': 2, 'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([profile["user"]["username"] for profile in response.data['results']], ['business2'])
+
+        response = self.client.get(reverse('profile-customer'))
+        self.assertEqual([profile["user"]["pk"] for profile in response.data], [self.customer.pk])
+
+    @override_settings(UNPAGINATED_LIST_LIMIT=2)
+    def test_list_profiles_limit(self):
+        # Test that an unpaginated list is cut off at the limit and marked as truncated
+        response = self.client.get(reverse('profile-business'), HTTP_ORIGIN='http://127.0.0.1:5500')
+        self.assertEqual([profile["user"]["username"] for profile in response.data], ['business0', 'business1'])
+        self.assertEqual(response['X-Truncated'], 'true')
+        # The frontend runs on another origin and must be allowed to read the header
+        self.assertEqual(response['Access-Control-Expose-Headers'], 'X-Truncated')
+
+        response = self.client.get(reverse('profile-customer'))
+        self.assertEqual(len(response.data), 1)
+        self.assertFalse(response.has_header('X-Truncated'))
+
+    def test_ratings_follow_reviews(self):
+        # Test that creating, updating and deleting reviews updates the stored ratings
+        business = User.objects.get(username='business1')
+        review = Review.objects.create(business_user=business, reviewer=self.customer, rating=5, description='Good')
+        Review.objects.create(business_user=business, reviewer=self.customer, rating=2, description='Bad')
+        review.rating = 4
+        review.save()
+
+        profile = Profile.objects.get(user=business)
+        self.assertEqual((profile.rating_count, profile.rating_sum, profile.average_rating), (2, 6, 3.0))
+
+        review.delete()
+        profile.refresh_from_db()
+        self.assertEqual((profile.rating_count, profile.rating_sum, profile.average_rating), (1, 2, 2.0))
+
+    def test_save_keeps_concurrent_ratings(self):
+        # Test that saving a profile loaded before a review does not write back its old ratings
+        business = User.objects.get(username='business1')
+        profile = Profile.objects.get(user=business)
+        Review.objects.create(business_user=business, reviewer=self.customer, rating=5, description='Good')
+
+        profile.location = 'Hamburg'
+        profile.save()
+        profile = Profile.objects.get(user=business)
+        self.assertEqual((profile.location, profile.rating_count, profile.average_rating), ('Hamburg', 1, 5.0))
+
+    def test_list_and_detail_round_average_rating(self):
+        # Test that the list and the detail return the same rounded average rating
+        business = User.objects.get(username='business1')
+        for reviewer, rating in [(self.customer, 5), (business, 4), (self.customer, 4)]:
+            Review.objects.create(business_user=business, reviewer=reviewer, rating=rating, description='Review')
+
+        response = self.client.get(reverse('profile-business'), {'ordering': '-average_rating'})
+        self.assertEqual(response.data[0]["average_rating"], 4.3)
+        response = self.client.get(reverse('profile-detail', kwargs={'pk': Profile.objects.get(user=business).pk}))
+        self.assertEqual(response.data["average_rating"], 4.3)
+
+    def test_list_ordered_by_rating(self):
+        # Test that profiles can be ordered by the stored average rating
+        for username, rating in [('business1', 5), ('business2', 3)]:
+            Review.objects.create(business_user=User.objects.get(username=username), reviewer=self.customer,
+                                  rating=rating, description='Review')
+
+        response = self.client.get(reverse('profile-business'), {'ordering': '-average_rating'})
+        self.assertEqual([profile["user"]["username"] for profile in response.data], ['business1', 'business2', 'business0'])
+        self.assertEqual([profile["average_rating"] for profile in response.data], [5.0, 3.0, 0.0])
+        self.assertEqual(response.data[0]["rating_count"], 1)
+
+    def test_reconcile_profile_ratings(self):
+        # Test that the reconcile command repairs ratings changed behind the signals' back
+        business = User.objects.get(username='business0')
+        Review.objects.create(business_user=business, reviewer=self.customer, rating=4, description='Review')
+        Profile.objects.filter(user=business).update(rating_count=7, rating_sum=1, average_rating=0.1)
+
+        out = StringIO()
+        call_command('reconcile_profile_ratings', stdout=out)
+        self.assertIn("Updated the ratings of 1 profiles.", out.getvalue())
+
+        profile = Profile.objects.get(user=business)
+        self.assertEqual((profile.rating_count, profile.rating_sum, profile.average_rating), (1, 4, 4.0))
@@ -1,9 +1,15 @@
+import csv
+from io import StringIO
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from apps.users.models import Review, Profile
 from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, override_settings
+from apps.users.api.async_views import AsyncReviewList
 
 
 class ReviewListTests(APITestCase):
@@ -73,6 +79,100 @@ class ReviewListTests(APITestCase):
         self.assertEqual(response.data[0]['rating'], 4)
         self.assertEqual(response.data[1]['rating'], 3)
 
+    def test_async_review_list(self):
+        # Test that the async variant filters, orders and validates like the DRF view
+        Review.objects.create(business_user=self.business_user, reviewer=self.reviewer_user, rating=4, description="Good")
+        Review.objects.create(business_user=self.reviewer_user, reviewer=self.business_user, rating=2, description="Bad")
+        token = Token.objects.create(user=self.reviewer_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        view = AsyncReviewList.as_view()
+        for params in ({}, {'business_user_id': self.business_user.id}, {'ordering': 'rating'}, {'reviewer_id': 999}):
+            response = self.client.get(self.url, params)
+            request = AsyncRequestFactory().get(self.url, params, headers={'Authorization': 'Token ' + token.key})
+            async_response = async_to_sync(view)(request)
+            self.assertEqual(async_response.status_code, response.status_code)
+            self.assertEqual(async_response.content, response.content)
+
+    @override_settings(UNPAGINATED_LIST_LIMIT=1)
+    def test_review_list_limit(self):
+        # Test that both variants cut an unpaginated list off at the limit, ordered by ID
+        first = Review.objects.create(business_user=self.business_user, reviewer=self.reviewer_user, rating=4, description="Good")
+        Review.objects.create(business_user=self.business_user, reviewer=self.reviewer_user, rating=2, description="Bad")
+        token = Token.objects.create(user=self.reviewer_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.get(self.url)
+        self.assertEqual([review['id'] for review in response.data], [first.id])
+        self.assertEqual(response['X-Truncated'], 'true')
+
+        request = AsyncRequestFactory().get(self.url, headers={'Authorization': 'Token ' + token.key})
+        async_response = async_to_sync(AsyncReviewList.as_view())(request)
+        self.assertEqual(async_response.content, response.content)
+        self.assertEqual(async_response['X-Truncated'], 'true')
+
+    def test_export_reviews(self):
+        # Test that the export applies the filters and ordering of the review list
+        Review.objects.create(business_user=self.business_user, reviewer=self.reviewer_user, rating=4, description="Good")
+        Review.objects.create(business_user=self.business_user, reviewer=self.reviewer_user, rating=2, description="=1+1")
+        Review.objects.create(business_user=self.reviewer_user, reviewer=self.business_user, rating=5, description="Other")
+        self.client.force_authenticate(user=self.business_user)
+
+        response = self.client.get(reverse('review-export'), {'business_user_id': self.business_user.id, 'ordering': 'rating'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['rating'] for row in rows], ['2', '4'])
+        # Text that spreadsheets would read as a formula is escaped
+        self.assertEqual(rows[0]['description'], "'=1+1")
+
+
+class ReviewPaginationTests(APITestCase):
+
+    def setUp(self):
+        # Create a business user with five reviews from different customers
+        self.business_user = User.objects.create_user(username='businessuser', password='password123')
+        Profile.objects.create(user=self.business_user, type='business')
+
+        self.reviews = []
+        for index in range(5):
+            reviewer = User.objects.create_user(username=f'reviewer{index}', password='password123')
+            Profile.objects.create(user=reviewer, type='customer')
+            self.reviews.append(Review.objects.create(
+                business_user=self.business_user, reviewer=reviewer, rating=index % 3 + 1, description="Review"
+            ))
+
+        self.client.force_authenticate(user=self.business_user)
+        self.url = reverse('review-list')
+
+    def test_cursor_pagination(self):
+        """
+        Tests that the reviews are returned newest first in cursor-paginated pages.
+        """
+        ids = []
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2,
+                                              'business_user_id': self.business_user.id})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids.extend(review['id'] for review in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(ids, [review.id for review in reversed(self.reviews)])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([review['id'] for review in response.data['results']], ids[2:4])
+
+    def test_cursor_pagination_by_rating(self):
+        """
+        Tests that reviews with the same rating are ordered by ID.
+        """
+        response = self.client.get(self.url, {'pagination': 'cursor', 'ordering': 'rating', 'page_size': 10})
+        expected = sorted(self.reviews, key=lambda review: (review.rating, review.id))
+        self.assertEqual([review['id'] for review in response.data['results']], [review.id for review in expected])
+        self.assertIsNone(response.data['next'])
+
 
 class ReviewDetailTests(APITestCase):
     
@@ -0,0 +1,52 @@
+"""
+Benchmarks for the Coderr API.
+
+Each benchmark module is run with ``python -m benchmarks.<module>`` from the
+project root. The benchmarks create a throwaway test database, so the
+development database is never touched. Only ``benchmarks.seed`` writes to the
+configured database, to seed a server for ``benchmarks.api --url``.
+"""
+import os
+import statistics
+from contextlib import contextmanager
+
+
+def setup_django():
+    """
+    Configures Django with the project settings.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coderr_backend.settings')
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """
+    Creates and migrates a test database for the duration of the block.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def percentiles(samples):
+    """
+    Returns p50, p95 and p99 of the given durations in milliseconds.
+    """
+    if len(samples) < 2:
+        value = round(samples[0] * 1000, 3) if samples else 0.0
+        return {'p50': value, 'p95': value, 'p99': value}
+
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {
+        'p50': round(cuts[49] * 1000, 3),
+        'p95': round(cuts[94] * 1000, 3),
+        'p99': round(cuts[98] * 1000, 3),
+    }
@@ -0,0 +1,229 @@
+"""
+Throughput benchmark of the Coderr API over a scripted mix of the read endpoints.
+
+Sends a weighted mix of offer list (with filters and with search), offer detail,
+order list, order count, base-info and review list requests, authenticated as
+random seeded customers and business users. The script of requests depends only
+on the scale and --seed, so runs on different commits can be diffed. Reports
+p50/p95/p99 latency and queries per request per endpoint as JSON.
+
+By default the benchmark seeds a throwaway test database (see benchmarks.seed) and
+runs the requests in-process through the full middleware stack. Queries are counted
+by the instrumentation middleware, which is switched on for every request.
+
+With --url it sends the requests to a running server instead, seeded with
+``python -m benchmarks.seed``. Queries per request are only reported if the server
+instruments every request:
+    INSTRUMENTATION_SAMPLE_RATE=1 INSTRUMENTATION_PATHS=/api/ python manage.py runserver --noreload
+
+Usage:
+    python -m benchmarks.api --businesses 100 --orders 10000 --requests 2000
+    python -m benchmarks.api --url http://127.0.0.1:8000 --manifest /tmp/manifest.json --concurrency 8
+"""
+import argparse
+import http.client
+import json
+import logging
+import random
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks import percentiles, setup_django, test_database
+from benchmarks.seed import add_scale_arguments, seed
+
+# Endpoint names with their share of the requests
+MIX = {
+    'offer-list': 20,
+    'offer-search': 10,
+    'offer-detail': 15,
+    'order-list': 15,
+    'order-count': 10,
+    'completed-order-count': 5,
+    'base-info': 5,
+    'review-list': 20,
+}
+
+QUERY_COUNT = re.compile(r'\bdb;[^,]*desc="(\d+) queries"')
+
+
+def build_script(manifest, count, rng):
+    """
+    Returns `count` requests as (endpoint, path, token) tuples, drawn from MIX.
+    """
+    tokens = manifest['tokens']
+    customers = manifest['customers']
+    businesses = manifest['businesses']
+
+    def request(name):
+        business = rng.choice(businesses)
+        user_id = rng.choice(customers) if rng.random() < 0.7 else business['user_id']
+        token = tokens[str(user_id)]
+
+        if name == 'offer-list':
+            params = {'page_size': 6, 'ordering': rng.choice(['-updated_at', 'min_price'])}
+            if rng.random() < 0.5:
+                params['min_price'] = rng.choice([50, 100, 200])
+            if rng.random() < 0.3:
+                params['max_delivery_time'] = rng.choice([3, 7, 14])
+            if rng.random() < 0.2:
+                params['creator_id'] = business['user_id']
+            # Later pages only without filters, which may leave a single page
+            params['page'] = rng.randint(1, 3) if len(params) == 2 else 1
+            return f'/api/offers/?{urlencode(params)}', token
+        if name == 'offer-search':
+            word = rng.choice(manifest['words'])
+            return f'/api/offers/?{urlencode({"search": word[:rng.randint(3, len(word))], "page_size": 6})}', token
+        if name == 'offer-detail':
+            return f'/api/offers/{rng.choice(manifest["offers"])}/', token
+        if name == 'order-list':
+            return '/api/orders/', token
+        if name == 'order-count':
+            return f'/api/order-count/{business["profile_id"]}/', token
+        if name == 'completed-order-count':
+            return f'/api/completed-order-count/{business["profile_id"]}/', token
+        if name == 'base-info':
+            return '/api/base-info/', None
+        if name == 'review-list':
+            return f'/api/reviews/?business_user_id={business["user_id"]}&ordering=-updated_at', token
+        raise ValueError(name)
+
+    names, weights = zip(*MIX.items())
+    return [(name, *request(name)) for name in rng.choices(names, weights, k=count)]
+
+
+class InProcessClient:
+    """
+    Sends the requests through Django's test client, instrumenting every request.
+    """
+    def __init__(self):
+        from django.conf import settings
+        from django.test import Client
+        from django.test.utils import setup_test_environment
+
+        setup_test_environment(debug=False)
+        settings.INSTRUMENTATION_SAMPLE_RATE = 1
+        settings.INSTRUMENTATION_PATHS = ['/api/']
+        settings.SLOW_QUERY_THRESHOLD_MS = float('inf')
+        # The numbers are read from the Server-Timing header, not the log
+        logging.getLogger('coderr_backend.instrumentation').disabled = True
+        self.client = Client()
+
+    def get(self, path, token):
+        headers = {'Authorization': f'Token {token}'} if token else {}
+        response = self.client.get(path, headers=headers)
+        return response.status_code, response.get('Server-Timing')
+
+
+class HTTPClient:
+    """
+    Sends the requests to a server over one keep-alive connection per thread.
+    """
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+
+    def get(self, path, token):
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        headers = {'Authorization': f'Token {token}'} if token else {}
+        try:
+            self.local.connection.request('GET', path, headers=headers)
+            response = self.local.connection.getresponse()
+            response.read()
+        except (ConnectionError, http.client.HTTPException):
+            self.local.connection.close()
+            del self.local.connection
+            return None, None
+        return response.status, response.getheader('Server-Timing')
+
+
+def run(client, script, concurrency):
+    """
+    Sends the scripted requests and returns (endpoint, seconds, status, queries) per request.
+    """
+    def send(request):
+        name, path, token = request
+        start = time.perf_counter()
+        status, server_timing = client.get(path, token)
+        elapsed = time.perf_counter() - start
+        match = QUERY_COUNT.search(server_timing or '')
+        return name, elapsed, status, int(match.group(1)) if match else None
+
+    if concurrency == 1:
+        return [send(request) for request in script]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send, script))
+
+
+def summarize(results):
+    endpoints = {}
+    for name in sorted({result[0] for result in results}):
+        rows = [result for result in results if result[0] == name]
+        queries = [row[3] for row in rows if row[3] is not None]
+        endpoints[name] = {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if row[2] != 200),
+            **percentiles([row[1] for row in rows]),
+            'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+        }
+    return endpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--requests', type=int, default=2_000)
+    parser.add_argument('--warmup', type=int, default=100, help="Requests sent before measuring.")
+    parser.add_argument('--url', help="Base URL of a running server; by default the requests run in-process.")
+    parser.add_argument('--manifest', help="Manifest written by benchmarks.seed, required with --url.")
+    parser.add_argument('--concurrency', type=int, default=1, help="Parallel connections, with --url only.")
+    args = parser.parse_args()
+
+    if args.url and not args.manifest:
+        parser.error("--url requires the --manifest of the seeded server database")
+    if not args.url and args.concurrency != 1:
+        parser.error("--concurrency requires --url")
+
+    result = {
+        'mode': 'http' if args.url else 'in-process',
+        'scale': {key: getattr(args, key) for key in
+                  ['businesses', 'customers', 'offers_per_business', 'orders', 'reviews', 'seed']},
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+    }
+
+    def measure(client, manifest):
+        rng = random.Random(args.seed)
+        run(client, build_script(manifest, args.warmup, rng), args.concurrency)
+        script = build_script(manifest, args.requests, rng)
+
+        start = time.perf_counter()
+        results = run(client, script, args.concurrency)
+        duration = time.perf_counter() - start
+        result['duration_seconds'] = round(duration, 2)
+        result['requests_per_second'] = round(len(results) / duration, 1)
+        result['endpoints'] = summarize(results)
+
+    if args.url:
+        with open(args.manifest) as file:
+            manifest = json.load(file)
+        measure(HTTPClient(args.url), manifest)
+    else:
+        setup_django()
+        with test_database():
+            start = time.perf_counter()
+            manifest = seed(args.businesses, args.customers, args.offers_per_business, args.orders, args.reviews,
+                            args.batch_size, random.Random(args.seed))
+            result['seed_seconds'] = round(time.perf_counter() - start, 1)
+            measure(InProcessClient(), manifest)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Load test comparing the sync DRF views with the native async views under ASGI.
+
+Seeds a throwaway SQLite file database, then serves it with uvicorn twice, once with
+ASYNC_VIEWS=0 and once with ASYNC_VIEWS=1, and drives the read endpoints with many
+concurrent keep-alive connections. Reports requests per second and latency percentiles
+per endpoint and mode. The offer list response cache is disabled, so the views do the work.
+
+Requires uvicorn, which is not a project dependency:
+    pip install uvicorn
+
+Usage:
+    python -m benchmarks.async_views --connections 500 --duration 20
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import percentiles, setup_django, test_database
+
+
+def seed(offer_count, review_count):
+    """
+    Creates a business user with offers, a customer with reviews and a token for the customer.
+    """
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from apps.info.models import PlatformStats
+    from apps.offers.models import Offer, Offerdetail
+    from apps.orders.models import BusinessOrderStats
+    from apps.users.models import Profile, Review
+
+    business = User.objects.create(username='business', password='!')
+    customer = User.objects.create(username='customer', password='!')
+    business_profile = Profile.objects.create(user=business, type='business')
+    Profile.objects.create(user=customer, type='customer')
+
+    offers = Offer.objects.bulk_create([
+        Offer(user=business, title=f'Offer {i}', description='Benchmark offer', min_price=100 + i, min_delivery_time=3)
+        for i in range(offer_count)
+    ])
+    Offerdetail.objects.bulk_create([
+        Offerdetail(offer=offer, title=offer_type, revisions=1, delivery_time_in_days=3, price=offer.min_price,
+                    features=['Benchmark feature'], offer_type=offer_type)
+        for offer in offers
+        for offer_type in ['basic', 'standard', 'premium']
+    ])
+    Review.objects.bulk_create([
+        Review(business_user=business, reviewer=customer, rating=1 + i % 5, description='Benchmark review')
+        for i in range(review_count)
+    ])
+
+    PlatformStats.reconcile()
+    BusinessOrderStats.rebuild(business.id)
+    Profile.reconcile_ratings()
+    token = Token.objects.create(user=customer)
+    return {
+        'base-info': ('/api/base-info/', None),
+        'offer-list': ('/api/offers/?ordering=min_price', None),
+        'order-count': (f'/api/order-count/{business_profile.id}/', token.key),
+        'review-list': (f'/api/reviews/?business_user_id={business.id}', token.key),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, database, async_views):
+    env = {
+        **os.environ,
+        'DB_NAME': database,
+        'ASYNC_VIEWS': '1' if async_views else '0',
+        'OFFER_LIST_CACHE_TIMEOUT': '0',
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'coderr_backend.asgi:application',
+         '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+        env=env,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def client(port, path, token, deadline, samples, errors):
+    """
+    One keep-alive connection sending requests back to back until the deadline.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    auth = f'Authorization: Token {token}\r\n' if token else ''
+    request = f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n{auth}\r\n'.encode()
+
+    try:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            while (line := await reader.readline()) not in (b'\r\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+
+            if status_line.split()[1] == b'200':
+                samples.append(time.perf_counter() - start)
+            else:
+                errors.append(status_line)
+    except (ConnectionError, asyncio.IncompleteReadError) as exc:
+        errors.append(repr(exc))
+    finally:
+        writer.close()
+
+
+async def load(port, path, token, connections, duration):
+    samples, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*[client(port, path, token, deadline, samples, errors) for _ in range(connections)])
+    return {
+        'requests_per_second': round(len(samples) / duration, 1),
+        'errors': len(errors),
+        **percentiles(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of load per endpoint and mode.")
+    parser.add_argument('--offers', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=50)
+    parser.add_argument('--endpoints', nargs='+', default=['base-info', 'offer-list', 'order-count', 'review-list'])
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('uvicorn') is None:
+        sys.exit("This benchmark needs uvicorn: pip install uvicorn")
+
+    # The server processes share the seeded database, so it has to be a file
+    database = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    os.environ['DB_TEST_NAME'] = database
+    setup_django()
+
+    results = {}
+    with test_database():
+        endpoints = seed(args.offers, args.reviews)
+
+        for mode in ('sync', 'async'):
+            port = free_port()
+            server = start_server(port, database, async_views=mode == 'async')
+            try:
+                for name in args.endpoints:
+                    path, token = endpoints[name]
+                    results.setdefault(name, {})[mode] = asyncio.run(
+                        load(port, path, token, args.connections, args.duration)
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(json.dumps({'connections': args.connections, 'duration': args.duration, 'endpoints': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
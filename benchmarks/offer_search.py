@@ -0,0 +1,106 @@
+"""
+Benchmark for the offer search of the offer list endpoint.
+
+Seeds offers with random titles and descriptions into a throwaway test database
+and compares the former icontains scan with the full-text search backend of the
+configured database. Each sample runs the count and first-page queries of a
+paginated search, as the offer list does.
+
+Usage:
+    python -m benchmarks.offer_search --offers 500000
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks import percentiles, setup_django, test_database
+
+WORDS = [
+    'logo', 'design', 'brand', 'website', 'web', 'development', 'copywriting', 'text', 'seo', 'marketing',
+    'video', 'editing', 'animation', 'illustration', 'poster', 'flyer', 'social', 'media', 'app', 'mobile',
+    'python', 'django', 'react', 'shop', 'ecommerce', 'translation', 'german', 'english', 'podcast', 'audio',
+    'photo', 'retouch', 'banner', 'icon', 'font', 'print', 'business', 'card', 'newsletter', 'landing',
+]
+SYLLABLES = ['ka', 'lo', 'mi', 'ter', 'vo', 'ran', 'si', 'del', 'pu', 'nex', 'tor', 'ba']
+
+
+def build_vocabulary(size):
+    """
+    Returns the common service words plus random filler words, so search terms
+    match a realistic share of the offers instead of nearly all of them.
+    """
+    filler = {''.join(random.choices(SYLLABLES, k=random.randint(2, 4))) for _ in range(size)}
+    return WORDS + sorted(filler)
+
+
+def seed(offer_count, batch_size, vocabulary):
+    """
+    Creates one business user and offers with random titles and descriptions.
+    """
+    from django.contrib.auth.models import User
+    from apps.offers.models import Offer
+
+    user = User.objects.create(username='business', password='!')
+    for start in range(0, offer_count, batch_size):
+        Offer.objects.bulk_create([
+            Offer(
+                user=user,
+                title=' '.join(random.sample(vocabulary, 3)).capitalize(),
+                description=' '.join(random.choices(vocabulary, k=30)),
+            )
+            for _ in range(start, min(start + batch_size, offer_count))
+        ])
+
+
+def measure(backend, runs, page_size):
+    from apps.offers.models import Offer
+
+    samples = []
+    for _ in range(runs):
+        word = random.choice(WORDS)
+        term = word[:random.randint(3, len(word))] if len(word) > 3 else word
+
+        start = time.perf_counter()
+        queryset = backend.search(Offer.objects.all(), [term])
+        queryset.count()
+        list(queryset[:page_size])
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--offers', type=int, default=500_000)
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=6)
+    parser.add_argument('--vocabulary', type=int, default=5000, help="Number of random filler words.")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    setup_django()
+
+    from apps.offers.search import ContainsSearchBackend, get_search_backend
+
+    with test_database() as connection:
+        start = time.perf_counter()
+        seed(args.offers, args.batch_size, build_vocabulary(args.vocabulary))
+        seed_seconds = time.perf_counter() - start
+
+        backend = get_search_backend()
+        result = {
+            'offers': args.offers,
+            'runs': args.runs,
+            'vendor': connection.vendor,
+            'seed_seconds': round(seed_seconds, 1),
+            'icontains': measure(ContainsSearchBackend(), args.runs, args.page_size),
+            type(backend).__name__: measure(backend, args.runs, args.page_size),
+        }
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark for the order list query of ``OrderViewSet.get_queryset``.
+
+Seeds orders into a throwaway test database and compares the list latency of
+the former OR-union across the offer tables with the indexed single-table
+query on ``customer_user`` and ``business_user``.
+
+Usage:
+    python -m benchmarks.order_list --orders 1000000 --businesses 500 --customers 2000
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks import percentiles, setup_django, test_database
+
+
+def seed(order_count, business_count, customer_count, batch_size):
+    """
+    Creates business users with one offer each, customers and random orders.
+    """
+    from django.contrib.auth.models import User
+    from apps.offers.models import Offer, Offerdetail
+    from apps.orders.models import Order
+    from apps.users.models import Profile
+
+    # An unusable password skips the expensive hasher
+    businesses = User.objects.bulk_create(
+        [User(username=f'business{i}', password='!') for i in range(business_count)], batch_size=batch_size
+    )
+    customers = User.objects.bulk_create(
+        [User(username=f'customer{i}', password='!') for i in range(customer_count)], batch_size=batch_size
+    )
+    Profile.objects.bulk_create(
+        [Profile(user=user, type='business') for user in businesses]
+        + [Profile(user=user, type='customer') for user in customers],
+        batch_size=batch_size,
+    )
+
+    offers = Offer.objects.bulk_create(
+        [Offer(user=user, title=f'Offer of {user.username}', description='Benchmark offer') for user in businesses],
+        batch_size=batch_size,
+    )
+    details = Offerdetail.objects.bulk_create(
+        [
+            Offerdetail(
+                offer=offer, title=offer_type, revisions=index + 1, delivery_time_in_days=7 - index * 2,
+                price=100 * (index + 1), features=['Benchmark feature'], offer_type=offer_type,
+            )
+            for offer in offers
+            for index, offer_type in enumerate(['basic', 'standard', 'premium'])
+        ],
+        batch_size=batch_size,
+    )
+
+    for start in range(0, order_count, batch_size):
+        orders = []
+        for _ in range(start, min(start + batch_size, order_count)):
+            detail = random.choice(details)
+            orders.append(Order(
+                customer_user=random.choice(customers), business_user_id=detail.offer.user_id,
+                offer_detail=detail, title=detail.offer.title, revisions=detail.revisions,
+                delivery_time_in_days=detail.delivery_time_in_days, price=detail.price,
+                features=detail.features, offer_type=detail.offer_type,
+                status=random.choice(['in_progress', 'completed', 'cancelled']),
+            ))
+        Order.objects.bulk_create(orders)
+
+    return businesses + customers
+
+
+def legacy_queryset(user):
+    """
+    The OR-union across offer_detail__offer__user used before the business_user column.
+    """
+    from apps.orders.models import Order
+    return (Order.objects.filter(customer_user=user) | Order.objects.filter(offer_detail__offer__user=user)).order_by('-created_at')
+
+
+def indexed_queryset(user):
+    """
+    The single-table query used by OrderViewSet.get_queryset.
+    """
+    from django.db.models import Q
+    from apps.orders.models import Order
+    return Order.objects.filter(Q(customer_user=user) | Q(business_user=user)).order_by('-created_at')
+
+
+def measure(build_queryset, users, runs):
+    samples = []
+    for _ in range(runs):
+        user = random.choice(users)
+        start = time.perf_counter()
+        list(build_queryset(user))
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--businesses', type=int, default=500)
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    setup_django()
+
+    with test_database():
+        start = time.perf_counter()
+        users = seed(args.orders, args.businesses, args.customers, args.batch_size)
+        seed_seconds = time.perf_counter() - start
+
+        result = {
+            'orders': args.orders,
+            'users': len(users),
+            'runs': args.runs,
+            'seed_seconds': round(seed_seconds, 1),
+            'before': measure(legacy_queryset, users, args.runs),
+            'after': measure(indexed_queryset, users, args.runs),
+        }
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
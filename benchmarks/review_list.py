@@ -0,0 +1,106 @@
+"""
+Load test for the paginated review list of a single business user.
+
+Grows the reviews of one business user step by step in a throwaway test database
+and measures the response time of ``GET /api/reviews/`` in cursor mode at each
+size, for the first page and for a page in the middle of the history. With the
+keyset pagination and the (business_user, -updated_at) index both should stay flat.
+
+Usage:
+    python -m benchmarks.review_list --steps 1000 10000 100000
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks import percentiles, setup_django, test_database
+
+
+def add_reviews(business_user, reviewers, count, batch_size):
+    from apps.users.models import Review
+
+    for start in range(0, count, batch_size):
+        Review.objects.bulk_create([
+            Review(business_user=business_user, reviewer=random.choice(reviewers),
+                   rating=random.randint(1, 5), description='Benchmark review')
+            for _ in range(start, min(start + batch_size, count))
+        ])
+
+
+def middle_cursor_url(url, business_user):
+    """
+    Returns the link to the page starting in the middle of the review history.
+    """
+    from apps.users.api.pagination import ReviewPagination
+    from apps.users.models import Review
+
+    reviews = Review.objects.filter(business_user=business_user).order_by('-updated_at', '-id')
+    middle = reviews[reviews.count() // 2]
+
+    paginator = ReviewPagination()
+    paginator.base_url = f'http://testserver{url}?pagination=cursor&business_user_id={business_user.id}'
+    paginator.model_field = Review._meta.get_field('updated_at')
+    return paginator.encode_cursor(middle, reverse=False)
+
+
+def measure(client, url, params, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.get(url, params)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, nargs='+', default=[1000, 10_000, 100_000],
+                        help="Total number of reviews at each measuring step.")
+    parser.add_argument('--reviewers', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    setup_django()
+
+    from django.contrib.auth.models import User
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from apps.users.models import Profile
+
+    setup_test_environment()
+    results = []
+
+    with test_database():
+        business_user = User.objects.create(username='business', password='!')
+        Profile.objects.create(user=business_user, type='business')
+        reviewers = User.objects.bulk_create(
+            [User(username=f'reviewer{i}', password='!') for i in range(args.reviewers)]
+        )
+
+        client = APIClient()
+        client.force_authenticate(user=business_user)
+        url = reverse('review-list')
+        params = {'pagination': 'cursor', 'business_user_id': business_user.id}
+
+        total = 0
+        for step in sorted(args.steps):
+            add_reviews(business_user, reviewers, step - total, args.batch_size)
+            total = step
+
+            results.append({
+                'reviews': total,
+                'first_page': measure(client, url, params, args.runs),
+                'middle_page': measure(client, middle_cursor_url(url, business_user), None, args.runs),
+            })
+
+    print(json.dumps({'runs': args.runs, 'steps': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Seeds a marketplace of business users, offers, customers, orders and reviews.
+
+Rows are written with bulk inserts, which bypass the signals maintaining the stored
+minimums, counters and ratings, so the reconcile commands are run at the end. The
+same arguments and --seed always produce the same data.
+
+Run as a command, it seeds the configured database, e.g. for benchmarking a local
+server with ``benchmarks.api --url``. It refuses to touch a database that already has
+users, and writes the IDs and tokens the benchmark needs to a manifest file.
+
+Usage:
+    DB_NAME=/tmp/coderr-bench.sqlite3 python manage.py migrate
+    DB_NAME=/tmp/coderr-bench.sqlite3 python -m benchmarks.seed --businesses 200 --manifest /tmp/manifest.json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from io import StringIO
+
+from benchmarks import setup_django
+
+OFFER_TYPES = ['basic', 'standard', 'premium']
+WORDS = ['logo', 'design', 'website', 'branding', 'flyer', 'video', 'editing', 'copywriting',
+         'illustration', 'seo', 'marketing', 'app', 'photography', 'translation', 'podcast']
+RECONCILE_COMMANDS = ['recompute_offer_minimums', 'reconcile_order_stats',
+                      'reconcile_profile_ratings', 'reconcile_platform_stats']
+
+
+def add_scale_arguments(parser):
+    parser.add_argument('--businesses', type=int, default=100)
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--offers-per-business', type=int, default=5)
+    parser.add_argument('--orders', type=int, default=10_000)
+    parser.add_argument('--reviews', type=int, default=2_000)
+    parser.add_argument('--batch-size', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def seed(businesses, customers, offers_per_business, orders, reviews, batch_size=2_000, rng=None):
+    """
+    Creates the marketplace and returns its manifest: the IDs of the created rows
+    and a token per user, as needed to script requests against it.
+    """
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import transaction
+    from rest_framework.authtoken.models import Token
+    from apps.offers.models import Offer, Offerdetail
+    from apps.orders.models import Order
+    from apps.users.models import Profile, Review
+
+    rng = rng or random.Random(42)
+
+    def phrase(count):
+        return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+    with transaction.atomic():
+        # An unusable password skips the expensive hasher
+        business_users = User.objects.bulk_create(
+            [User(username=f'business{i}', password='!') for i in range(businesses)], batch_size=batch_size
+        )
+        customer_users = User.objects.bulk_create(
+            [User(username=f'customer{i}', password='!') for i in range(customers)], batch_size=batch_size
+        )
+        profiles = Profile.objects.bulk_create(
+            [Profile(user=user, type='business', first_name=user.username, location='Berlin') for user in business_users]
+            + [Profile(user=user, type='customer', first_name=user.username) for user in customer_users],
+            batch_size=batch_size,
+        )
+        tokens = Token.objects.bulk_create(
+            [Token(user=user, key=Token.generate_key()) for user in business_users + customer_users],
+            batch_size=batch_size,
+        )
+
+        offers = Offer.objects.bulk_create(
+            [
+                Offer(user=user, title=phrase(3).title(), description=phrase(20))
+                for user in business_users
+                for _ in range(offers_per_business)
+            ],
+            batch_size=batch_size,
+        )
+        details = Offerdetail.objects.bulk_create(
+            [
+                Offerdetail(
+                    offer=offer, title=f'{offer.title} {offer_type}', revisions=index + 1,
+                    delivery_time_in_days=rng.randint(1, 14) + index * 3,
+                    price=Decimal(rng.randint(20, 200) * (index + 1)),
+                    features=[phrase(2) for _ in range(index + 1)], offer_type=offer_type,
+                )
+                for offer in offers
+                for index, offer_type in enumerate(OFFER_TYPES)
+            ],
+            batch_size=batch_size,
+        )
+
+        for start in range(0, orders, batch_size):
+            batch = []
+            for _ in range(start, min(start + batch_size, orders)):
+                detail = rng.choice(details)
+                order = Order(customer_user=rng.choice(customer_users), offer_detail=detail,
+                              status=rng.choice(['in_progress', 'completed', 'cancelled']))
+                order.snapshot_offer_detail()
+                batch.append(order)
+            Order.objects.bulk_create(batch)
+
+        # One review per customer and business user, like the API allows
+        pairs = set()
+        while len(pairs) < min(reviews, businesses * customers):
+            pairs.add((rng.choice(business_users), rng.choice(customer_users)))
+        Review.objects.bulk_create(
+            [
+                Review(business_user=business, reviewer=customer, rating=rng.randint(1, 5), description=phrase(12))
+                for business, customer in sorted(pairs, key=lambda pair: (pair[0].id, pair[1].id))
+            ],
+            batch_size=batch_size,
+        )
+
+    for command in RECONCILE_COMMANDS:
+        call_command(command, stdout=StringIO())
+
+    return {
+        'businesses': [
+            {'user_id': profile.user_id, 'profile_id': profile.id}
+            for profile in profiles if profile.type == 'business'
+        ],
+        'customers': [user.id for user in customer_users],
+        'offers': [offer.id for offer in offers],
+        'offer_details': [detail.id for detail in details],
+        'tokens': {str(token.user_id): token.key for token in tokens},
+        'words': WORDS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--manifest', required=True, help="File to write the IDs and tokens of the seeded data to.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+
+    if User.objects.exists():
+        sys.exit("The database already has users. Seed an empty, migrated database.")
+
+    start = time.perf_counter()
+    manifest = seed(args.businesses, args.customers, args.offers_per_business, args.orders, args.reviews,
+                    args.batch_size, random.Random(args.seed))
+    with open(args.manifest, 'w') as file:
+        json.dump(manifest, file)
+
+    print(json.dumps({'seed_seconds': round(time.perf_counter() - start, 1), 'manifest': args.manifest}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Native async variants of read-heavy endpoints for deployments under ASGI.
+
+With ASYNC_VIEWS enabled, the URL configuration routes the hot read paths to the
+views built on `AsyncAPIView`, which run GET on the event loop with Django's async ORM
+instead of handing every request to a worker thread.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from apps.users.authentication import CachedTokenAuthentication
+
+
+def select_view(sync_view, async_view):
+    """
+    View function for a route: the async variant if ASYNC_VIEWS is enabled, else the DRF view.
+    """
+    if getattr(settings, 'ASYNC_VIEWS', False):
+        return async_view.as_view()
+    return sync_view.as_view()
+
+
+class AsyncTokenAuthentication(BaseAuthentication):
+    """
+    Hands the outcome of `CachedTokenAuthentication.aauthenticate` to a DRF request,
+    so the request authenticates like the DRF view without blocking the event loop.
+    """
+    def __init__(self, user_auth=None, error=None):
+        self.user_auth = user_auth
+        self.error = error
+
+    @classmethod
+    async def create(cls, request):
+        try:
+            return cls(user_auth=await CachedTokenAuthentication().aauthenticate(request))
+        except exceptions.AuthenticationFailed as exc:
+            return cls(error=exc)
+
+    def authenticate(self, request):
+        if self.error is not None:
+            raise self.error
+        return self.user_auth
+
+    def authenticate_header(self, request):
+        return CachedTokenAuthentication.keyword
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of a DRF view.
+
+    GET is implemented natively in `aget`, which receives a DRF request that was
+    authenticated with `CachedTokenAuthentication.aauthenticate` and passed the permission
+    and throttle checks of the DRF view in `sync_view`. Those checks run on the event loop,
+    so for GET they must not query the database; the permissions of this project only read
+    the user and the profile loaded with the token. Every other method is handed to the
+    DRF view through sync_to_async, so writes keep their validation, permissions and
+    transactions. Responses are rendered with DRF's JSON renderer and errors by the DRF
+    view's exception handling, so both variants return the same bodies and headers.
+
+    Subclasses set `sync_view` and implement `async def aget(self, request, *args, **kwargs)`.
+
+    Attributes:
+        sync_view: The DRF view class this view mirrors.
+    """
+    sync_view = None
+    sync_handler = None
+    renderer = JSONRenderer()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        if cls.sync_view is None or not hasattr(cls, 'aget'):
+            raise ImproperlyConfigured(f"{cls.__name__} must set sync_view and implement aget().")
+        view = super().as_view(sync_handler=cls.sync_view.as_view(), **initkwargs)
+        # Like the DRF views, these views authenticate with tokens rather than session cookies
+        view.csrf_exempt = True
+        return view
+
+    async def get(self, request, *args, **kwargs):
+        authenticator = await AsyncTokenAuthentication.create(request)
+        drf_request = Request(request, authenticators=[authenticator])
+        drf_view = self.sync_view(request=drf_request, args=args, kwargs=kwargs, format_kwarg=None)
+        try:
+            drf_view.perform_authentication(drf_request)
+            drf_view.check_permissions(drf_request)
+            drf_view.check_throttles(drf_request)
+            return await self.aget(drf_request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = drf_view.handle_exception(exc)
+            headers = {key: value for key, value in response.items() if key.lower() != 'content-type'}
+            return self.render(response.data, response.status_code, headers=headers)
+
+    async def delegate(self, request, *args, **kwargs):
+        """
+        Serves the request with the DRF view in a worker thread.
+        """
+        return await sync_to_async(self.sync_handler)(request, *args, **kwargs)
+
+    post = put = patch = delete = options = delegate
+
+    def render(self, data, status=200, headers=None):
+        # Rendered right away, since Django hands responses with a render method to a thread
+        response = HttpResponse(
+            self.renderer.render(data),
+            content_type=self.renderer.media_type,
+            status=status,
+            headers=headers,
+        )
+        # Exposes the data like a DRF Response does, e.g. for tests
+        response.data = data
+        return response
@@ -0,0 +1,47 @@
+"""
+Conditional request support (ETag / Last-Modified) for single-object endpoints.
+"""
+from functools import wraps
+
+from django.views.decorators.http import condition
+
+PRECONDITION_HEADERS = ('HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')
+
+
+def conditional(timestamps):
+    """
+    Build a view decorator that answers conditional requests from `updated_at` values.
+
+    `timestamps(pk)` returns the `updated_at` values the representation depends on,
+    read with a single narrow query, or None if the object does not exist.
+    GET requests with a matching `If-None-Match` or `If-Modified-Since` get a 304
+    without running the view, and PATCH requests with a stale `If-Match` get a 412.
+    The lookup runs once per request and is shared by the ETag and Last-Modified checks;
+    unsafe requests without a precondition header skip it entirely.
+    """
+    def lookup(request, pk, **kwargs):
+        if not hasattr(request, '_conditional_timestamps'):
+            values = timestamps(pk)
+            request._conditional_timestamps = values and [value for value in values if value is not None]
+        return request._conditional_timestamps
+
+    def etag(request, *args, **kwargs):
+        values = lookup(request, *args, **kwargs)
+        if not values:
+            return None
+        return '"%s"' % '.'.join(format(int(value.timestamp() * 1_000_000), 'x') for value in values)
+
+    def last_modified(request, *args, **kwargs):
+        values = lookup(request, *args, **kwargs)
+        return max(values) if values else None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') and not any(h in request.META for h in PRECONDITION_HEADERS):
+                return view(request, *args, **kwargs)
+            return conditional_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,184 @@
+"""
+Streaming CSV and NDJSON exports of querysets of any size.
+
+Rows are read as a `.values()` projection with `.iterator()`, encoded in buffers of
+about 64 KiB and sent as they are produced, so memory stays constant however many
+rows are exported. Clients sending `Accept-Encoding: gzip` get the stream compressed.
+
+Under ASGI the response streams from an async generator over `.aiterator()`, since
+Django reads a synchronous streaming response there into memory before sending it.
+"""
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from gzip import GzipFile
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import StreamingBuffer, compress_sequence
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import BaseContentNegotiation
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+# Cells starting with these characters are read as formulas by spreadsheet programs
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """
+    Encodes prices as numbers, like the API responses do.
+    """
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return super().default(o)
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    Renders errors of an export with the first renderer, whatever the Accept header.
+    The export itself is not rendered by DRF, so `Accept: text/csv` must not be rejected.
+    """
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def get_export_format(request):
+    """
+    The format asked for with `?export_format=`, else NDJSON if the Accept header
+    names it, else CSV. The DRF `format` parameter is left to content negotiation.
+    """
+    export_format = request.query_params.get('export_format')
+    if export_format is None:
+        return 'ndjson' if 'ndjson' in request.headers.get('Accept', '') else 'csv'
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError({"export_format": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]})
+    return export_format
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class RowWriter:
+    """
+    Writes rows as CSV with a header line, or as one JSON object per line, into a buffer
+    that is handed out whenever it holds about BUFFER_SIZE bytes.
+    """
+    def __init__(self, fields, export_format):
+        self.fields = fields
+        self.buffer = io.StringIO()
+        if export_format == 'csv':
+            self.csv_writer = csv.writer(self.buffer)
+            self.csv_writer.writerow(fields)
+        else:
+            self.csv_writer = None
+            self.encoder = ExportEncoder()
+
+    def write(self, row):
+        """
+        Writes a row and returns the encoded buffer if it is full, else None.
+        """
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([csv_value(row[field]) for field in self.fields])
+        else:
+            self.buffer.write(self.encoder.encode(row))
+            self.buffer.write('\n')
+        if self.buffer.tell() >= BUFFER_SIZE:
+            return self.close()
+        return None
+
+    def close(self):
+        """
+        Returns the encoded rest of the buffer and empties it.
+        """
+        chunk = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return chunk
+
+
+def encode(rows, fields, export_format):
+    """
+    Yields the rows encoded as CSV with a header line, or as one JSON object per line.
+    """
+    writer = RowWriter(fields, export_format)
+    for row in rows:
+        chunk = writer.write(row)
+        if chunk:
+            yield chunk
+    yield writer.close()
+
+
+async def aencode(rows, fields, export_format):
+    """
+    Async variant of `encode` for rows of an async iterator.
+    """
+    writer = RowWriter(fields, export_format)
+    async for row in rows:
+        chunk = writer.write(row)
+        if chunk:
+            yield chunk
+    yield writer.close()
+
+
+async def acompress_sequence(sequence):
+    """
+    Async variant of `django.utils.text.compress_sequence`, compressing the chunks
+    of an async iterator into a single gzip stream.
+    """
+    buffer = StreamingBuffer()
+    with GzipFile(mode='wb', compresslevel=6, fileobj=buffer, mtime=0) as zfile:
+        yield buffer.read()
+        async for chunk in sequence:
+            zfile.write(chunk)
+            data = buffer.read()
+            if data:
+                yield data
+    yield buffer.read()
+
+
+def export_response(request, queryset, fields, filename):
+    """
+    Streams the given fields of the queryset as a file download, in the format
+    of `get_export_format`. The query runs while the response is sent, with the
+    async ORM if the request came in over ASGI.
+    """
+    export_format = get_export_format(request)
+    rows = queryset.values(*fields)
+    if isinstance(request._request, ASGIRequest):
+        content = aencode(rows.aiterator(chunk_size=CHUNK_SIZE), fields, export_format)
+        compress = acompress_sequence
+    else:
+        content = encode(rows.iterator(chunk_size=CHUNK_SIZE), fields, export_format)
+        compress = compress_sequence
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    if re_accepts_gzip.search(request.headers.get('Accept-Encoding', '')):
+        response.streaming_content = compress(response.streaming_content)
+        response['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,193 @@
+"""
+Per-request SQL and timing instrumentation.
+
+`RequestInstrumentationMiddleware` samples requests to the paths in INSTRUMENTATION_PATHS
+at INSTRUMENTATION_SAMPLE_RATE. For a sampled request it counts the queries and their
+time with a database execute wrapper, times the view and the serializers, and reports
+the numbers in a `Server-Timing` header and a JSON log line on the
+`coderr_backend.instrumentation` logger. Queries slower than SLOW_QUERY_THRESHOLD_MS
+are logged with their SQL and the line of project code that ran them, and requests
+running more queries than their budget in `coderr_backend.query_budgets` are logged
+as warnings.
+"""
+import json
+import logging
+import os
+import random
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from coderr_backend.query_budgets import get_budget
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = ['/api/offers/', '/api/orders/', '/api/reviews/']
+
+_current_metrics = ContextVar('request_metrics', default=None)
+_serializing = ContextVar('serializing', default=False)
+
+
+class RequestMetrics:
+    """
+    Numbers collected for one request. Also the execute wrapper counting its queries.
+
+    Attributes:
+        queries: Number of queries run.
+        timings: Milliseconds spent per phase: 'db', 'serialize' and 'view'.
+        slow_queries: SQL, duration and call site of the queries over the threshold.
+    """
+    def __init__(self, slow_query_threshold):
+        self.slow_query_threshold = slow_query_threshold
+        self.queries = 0
+        self.timings = {'db': 0.0, 'serialize': 0.0, 'view': 0.0}
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.timings['db'] += duration
+            if duration >= self.slow_query_threshold:
+                self.slow_queries.append({
+                    'sql': sql,
+                    'duration_ms': round(duration, 2),
+                    'location': call_site(),
+                })
+
+    def server_timing(self):
+        """
+        Value of the Server-Timing header, durations in milliseconds.
+        """
+        return ', '.join([
+            f'db;dur={self.timings["db"]:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.timings["serialize"]:.2f}',
+            f'view;dur={self.timings["view"]:.2f}',
+        ])
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            **{f'{name}_ms': round(duration, 2) for name, duration in self.timings.items()},
+            'slow_queries': self.slow_queries,
+        }
+
+
+def call_site():
+    """
+    Innermost frame of project code on the stack, as 'path:line in function'.
+    """
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if filename.startswith(base_dir) and filename != __file__ and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+@contextmanager
+def timed(name):
+    """
+    Adds the time spent in the block to the named timing of the current request, if it is sampled.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += (time.perf_counter() - start) * 1000
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin recording the time spent in `to_representation` as the 'serialize' timing.
+
+    Only the outermost call is timed, so nested serializers using the mixin are not counted twice.
+    """
+    def to_representation(self, instance):
+        if _current_metrics.get() is None or _serializing.get():
+            return super().to_representation(instance)
+
+        token = _serializing.set(True)
+        try:
+            with timed('serialize'):
+                return super().to_representation(instance)
+        finally:
+            _serializing.reset(token)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Middleware instrumenting a sample of the requests to INSTRUMENTATION_PATHS.
+
+    Meant to be the last middleware, so the 'view' timing covers resolving the URL,
+    running the view and rendering the response. Requests that are not sampled pass
+    straight through. Under ASGI a sampled request is instrumented in a worker thread,
+    so the queries of async views, which run in that thread through sync_to_async,
+    are counted as well.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.is_sampled(request):
+            return self.get_response(request)
+        return self.instrument(request, self.get_response)
+
+    async def __acall__(self, request):
+        if not self.is_sampled(request):
+            return await self.get_response(request)
+        return await sync_to_async(self.instrument)(request, async_to_sync(self.get_response))
+
+    def is_sampled(self, request):
+        paths = getattr(settings, 'INSTRUMENTATION_PATHS', DEFAULT_PATHS)
+        if not request.path.startswith(tuple(paths)):
+            return False
+        return random.random() < getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0)
+
+    def instrument(self, request, get_response):
+        metrics = RequestMetrics(getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100))
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(metrics):
+                response = get_response(request)
+        finally:
+            metrics.timings['view'] = (time.perf_counter() - start) * 1000
+            _current_metrics.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        budget = get_budget(match.url_name, request.method) if match else None
+        over_budget = budget is not None and metrics.queries > budget
+
+        response['Server-Timing'] = metrics.server_timing()
+        logger.log(
+            logging.WARNING if metrics.slow_queries or over_budget else logging.INFO,
+            json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'route': match.url_name if match else None,
+                'status': response.status_code,
+                **metrics.as_dict(),
+                'query_budget': budget,
+            }),
+        )
+        return response
@@ -0,0 +1,142 @@
+"""
+Pagination shared by the API apps.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed set of orderings.
+
+    Pages are selected with a WHERE clause on the ordering field and the primary key
+    as tiebreaker instead of an OFFSET, so deep pages cost the same as the first one
+    and no total count is computed. The ordering is taken from the `ordering` query
+    parameter if it is one of `ordering_fields`, else `default_ordering` is used.
+    Each ordering should be backed by a composite index on (field, id).
+    """
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 10
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    ordering_fields = []
+    default_ordering = None
+    tiebreaker = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request)
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+        cursor = self.decode_cursor(request)
+        self.has_cursor = cursor is not None
+        self.reverse = cursor is not None and cursor['reverse']
+
+        # Walk backwards for a previous page by flipping the direction
+        descending = self.descending != self.reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}{self.tiebreaker}')
+
+        if cursor is not None:
+            lookup = 'lt' if descending else 'gt'
+            # The redundant range condition lets the database seek in the index
+            queryset = queryset.filter(**{f'{self.field}__{lookup}e': cursor['value']}).filter(
+                Q(**{f'{self.field}__{lookup}': cursor['value']})
+                | Q(**{self.field: cursor['value'], f'{self.tiebreaker}__{lookup}': cursor['pk']})
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, '').split(',')[0].strip()
+        if ordering.lstrip('-') not in self.ordering_fields:
+            ordering = self.default_ordering
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            reverse, pk, value = urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8').split('|', 2)
+            return {
+                'reverse': reverse == 'r',
+                'pk': int(pk),
+                'value': self.model_field.to_python(value),
+            }
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        raw = '|'.join(['r' if reverse else 'f', str(instance.pk), self.model_field.value_to_string(instance)])
+        encoded = urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        # A page reached backwards always has the page it was reached from after it
+        if not self.reverse and not self.has_more:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_cursor:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        if self.reverse and not self.has_more:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+def bound_unpaginated(queryset):
+    """
+    Limits a list that is not paginated to one row more than UNPAGINATED_LIST_LIMIT,
+    so `truncate_unpaginated` can tell whether rows were left out.
+    """
+    limit = settings.UNPAGINATED_LIST_LIMIT
+    return queryset[:limit + 1] if limit else queryset
+
+
+def truncate_unpaginated(rows):
+    """
+    Returns the rows of a bounded list up to UNPAGINATED_LIST_LIMIT, and the response
+    headers, which include `X-Truncated: true` if rows were left out.
+    """
+    limit = settings.UNPAGINATED_LIST_LIMIT
+    if limit and len(rows) > limit:
+        return rows[:limit], {'X-Truncated': 'true'}
+    return rows, {}
@@ -0,0 +1,41 @@
+"""
+Query budgets of the API endpoints.
+
+Maps each named API route to the maximum number of queries per HTTP method. The
+budgets are the worst case with a cold token cache, so they include the token lookup.
+The harness in `coderr_backend/tests/test_query_budgets.py` runs every route with 1 and
+with 50 related objects and fails if a count exceeds the budget or grows with the
+number of objects. Sampled requests over budget are logged as warnings by
+`coderr_backend.instrumentation`.
+
+A new route needs a budget here and a case in the harness.
+"""
+
+QUERY_BUDGETS = {
+    'base-info': {'GET': 2},
+    'offer-list': {'GET': 4, 'POST': 7},
+    'offer-batch': {'POST': 7},
+    'offer-detail': {'GET': 4, 'PATCH': 8, 'DELETE': 8},
+    'offerdetail-detail': {'GET': 3},
+    'order-list': {'GET': 2, 'POST': 6},
+    'order-export': {'GET': 2},
+    'order-detail': {'GET': 2, 'PATCH': 6, 'DELETE': 6},
+    'order-count': {'GET': 2},
+    'completed-order-count': {'GET': 2},
+    'order-stats': {'GET': 2},
+    'profile-detail': {'GET': 4, 'PATCH': 5},
+    'profile-business': {'GET': 2},
+    'profile-customer': {'GET': 2},
+    'registration': {'POST': 9},
+    'login': {'POST': 5},
+    'review-list': {'GET': 3, 'POST': 6},
+    'review-export': {'GET': 3},
+    'review-detail': {'GET': 2, 'PATCH': 6, 'DELETE': 6},
+}
+
+
+def get_budget(url_name, method):
+    """
+    Query budget of a route and method, or None if none is declared.
+    """
+    return QUERY_BUDGETS.get(url_name, {}).get(method)
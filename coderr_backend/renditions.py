@@ -0,0 +1,179 @@
+"""
+Downsized renditions of uploaded images.
+
+Offer images and profile pictures are stored as uploaded. Once an upload is committed,
+each size in IMAGE_RENDITION_SIZES is rendered in the original format and as WebP and
+stored next to the original. This happens in a thread pool, so the request does not wait
+for the image to be decoded. The storage names are kept in a JSON field on the model,
+and `RenditionsField` turns them into URLs.
+
+The pool lives in the worker process, so renders that are queued or running when a
+worker stops are lost. Run the `render_image_renditions` command after deploys and
+restarts, e.g. from cron, to render every image that is still missing its renditions.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = {'thumbnail': 160, 'small': 480, 'medium': 960}
+
+# Formats a rendition keeps from the original, with their file extension; others become PNG
+FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+_executor = None
+
+
+def get_sizes():
+    """
+    Rendition names mapped to the maximum width and height in pixels, the IMAGE_RENDITION_SIZES setting.
+    """
+    return getattr(settings, 'IMAGE_RENDITION_SIZES', DEFAULT_SIZES)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2),
+            thread_name_prefix='renditions',
+        )
+    return _executor
+
+
+def source_name(instance, field_name):
+    """
+    Storage name of an image field, read from __dict__ so deferred fields are not fetched.
+    Uploads that are not saved yet give the name of the uploaded file.
+    """
+    value = instance.__dict__.get(field_name)
+    return getattr(value, 'name', value) or ''
+
+
+def render(image_file, sizes):
+    """
+    Renders an image at the given sizes, never enlarging it.
+
+    Returns a dict mapping each size name to `(width, height, files)`, where `files`
+    maps 'url' and 'webp' to `(extension, content)` of the encoded rendition.
+    """
+    with Image.open(image_file) as original:
+        image_format = original.format if original.format in FORMATS else 'PNG'
+        # Lets JPEG decode at a reduced scale if even the largest rendition is much smaller
+        largest = max(sizes.values())
+        original.draft('RGB', (largest, largest))
+        original = ImageOps.exif_transpose(original)
+
+    rendered = {}
+    for name, size in sizes.items():
+        image = original.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        files = {}
+        for key, file_format in (('url', image_format), ('webp', 'WEBP')):
+            buffer = BytesIO()
+            image.save(buffer, file_format, quality=85)
+            files[key] = (FORMATS[file_format], buffer.getvalue())
+        rendered[name] = (image.width, image.height, files)
+    return rendered
+
+
+def generate(model, pk, field_name, renditions_field, name):
+    """
+    Renders the image `name` of an instance and stores the renditions next to it.
+
+    The renditions are saved to the instance only if the image is still `name`,
+    so a slow rendition never overwrites those of a newer upload. Saving bumps
+    updated_at and sends post_save, which invalidates cached responses.
+    """
+    storage = model._meta.get_field(field_name).storage
+    with storage.open(name) as image_file:
+        rendered = render(image_file, get_sizes())
+
+    stem, _ = os.path.splitext(name)
+    renditions = {}
+    for size_name, (width, height, files) in rendered.items():
+        renditions[size_name] = {'width': width, 'height': height}
+        for key, (extension, content) in files.items():
+            path = f'{stem}_{size_name}.{extension}'
+            # Rendering an image again replaces its renditions instead of adding suffixed copies
+            if storage.exists(path):
+                storage.delete(path)
+            renditions[size_name][key] = storage.save(path, ContentFile(content))
+
+    instance = model.objects.filter(pk=pk, **{field_name: name}).first()
+    if instance is not None:
+        setattr(instance, renditions_field, renditions)
+        instance.save(update_fields=[renditions_field, 'updated_at'])
+    return renditions
+
+
+def generate_in_worker(*args):
+    # Worker threads keep their own connection, which is dropped like at the end of a request
+    close_old_connections()
+    try:
+        generate(*args)
+    except Exception:
+        logger.exception("Rendering the image %s of %s %s failed", args[4], args[0].__name__, args[1])
+    finally:
+        close_old_connections()
+
+
+def schedule(model, pk, field_name, renditions_field, name):
+    """
+    Renders the renditions of an image once the current transaction commits.
+
+    The work goes to the thread pool, or runs in the calling thread if
+    IMAGE_RENDITIONS_SYNC is enabled.
+    """
+    args = (model, pk, field_name, renditions_field, name)
+
+    def submit():
+        if getattr(settings, 'IMAGE_RENDITIONS_SYNC', False):
+            generate(*args)
+        else:
+            get_executor().submit(generate_in_worker, *args)
+
+    transaction.on_commit(submit)
+
+
+def rendition_urls(renditions, storage, request=None):
+    """
+    Renditions with the storage names replaced by URLs, absolute if a request is given.
+    """
+    def url(name):
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return {
+        size_name: {
+            'width': rendition['width'],
+            'height': rendition['height'],
+            'url': url(rendition['url']),
+            'webp': url(rendition['webp']),
+        }
+        for size_name, rendition in renditions.items()
+    }
+
+
+class RenditionsField(serializers.Field):
+    """
+    Read-only field for a renditions JSON field, mapping each size to its width,
+    height and the URLs of the original format and the WebP version.
+    """
+    def __init__(self, storage, **kwargs):
+        self.storage = storage
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return rendition_urls(value or {}, self.storage, self.context.get('request'))
@@ -13,6 +13,7 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 import sys
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -65,6 +66,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    # Last, so its view timing covers only the view and rendering
+    'coderr_backend.instrumentation.RequestInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'coderr_backend.urls'
@@ -86,16 +89,135 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'coderr_backend.wsgi.application'
+ASGI_APPLICATION = 'coderr_backend.asgi.application'
+
+# Serve the hot read endpoints with the native async views in coderr_backend.async_views,
+# for deployments under an ASGI server such as uvicorn
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '0') == '1'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects the backend: 'sqlite' (default) or 'postgresql' (requires psycopg).
+# Connections are kept open for CONN_MAX_AGE seconds and health-checked before reuse.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE not in ('sqlite', 'postgresql'):
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgresql', not {DB_ENGINE!r}.")
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'coderr'),
+            'USER': os.getenv('DB_USER', ''),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', ''),
+            'PORT': os.getenv('DB_PORT', ''),
+            'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    # WAL lets readers run alongside a writer, IMMEDIATE transactions take the write lock
+    # up front, and the timeout makes writers wait for the lock instead of failing
+    # with "database is locked".
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 0)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=134217728'
+                ),
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+            'TEST': {
+                # Set to a file path to run the concurrency tests, which need a file database
+                'NAME': os.getenv('DB_TEST_NAME'),
+            },
+        }
     }
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The local-memory backend evicts the least recently used entries beyond MAX_ENTRIES.
+# Set OFFER_CACHE_BACKEND and OFFER_CACHE_LOCATION, and TOKEN_CACHE_BACKEND and
+# TOKEN_CACHE_LOCATION (e.g. Redis or Memcached) to share the offer list and token
+# caches between processes.
+
+LOCMEM_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+CACHES = {
+    'default': {
+        'BACKEND': LOCMEM_CACHE_BACKEND,
+    },
+    'offers': {
+        'BACKEND': os.getenv('OFFER_CACHE_BACKEND', LOCMEM_CACHE_BACKEND),
+        'LOCATION': os.getenv('OFFER_CACHE_LOCATION', 'offers'),
+    },
+    'auth': {
+        'BACKEND': os.getenv('TOKEN_CACHE_BACKEND', LOCMEM_CACHE_BACKEND),
+        'LOCATION': os.getenv('TOKEN_CACHE_LOCATION', 'auth'),
+    },
+}
+if CACHES['offers']['BACKEND'] == LOCMEM_CACHE_BACKEND:
+    CACHES['offers']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('OFFER_CACHE_MAX_ENTRIES', 1000))}
+if CACHES['auth']['BACKEND'] == LOCMEM_CACHE_BACKEND:
+    CACHES['auth']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', 10000))}
+
+OFFER_LIST_CACHE_ALIAS = 'offers'
+# A local-memory cache only sees the catalog version moves of its own process, and other
+# processes would serve stale lists until the timeout, so lists are only cached by default
+# with a shared backend. A timeout with the local-memory backend suits a single process only.
+OFFER_LIST_CACHE_TIMEOUT = int(os.getenv(
+    'OFFER_LIST_CACHE_TIMEOUT', 0 if CACHES['offers']['BACKEND'] == LOCMEM_CACHE_BACKEND else 60
+))
+
+# Authenticated tokens with their user and profile, see apps.users.authentication
+TOKEN_CACHE_ALIAS = 'auth'
+# A local-memory cache is only invalidated by writes in its own process, so other processes
+# accept a revoked token or a deactivated user until the timeout, which is kept short
+TOKEN_CACHE_LOCMEM_MAX_TIMEOUT = 30
+TOKEN_CACHE_TIMEOUT = int(os.getenv(
+    'TOKEN_CACHE_TIMEOUT', 5 if CACHES['auth']['BACKEND'] == LOCMEM_CACHE_BACKEND else 300
+))
+if CACHES['auth']['BACKEND'] == LOCMEM_CACHE_BACKEND and TOKEN_CACHE_TIMEOUT > TOKEN_CACHE_LOCMEM_MAX_TIMEOUT:
+    raise ImproperlyConfigured(
+        f"TOKEN_CACHE_TIMEOUT may be at most {TOKEN_CACHE_LOCMEM_MAX_TIMEOUT} seconds with the local-memory "
+        "cache backend. Set TOKEN_CACHE_BACKEND to a shared cache for longer timeouts."
+    )
+
+# Downsized copies of uploaded images, maximum width and height in pixels, see coderr_backend.renditions
+IMAGE_RENDITION_SIZES = {'thumbnail': 160, 'small': 480, 'medium': 960}
+IMAGE_RENDITION_WORKERS = int(os.getenv('IMAGE_RENDITION_WORKERS', 2))
+# Renders in the saving thread right after the commit instead of the thread pool, e.g. for tests
+IMAGE_RENDITIONS_SYNC = os.getenv('IMAGE_RENDITIONS_SYNC', '0') == '1'
+
+# Query counts and timings of a sample of the requests to these paths, see coderr_backend.instrumentation
+INSTRUMENTATION_PATHS = os.getenv('INSTRUMENTATION_PATHS', '/api/offers/,/api/orders/,/api/reviews/').split(',')
+# Fraction of the requests to instrument, from 0 (off, the default) to 1 (every request)
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('INSTRUMENTATION_SAMPLE_RATE', 0))
+# Queries of sampled requests taking at least this many milliseconds are logged with their SQL
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'coderr_backend.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 
@@ -146,13 +268,20 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
 }
 
+# Maximum rows of the profile and review lists when no pagination is requested;
+# longer lists are cut off and marked with an X-Truncated header (0 for no limit)
+UNPAGINATED_LIST_LIMIT = int(os.getenv('UNPAGINATED_LIST_LIMIT', 1000))
+
 CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5500",  # Local Server Domain
-]
\ No newline at end of file
+]
+
+# Response headers the frontend may read on cross-origin requests
+CORS_EXPOSE_HEADERS = ['X-Truncated']
\ No newline at end of file
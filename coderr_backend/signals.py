@@ -0,0 +1,20 @@
+"""
+Helpers for the signal handlers maintaining stored counters and aggregates.
+"""
+from django.db.models.signals import post_init
+
+
+def remember_loaded_values(model, **attributes):
+    """
+    Connect a post_init receiver keeping the values of fields as loaded from the database,
+    e.g. `remember_loaded_values(Order, _stats_status='status')` sets `order._stats_status`.
+
+    The values are read from `__dict__`, so deferred fields are not fetched and are None.
+    post_save handlers compare them with the saved values and then store the new ones.
+    """
+    def remember(sender, instance, **kwargs):
+        for attribute, field in attributes.items():
+            setattr(instance, attribute, instance.__dict__.get(field))
+
+    post_init.connect(remember, sender=model, weak=False,
+                      dispatch_uid=f'remember_loaded_values:{model._meta.label}:{",".join(attributes)}')
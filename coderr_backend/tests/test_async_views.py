@@ -0,0 +1,62 @@
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAdminUser
+from rest_framework.throttling import BaseThrottle
+from apps.orders.api.async_views import AsyncOrderCountView
+from apps.orders.api.views import OrderCountView
+from apps.users.models import Profile
+from coderr_backend.async_views import AsyncAPIView
+
+
+class DenyThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+    def wait(self):
+        return 30
+
+
+class AsyncAPIViewTests(TestCase):
+    def setUp(self):
+        # Set up a business profile and a customer with a token
+        business = User.objects.create_user(username='business', password='testpass')
+        self.profile = Profile.objects.create(user=business, type='business')
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        Profile.objects.create(user=self.customer, type='customer')
+        self.token = Token.objects.create(user=self.customer)
+        self.url = reverse('order-count', args=[self.profile.pk])
+
+    def get(self, token=None):
+        headers = {'Authorization': 'Token ' + token} if token else {}
+        request = AsyncRequestFactory().get(self.url, headers=headers)
+        return async_to_sync(AsyncOrderCountView.as_view())(request, business_user_id=self.profile.pk)
+
+    def test_authentication(self):
+        # Test that missing and invalid tokens are rejected like by the DRF view
+        self.assertEqual(self.get(self.token.key).status_code, 200)
+
+        response = self.get()
+        self.assertEqual((response.status_code, response['WWW-Authenticate']), (401, 'Token'))
+        response = self.get('invalid')
+        self.assertEqual((response.status_code, response.data['detail'].code), (401, 'authentication_failed'))
+
+    def test_permissions_and_throttles_of_the_drf_view(self):
+        # Test that the permission and throttle classes of the DRF view apply
+        with mock.patch.object(OrderCountView, 'permission_classes', [IsAdminUser]):
+            self.assertEqual(self.get(self.token.key).status_code, 403)
+
+        with mock.patch.object(OrderCountView, 'throttle_classes', [DenyThrottle]):
+            response = self.get(self.token.key)
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '30'))
+
+    def test_aget_is_required(self):
+        class IncompleteView(AsyncAPIView):
+            sync_view = OrderCountView
+
+        with self.assertRaises(ImproperlyConfigured):
+            IncompleteView.as_view()
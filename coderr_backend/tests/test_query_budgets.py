@@ -0,0 +1,255 @@
+import csv
+import io
+import json
+from types import SimpleNamespace
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from apps.info.models import PlatformStats
+from apps.offers.models import Offer, Offerdetail
+from apps.orders.models import BusinessOrderStats, Order
+from apps.users.models import Profile, Review
+from coderr_backend.query_budgets import QUERY_BUDGETS
+
+SIZES = (1, 50)
+
+
+def offer_data(title):
+    return {
+        "title": title,
+        "description": "Budget offer",
+        "details": [
+            {"title": offer_type, "revisions": 1, "delivery_time_in_days": 3 + index, "price": 100 + index * 50,
+             "features": ["Feature"], "offer_type": offer_type}
+            for index, offer_type in enumerate(['basic', 'standard', 'premium'])
+        ],
+    }
+
+
+def create_offer(user, title):
+    offer = Offer.objects.create(user=user, title=title, description="Budget offer", min_price=100, min_delivery_time=3)
+    details = Offerdetail.objects.bulk_create([
+        Offerdetail(offer=offer, title=offer_type, revisions=1, delivery_time_in_days=3, price=100,
+                    features=["Feature"], offer_type=offer_type)
+        for offer_type in ['basic', 'standard', 'premium']
+    ])
+    return offer, details
+
+
+def create_business(username):
+    user = User.objects.create(username=username, password='!')
+    Profile.objects.create(user=user, type='business')
+    return user
+
+
+def build(size):
+    """
+    Creates `size` business users, customers, offers of the first business user with
+    three details each, orders of the first customer and reviews of the first business user.
+    """
+    businesses = [User.objects.create_user(username='business0', password='budget')] + User.objects.bulk_create(
+        [User(username=f'business{index}', password='!') for index in range(1, size)]
+    )
+    customers = [User.objects.create_user(username='customer0', password='budget')] + User.objects.bulk_create(
+        [User(username=f'customer{index}', password='!') for index in range(1, size)]
+    )
+    staff = User.objects.create(username='staff', password='!', is_staff=True)
+    Profile.objects.bulk_create(
+        [Profile(user=user, type='business') for user in businesses]
+        + [Profile(user=user, type='customer') for user in customers + [staff]]
+    )
+    business, customer = businesses[0], customers[0]
+
+    offers = Offer.objects.bulk_create([
+        Offer(user=business, title=f'Offer {index}', description="Budget offer", min_price=100, min_delivery_time=3)
+        for index in range(size)
+    ])
+    details = Offerdetail.objects.bulk_create([
+        Offerdetail(offer=offer, title=offer_type, revisions=1, delivery_time_in_days=3, price=100,
+                    features=["Feature"], offer_type=offer_type)
+        for offer in offers
+        for offer_type in ['basic', 'standard', 'premium']
+    ])
+
+    orders = []
+    for index in range(size):
+        order = Order(customer_user=customer, offer_detail=details[index * 3])
+        order.snapshot_offer_detail()
+        orders.append(order)
+    orders = Order.objects.bulk_create(orders)
+
+    reviews = Review.objects.bulk_create([
+        Review(business_user=business, reviewer=reviewer, rating=4, description="Budget review")
+        for reviewer in customers
+    ])
+
+    PlatformStats.reconcile()
+    BusinessOrderStats.rebuild(business.id)
+    Profile.reconcile_ratings()
+
+    return SimpleNamespace(
+        business=business, customer=customer, staff=staff, offers=offers, details=details,
+        orders=orders, reviews=reviews,
+        business_profile=Profile.objects.get(user=business), customer_profile=Profile.objects.get(user=customer),
+    )
+
+
+# Each case prepares a request on the data of `build` and returns (user, path, data)
+
+CASES = {
+    'base-info': {
+        'GET': lambda data: (data.customer, reverse('base-info'), None),
+    },
+    'offer-list': {
+        'GET': lambda data: (data.customer, reverse('offer-list') + '?ordering=min_price&page_size=10', None),
+        'POST': lambda data: (data.business, reverse('offer-list'), offer_data("New offer")),
+    },
+    'offer-batch': {
+        'POST': lambda data: (data.business, reverse('offer-batch'), [offer_data(f"Batch {index}") for index in range(3)]),
+    },
+    'offer-detail': {
+        'GET': lambda data: (data.customer, reverse('offer-detail', args=[data.offers[0].pk]), None),
+        'PATCH': lambda data: (data.business, reverse('offer-detail', args=[data.offers[0].pk]),
+                               {"title": "Renamed", "details": offer_data("Renamed")["details"]}),
+        'DELETE': lambda data: (data.business, reverse('offer-detail', args=[create_offer(data.business, "Old")[0].pk]), None),
+    },
+    'offerdetail-detail': {
+        'GET': lambda data: (data.customer, reverse('offerdetail-detail', args=[data.details[0].pk]), None),
+    },
+    'order-list': {
+        'GET': lambda data: (data.customer, reverse('order-list'), None),
+        'POST': lambda data: (data.customer, reverse('order-list'), {"offer_detail_id": data.details[0].pk}),
+    },
+    'order-export': {
+        'GET': lambda data: (data.business, reverse('order-export'), None),
+    },
+    'order-detail': {
+        'GET': lambda data: (data.customer, reverse('order-detail', args=[data.orders[0].pk]), None),
+        'PATCH': lambda data: (data.business, reverse('order-detail', args=[data.orders[0].pk]), {"status": "completed"}),
+        'DELETE': lambda data: (data.staff, reverse('order-detail', args=[data.orders[0].pk]), None),
+    },
+    'order-count': {
+        'GET': lambda data: (data.customer, reverse('order-count', args=[data.business_profile.pk]), None),
+    },
+    'completed-order-count': {
+        'GET': lambda data: (data.customer, reverse('completed-order-count', args=[data.business_profile.pk]), None),
+    },
+    'order-stats': {
+        'GET': lambda data: (data.customer, reverse('order-stats', args=[data.business_profile.pk]), None),
+    },
+    'profile-detail': {
+        'GET': lambda data: (data.customer, reverse('profile-detail', args=[data.business_profile.pk]), None),
+        'PATCH': lambda data: (data.customer, reverse('profile-detail', args=[data.customer_profile.pk]),
+                               {"location": "Hamburg"}),
+    },
+    'profile-business': {
+        'GET': lambda data: (data.customer, reverse('profile-business'), None),
+    },
+    'profile-customer': {
+        'GET': lambda data: (data.customer, reverse('profile-customer'), None),
+    },
+    'registration': {
+        'POST': lambda data: (None, reverse('registration'), {
+            "username": "newuser", "email": "newuser@example.com", "password": "budget",
+            "repeated_password": "budget", "type": "customer",
+        }),
+    },
+    'login': {
+        'POST': lambda data: (None, reverse('login'), {"username": "customer0", "password": "budget"}),
+    },
+    'review-list': {
+        'GET': lambda data: (data.customer, reverse('review-list') + f'?business_user_id={data.business.pk}', None),
+        'POST': lambda data: (data.customer, reverse('review-list'), {
+            "business_user": create_business("reviewed").pk, "rating": 5, "description": "Great",
+        }),
+    },
+    'review-export': {
+        'GET': lambda data: (data.business, reverse('review-export') + f'?business_user_id={data.business.pk}', None),
+    },
+    'review-detail': {
+        'GET': lambda data: (data.customer, reverse('review-detail', args=[data.reviews[0].pk]), None),
+        'PATCH': lambda data: (data.customer, reverse('review-detail', args=[data.reviews[0].pk]), {"rating": 2}),
+        'DELETE': lambda data: (data.customer, reverse('review-detail', args=[data.reviews[0].pk]), None),
+    },
+}
+
+
+# Routes whose GET returns one row per object, so larger data must give more rows
+LIST_ROUTES = {
+    'offer-list', 'order-list', 'order-export', 'profile-business', 'profile-customer', 'review-list', 'review-export',
+}
+
+
+def count_rows(response, content):
+    """
+    Number of objects in a list response: JSON arrays, paginated results, CSV or NDJSON exports.
+    """
+    content_type = response['Content-Type']
+    if content_type.startswith('text/csv'):
+        return len(list(csv.reader(io.StringIO(content.decode())))) - 1
+    if content_type.startswith('application/x-ndjson'):
+        return len(content.splitlines())
+    data = json.loads(content)
+    return len(data['results'] if isinstance(data, dict) else data)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(APITestCase):
+    def measure(self, route, method, size):
+        """
+        Sends the request of a case on data of the given size, with cold caches, and returns
+        the number of queries and, for GET on list routes, of rows. The data is rolled back afterwards.
+        """
+        with transaction.atomic():
+            user, path, data = CASES[route][method](build(size))
+            if user is not None:
+                token, created = Token.objects.get_or_create(user=user)
+                self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+            else:
+                self.client.credentials()
+            for alias in ('offers', 'auth'):
+                caches[alias].clear()
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.generic(method, path, None if data is None else json.dumps(data),
+                                               content_type='application/json')
+                # Streamed responses run their queries while they are sent
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+            self.assertLess(response.status_code, 400, f"{method} {path}: {content[:200]}")
+            transaction.set_rollback(True)
+        rows = count_rows(response, content) if method == 'GET' and route in LIST_ROUTES else None
+        return len(queries), rows
+
+    def test_every_route_has_a_budget_and_a_case(self):
+        api_routes = set()
+
+        def collect(patterns, prefix=''):
+            for pattern in patterns:
+                if hasattr(pattern, 'url_patterns'):
+                    collect(pattern.url_patterns, prefix + str(pattern.pattern))
+                elif pattern.name and (prefix + str(pattern.pattern)).startswith('api/'):
+                    api_routes.add(pattern.name)
+
+        collect(get_resolver().url_patterns)
+        # The router also adds a format suffix and an API root, which are not endpoints of their own
+        api_routes.discard('api-root')
+        self.assertEqual(api_routes, set(QUERY_BUDGETS))
+        self.assertEqual({route: set(methods) for route, methods in CASES.items()},
+                         {route: set(methods) for route, methods in QUERY_BUDGETS.items()})
+
+    def test_query_budgets(self):
+        # Test that no endpoint exceeds its budget or runs more queries with more related objects
+        for route, methods in QUERY_BUDGETS.items():
+            for method, budget in methods.items():
+                with self.subTest(route=route, method=method):
+                    counts, rows = zip(*[self.measure(route, method, size) for size in SIZES])
+                    if rows[0] is not None:
+                        # Otherwise the budget would be measured on lists that do not grow
+                        self.assertGreater(rows[-1], rows[0], f"{method} {route} does not list more rows with more objects: {rows}")
+                    self.assertEqual(counts[0], counts[-1], f"{method} {route} runs more queries with more objects: {counts}")
+                    self.assertLessEqual(counts[-1], budget, f"{method} {route} exceeds its budget of {budget} queries")
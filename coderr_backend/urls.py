@@ -11,6 +11,9 @@ from django.conf.urls.static import static
 from apps.offers.api import views as offers_views
 from apps.orders.api import views as orders_views
 from django.conf import settings
+from coderr_backend.async_views import select_view
+from apps.orders.api.async_views import AsyncOrderCountView
+from apps.users.api.async_views import AsyncReviewList
 
 urlpatterns = [
     # Admin site
@@ -25,8 +28,9 @@ urlpatterns = [
 
     # Orders API
     path('api/orders/', include('apps.orders.api.urls')),
-    path('api/order-count/<int:business_user_id>/', orders_views.OrderCountView.as_view(), name='order-count'),
+    path('api/order-count/<int:business_user_id>/', select_view(orders_views.OrderCountView, AsyncOrderCountView), name='order-count'),
     path('api/completed-order-count/<int:business_user_id>/', orders_views.CompletedOrderCountView.as_view(), name='completed-order-count'),
+    path('api/order-stats/<int:business_user_id>/', orders_views.OrderStatsView.as_view(), name='order-stats'),
 
     # User profiles and authentication
     path('api/profile/', include('apps.users.api.urls')),
@@ -35,7 +39,8 @@ urlpatterns = [
     path('api/login/', users_views.LoginView.as_view(), name='login'),
 
     # Reviews API
-    path('api/reviews/', users_views.ReviewList.as_view(), name='review-list'),
+    path('api/reviews/', select_view(users_views.ReviewList, AsyncReviewList), name='review-list'),
+    path('api/reviews/export/', users_views.ReviewExport.as_view(), name='review-export'),
     path('api/reviews/<int:pk>/', users_views.ReviewDetail.as_view(), name='review-detail'),
 ]
 